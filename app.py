@@ -4,29 +4,91 @@ Photo Verifier - Fotoğraf Doğrulama Sistemi
 Saha ziyaret fotoğraflarının görüntülenmesi ve doğrulanması.
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file, session, Response
 from datetime import datetime, timedelta
 from functools import wraps
 import os
 import hashlib
-import pymssql
+import time
 
-from config import PROJECTS, get_project_config
-from sources import get_source
+import metrics
+import profiler
+import report_builder
+import report_jobs
+import event_log_store
+import overview
+import weekly_report
+from config import PROJECTS, EVENT_LOG_WRITER, METRICS_CONFIG, SLOW_QUERY_LOG, REVIEW_QUEUE, get_project_config
+from sources import get_source, db, slow_query_log
+from sources.batch_writer import AsyncBatchWriter
+from sources.parallel import NO_DEADLINE
 
 app = Flask(__name__)
 app.secret_key = 'photo-verifier-secret-key-2025'  # Production'da değiştir
 
+# Toplu doğrulama isteğinde kabul edilen en fazla öğe
+MAX_VERIFY_BATCH = 500
+
 def get_pv_connection():
     """PhotoVerifier veritabanı bağlantısı."""
     from config import PHOTOVERIFIER_DB
-    return pymssql.connect(
-        server=PHOTOVERIFIER_DB['host'],
-        port=PHOTOVERIFIER_DB.get('port', 1433),
-        user=PHOTOVERIFIER_DB['username'],
-        password=PHOTOVERIFIER_DB['password'],
-        database=PHOTOVERIFIER_DB['database']
-    )
+    return db.connect(PHOTOVERIFIER_DB)
+
+# ==================== METRİKLER ====================
+
+@app.before_request
+def start_request_metrics():
+    """İstek süresi ve sorgu sayısı ölçümünü başlatır."""
+    request.environ['pv.metrics'] = metrics.start_request(request.endpoint, request.method)
+
+@app.after_request
+def finish_request_metrics(response):
+    """İstek ölçümünü kaydeder, Server-Timing başlığı ekler."""
+    request_metrics = request.environ.get('pv.metrics')
+    if request_metrics is not None:
+        app_ms = (time.perf_counter() - request_metrics.started) * 1000
+        response.headers['Server-Timing'] = (
+            f'app;dur={app_ms:.1f}, '
+            f'db;dur={request_metrics.db_seconds * 1000:.1f};desc="{request_metrics.db_queries} sorgu"'
+        )
+        metrics.finish_request(request_metrics, response.status_code)
+    return response
+
+@app.teardown_request
+def teardown_request_metrics(exc):
+    """Hata ile biten istekleri de kaydeder."""
+    metrics.finish_request(request.environ.get('pv.metrics'), 500)
+
+# ==================== PROFİLER ====================
+
+@app.before_request
+def start_request_profile():
+    """Admin ?_profile=1 veya X-Profile: 1 gönderirse isteği profiller."""
+    if request.args.get('_profile') != '1' and request.headers.get('X-Profile') != '1':
+        return
+    if session.get('role') != 'Admin':
+        return
+    request.environ['pv.profile'] = profiler.start(request.method, request.full_path,
+                                                   request.endpoint, session.get('username'))
+
+@app.after_request
+def finish_request_profile(response):
+    """Profili kaydeder, kimliğini X-Profile-Id başlığında döndürür."""
+    if 'pv.profile' not in request.environ:
+        return response
+    profile = request.environ.pop('pv.profile')
+    if profile is None:
+        response.headers['X-Profile-Status'] = 'busy'
+        return response
+    profile_id = profiler.finish(profile, response.status_code, request.environ.get('pv.metrics'))
+    if profile_id:
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+@app.teardown_request
+def teardown_request_profile(exc):
+    """Hata ile biten profillenmiş istekleri de kaydeder."""
+    profiler.finish(request.environ.pop('pv.profile', None), 500, request.environ.get('pv.metrics'))
 
 def login_required(f):
     """Login gerektiren sayfalar için decorator."""
@@ -63,25 +125,31 @@ def hash_password(password: str) -> str:
     """Şifreyi hashler."""
     return hashlib.sha256(password.encode()).hexdigest()
 
+# EventLogs yazımları istek thread'ini bekletmez; arka planda toplu yazılır
+event_log_writer = AsyncBatchWriter(
+    'EventLogs',
+    ('UserId', 'Username', 'Action', 'Project', 'Details', 'IpAddress', 'CreatedAt'),
+    get_pv_connection,
+    **EVENT_LOG_WRITER
+)
+
 def log_event(action: str, project: str = None, details: str = None):
-    """Aktivite loglar."""
+    """Aktivite loglar (arka plan kuyruğuna ekler)."""
+    log_events_bulk([(action, project, details)])
+
+def log_events_bulk(entries: list):
+    """
+    Birden fazla aktiviteyi arka plan kuyruğuna ekler.
+    entries: [(action, project, details), ...]
+    """
     try:
         user = get_current_user()
-        conn = get_pv_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO EventLogs (UserId, Username, Action, Project, Details, IpAddress)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        ''', (
-            user['id'] if user else None,
-            user['username'] if user else None,
-            action,
-            project,
-            details,
-            request.remote_addr
-        ))
-        conn.commit()
-        conn.close()
+        user_id = user['id'] if user else None
+        username = user['username'] if user else None
+        now = datetime.now()
+        
+        for action, project, details in entries:
+            event_log_writer.put((user_id, username, action, project, details, request.remote_addr, now))
     except Exception as e:
         print(f"Log error: {e}")
 
@@ -147,8 +215,26 @@ def logout():
 @app.route('/')
 @login_required
 def index():
-    """Ana sayfa - ilk projeye yönlendir."""
-    return redirect(url_for('dashboard', project='adco'))
+    """Ana sayfa - tüm projeler özetine yönlendir."""
+    return redirect(url_for('overview_page'))
+
+@app.route('/overview')
+@login_required
+def overview_page():
+    """Tüm projelerin özeti (projeler paralel toplanır)."""
+    days = max(1, min(request.args.get('days', overview.OVERVIEW_DAYS, type=int), 90))
+    return render_template('overview.html',
+                         overview=overview.build_overview(days),
+                         project=None,
+                         projects=PROJECTS,
+                         current_user=get_current_user())
+
+@app.route('/api/overview')
+@login_required
+def api_overview():
+    """Tüm projelerin özeti (JSON)."""
+    days = max(1, min(request.args.get('days', overview.OVERVIEW_DAYS, type=int), 90))
+    return jsonify(overview.build_overview(days))
 
 
 @app.route('/admin/users')
@@ -324,21 +410,17 @@ def photos(project):
     user_id = request.args.get('user_id', type=int)
     customer_code = request.args.get('customer_code')
     
-    # Personel ve mağaza listeleri (filtre seçenekleri için)
-    try:
-        personnel_list = source.get_personnel_list(date_from, date_to)
-        customer_list = source.get_customer_list(date_from, date_to)
-    except Exception as e:
-        print(f"Liste hatası: {e}")
-        personnel_list = []
-        customer_list = []
-    
-    # Fotoğrafları getir (ziyarete göre gruplu)
-    try:
-        photos_grouped = source.get_photos_grouped(photo_type, date_from, date_to, user_id, customer_code)
-    except Exception as e:
-        photos_grouped = []
-        print(f"Hata: {e}")
+    # Personel / mağaza listeleri (filtre seçenekleri) ve fotoğraflar (ziyarete göre gruplu) paralel;
+    # hata veren ya da süresi dolan liste boş olur, fotoğraflar yüklenemezse sayfada uyarı gösterilir
+    results = source.run_parallel({
+        'personnel_list': lambda: source.get_personnel_list(date_from, date_to),
+        'customer_list': lambda: source.get_customer_list(date_from, date_to),
+        'photos_grouped': lambda: source.get_photos_grouped(photo_type, date_from, date_to, user_id, customer_code),
+    }, defaults={'personnel_list': [], 'customer_list': [], 'photos_grouped': None})
+    personnel_list = results['personnel_list']
+    customer_list = results['customer_list']
+    photos_error = results['photos_grouped'] is None
+    photos_grouped = results['photos_grouped'] or []
     
     return render_template('photos.html',
                          project=project,
@@ -347,6 +429,7 @@ def photos(project):
                          photo_type=photo_type,
                          photo_types=config.get('photo_tables', []),
                          photos_grouped=photos_grouped,
+                         photos_error=photos_error,
                          date_from=date_from,
                          date_to=date_to,
                          days=days,
@@ -356,6 +439,29 @@ def photos(project):
                          customer_list=customer_list,
                          current_user=get_current_user())
 
+@app.route('/<project>/visit/<int:visit_id>')
+@login_required
+def visit_detail(project, visit_id):
+    """Ziyaret detayı - tüm fotoğraf türleri ve doğrulama durumları."""
+    if project not in PROJECTS:
+        return "Proje bulunamadı", 404
+    
+    config = get_project_config(project)
+    source = get_source(project)
+    
+    try:
+        visit = source.get_all_visit_photos(visit_id)
+    except Exception as e:
+        print(f"DEBUG visit_detail error: {e}")
+        visit = {'visit_id': visit_id, 'info': None, 'exhibition': [], 'planogram': [], 'visit': []}
+    
+    return render_template('visit_detail.html',
+                         project=project,
+                         project_name=config['name'],
+                         projects=PROJECTS,
+                         visit=visit,
+                         current_user=get_current_user())
+
 @app.route('/<project>/duplicates')
 @login_required
 def duplicates(project):
@@ -376,41 +482,29 @@ def duplicates(project):
     # Personel ve müşteri listelerini al (combo search için)
     end_date = datetime.now().strftime('%Y-%m-%d')
     start_date = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
-    personnel_list = source.get_personnel_list(start_date, end_date)
-    customer_list = source.get_customer_list(start_date, end_date)
-    
     # Önce cache'den dene (hızlı), yoksa canlı hesapla
-    if source.has_duplicate_cache():
-        duplicate_groups = source.get_duplicates_from_cache()
-        from_cache = True
-    else:
-        duplicate_groups = source.find_duplicates()
-        from_cache = False
-    
-    # Verification bilgilerini ekle
+    from_cache = source.has_duplicate_cache()
+    load_duplicate_groups = source.get_duplicates_from_cache if from_cache else source.find_duplicates
+    
+    # Listeler ve duplicate grupları birbirinden bağımsız: paralel.
+    # Canlı tarama uzun sürebilir; o durumda süre sınırı uygulanmaz (eskisi gibi yavaş ama çalışır)
+    results = source.run_parallel({
+        'personnel_list': lambda: source.get_personnel_list(start_date, end_date),
+        'customer_list': lambda: source.get_customer_list(start_date, end_date),
+        'duplicates': load_duplicate_groups,
+    }, timeout=None if from_cache else NO_DEADLINE)
+    personnel_list = results['personnel_list']
+    customer_list = results['customer_list']
+    duplicate_groups = results['duplicates']
+    metrics.record_cache('duplicate', hits=int(from_cache), misses=int(not from_cache))
+    
+    # Verification bilgilerini ekle (bellek indeksinden)
     all_photo_ids = []
     for group in duplicate_groups:
         for file in group['files']:
             all_photo_ids.append((file['photo_id'], file['photo_type']))
     
-    # Toplu verification al
-    conn = get_pv_connection()
-    cursor = conn.cursor(as_dict=True)
-    
-    verifications = {}
-    if all_photo_ids:
-        for photo_id, photo_type in all_photo_ids:
-            cursor.execute('''
-                SELECT PhotoId, PhotoType, Status, Note FROM Verifications
-                WHERE Project = %s AND PhotoId = %s AND PhotoType = %s
-            ''', (project, photo_id, photo_type))
-            result = cursor.fetchone()
-            if result:
-                verifications[(result['PhotoId'], result['PhotoType'])] = {
-                    'status': result['Status'],
-                    'note': result['Note']
-                }
-    conn.close()
+    verifications = source.get_verification_statuses_by_key(all_photo_ids)
     
     # Verification'ları files'a ekle
     for group in duplicate_groups:
@@ -488,6 +582,30 @@ def duplicates(project):
                          })
 
 
+@app.route('/<project>/review')
+@login_required
+def review(project):
+    """İnceleme kuyruğu - kiralanan fotoğraflar batch batch doğrulanır."""
+    if project not in PROJECTS:
+        return "Proje bulunamadı", 404
+    
+    config = get_project_config(project)
+    photo_types = config.get('photo_tables', [])
+    photo_type = request.args.get('type', photo_types[0] if photo_types else 'exhibition')
+    if photo_type not in photo_types:
+        return "Geçersiz fotoğraf türü", 400
+    
+    return render_template('review.html',
+                         project=project,
+                         project_name=config['name'],
+                         projects=PROJECTS,
+                         photo_type=photo_type,
+                         photo_types=photo_types,
+                         batch_size=REVIEW_QUEUE.get('batch_size', 20),
+                         lease_seconds=REVIEW_QUEUE.get('lease_seconds', 600),
+                         current_user=get_current_user())
+
+
 @app.route('/<project>/reports')
 @login_required
 def reports(project):
@@ -496,11 +614,51 @@ def reports(project):
         return "Proje bulunamadı", 404
     
     config = get_project_config(project)
+    source = get_source(project)
+    
+    # Filtre seçenekleri (son 90 günün personeli)
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
+    try:
+        personnel_list = source.get_personnel_list(start_date, end_date)
+    except Exception as e:
+        print(f"Liste hatası: {e}")
+        personnel_list = []
     
     return render_template('reports.html',
                          project=project,
                          project_name=config['name'],
                          projects=PROJECTS,
+                         photo_types=config.get('photo_tables', []),
+                         personnel_list=personnel_list,
+                            current_user=get_current_user())
+
+
+@app.route('/<project>/reports/trends')
+@login_required
+def report_trends(project):
+    """Haftalık snapshot'lardan çok haftalık trend sayfası."""
+    if project not in PROJECTS:
+        return "Proje bulunamadı", 404
+    
+    config = get_project_config(project)
+    weeks = request.args.get('weeks', weekly_report.TREND_WEEKS, type=int)
+    weeks = max(1, min(weeks, 52))
+    
+    try:
+        trends = weekly_report.get_trends(weeks, project)
+    except Exception as e:
+        print(f"DEBUG trends error: {e}")
+        trends = {'weeks': [], 'projects': {}, 'users': {}}
+    
+    return render_template('trends.html',
+                         project=project,
+                         project_name=config['name'],
+                         projects=PROJECTS,
+                         weeks=weeks,
+                         week_list=trends['weeks'],
+                         project_weeks=trends['projects'].get(project, {}),
+                         users=trends['users'].get(project, {}),
                             current_user=get_current_user())
 
 
@@ -538,6 +696,105 @@ def api_verify(project):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/<project>/verify/batch', methods=['POST'])
+@login_required
+def api_verify_batch(project):
+    """
+    Toplu fotoğraf doğrulama API'si.
+    Body: {"items": [{"photo_id", "photo_type", "status", "note", "visit_id"}, ...]}
+    Tüm kararlar tek transaction'da kaydedilir, her öğe için sonuç döner.
+    """
+    if project not in PROJECTS:
+        return jsonify({'error': 'Proje bulunamadı'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items listesi gerekli'}), 400
+    if len(items) > MAX_VERIFY_BATCH:
+        return jsonify({'error': f'En fazla {MAX_VERIFY_BATCH} öğe gönderilebilir'}), 400
+    
+    source = get_source(project)
+    results = source.verify_photos_bulk(items, verified_by=session.get('user_id'))
+    
+    log_events_bulk([
+        ('Verify', project, f"PhotoId: {r['photo_id']}, Type: {r['photo_type']}, Status: {item.get('status')}")
+        for r, item in zip(results, items)
+        if r['success'] and r.get('action') != 'superseded'
+    ])
+    
+    return jsonify({
+        'success': all(r['success'] for r in results),
+        'succeeded': sum(1 for r in results if r['success']),
+        'failed': sum(1 for r in results if not r['success']),
+        'results': results,
+    })
+
+
+@app.route('/api/<project>/review/<photo_type>/claim', methods=['POST'])
+@login_required
+def api_review_claim(project, photo_type):
+    """
+    Sıradaki doğrulanmamış fotoğrafları kullanıcıya kiralar.
+    Query: size (batch boyu), resume=1 (kirası süren fotoğraflar önce döner)
+    """
+    if project not in PROJECTS:
+        return jsonify({'error': 'Proje bulunamadı'}), 404
+    if photo_type not in get_project_config(project).get('photo_tables', []):
+        return jsonify({'error': f'Geçersiz fotoğraf türü: {photo_type}'}), 400
+    
+    try:
+        items = get_source(project).claim_review_batch(
+            photo_type, session['user_id'],
+            size=request.args.get('size', type=int),
+            resume=request.args.get('resume') == '1')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'items': items, 'lease_seconds': REVIEW_QUEUE.get('lease_seconds', 600)})
+
+@app.route('/api/<project>/review/<photo_type>/release', methods=['POST'])
+@login_required
+def api_review_release(project, photo_type):
+    """Kiralanan fotoğrafları kuyruğa geri bırakır. Body: {"photo_ids": [...]} (yoksa hepsi)"""
+    if project not in PROJECTS:
+        return jsonify({'error': 'Proje bulunamadı'}), 404
+    
+    # sendBeacon text/plain gönderir: gövde tipine bakmadan okunur
+    data = request.get_json(force=True, silent=True) or {}
+    try:
+        released = get_source(project).release_review_lease(photo_type, session['user_id'], data.get('photo_ids'))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'released': released})
+
+
+@app.route('/api/<project>/photos/explain')
+@login_required
+def api_photos_explain(project):
+    """Fotoğraf listesinin hangi günlerinin cache'den / canlı sorgudan geldiğini ve sürelerini döndürür."""
+    if project not in PROJECTS:
+        return jsonify({'error': 'Proje bulunamadı'}), 404
+
+    source = get_source(project)
+
+    photo_type = request.args.get('type', 'exhibition')
+    days = request.args.get('days', 7, type=int)
+    date_to = request.args.get('to', datetime.now().strftime('%Y-%m-%d'))
+    date_from = request.args.get('from', (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d'))
+    user_id = request.args.get('user_id', type=int)
+    customer_code = request.args.get('customer_code')
+
+    explain = {}
+    try:
+        photos_grouped = source.get_photos_grouped(photo_type, date_from, date_to, user_id, customer_code, explain=explain)
+        explain['visit_count'] = len(photos_grouped)
+        return jsonify(explain)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/<project>/stats')
 @login_required
 def api_stats(project):
@@ -558,6 +815,25 @@ def api_stats(project):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/<project>/visit/<int:visit_id>')
+@login_required
+def api_visit_images(project, visit_id):
+    """Ziyaretin fotoğraf adresleri (ziyaret detayında komşu ziyaretleri önceden yüklemek için)."""
+    if project not in PROJECTS:
+        return jsonify({'error': 'Proje bulunamadı'}), 404
+    
+    try:
+        visit = get_source(project).get_all_visit_photos(visit_id, with_verifications=False)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'visit_id': visit_id,
+        'images': [f"/image/{project}/{photo['ImageUrl']}"
+                   for photo_type in ('visit', 'exhibition', 'planogram') for photo in visit[photo_type]],
+    })
+
+
 @app.route('/image/<project>/<path:image_path>')
 @login_required
 def serve_image(project, image_path):
@@ -574,6 +850,7 @@ def serve_image(project, image_path):
         return "Erişim reddedildi", 403
     
     if os.path.exists(full_path):
+        metrics.record_bytes('serve_image', os.path.getsize(full_path))
         return send_file(full_path)
     else:
         return "Dosya bulunamadı", 404
@@ -656,116 +933,328 @@ def profile():
 @app.route('/admin/logs')
 @admin_required
 def event_logs():
-    """Event logları sayfası."""
-    page = request.args.get('page', 1, type=int)
-    per_page = 50
-    offset = (page - 1) * per_page
-    
-    conn = get_pv_connection()
-    cursor = conn.cursor(as_dict=True)
-    
-    # Toplam kayıt sayısı
-    cursor.execute('SELECT COUNT(*) as total FROM EventLogs')
-    total = cursor.fetchone()['total']
-    
-    # Logları getir
-    cursor.execute('''
-        SELECT Id, UserId, Username, Action, Project, Details, IpAddress, CreatedAt
-        FROM EventLogs
-        ORDER BY CreatedAt DESC
-        OFFSET %s ROWS FETCH NEXT %s ROWS ONLY
-    ''', (offset, per_page))
-    logs = cursor.fetchall()
-    conn.close()
-    
-    total_pages = (total + per_page - 1) // per_page
+    """Event logları sayfası (anahtarlı sayfalama: ?after= / ?before=)."""
+    filters = {
+        'username': request.args.get('username', '').strip(),
+        'action': request.args.get('action', '').strip(),
+        'project': request.args.get('project', '').strip(),
+        'date_from': request.args.get('from', '').strip(),
+        'date_to': request.args.get('to', '').strip(),
+    }
+    for key in ('date_from', 'date_to'):
+        if filters[key]:
+            try:
+                datetime.strptime(filters[key], '%Y-%m-%d')
+            except ValueError:
+                filters[key] = ''
+    
+    include_archive = request.args.get('archive') == '1'
+    page = event_log_store.get_page(filters,
+                                    after=request.args.get('after'),
+                                    before=request.args.get('before'),
+                                    include_archive=include_archive)
+    total, total_approximate = event_log_store.get_total(filters, include_archive)
+    
+    # Sayfa linklerinde filtreler korunur
+    filter_args = {arg: filters[key] for arg, key in (('username', 'username'), ('action', 'action'),
+                                                       ('project', 'project'), ('from', 'date_from'),
+                                                       ('to', 'date_to')) if filters[key]}
+    if include_archive:
+        filter_args['archive'] = '1'
     
     return render_template('admin_logs.html',
-                         logs=logs,
-                         page=page,
-                         total_pages=total_pages,
+                         logs=page['logs'],
+                         newer=page['newer'],
+                         older=page['older'],
+                         is_first_page=not (request.args.get('after') or request.args.get('before')),
                          total=total,
+                         total_approximate=total_approximate,
+                         filters=filters,
+                         filter_args=filter_args,
+                         include_archive=include_archive,
+                         actions=event_log_store.ACTIONS,
+                         usernames=event_log_store.get_usernames(),
+                         writer_stats=event_log_writer.stats(),
                          current_user=get_current_user(),
                          projects=PROJECTS)
 
 
-@app.route('/<project>/reports/verifications')
+@app.route('/admin/metrics')
+@admin_required
+def admin_metrics():
+    """Performans metrikleri sayfası."""
+    return render_template('admin_metrics.html',
+                         snapshot=metrics.snapshot(),
+                         writer_stats=event_log_writer.stats(),
+                         current_user=get_current_user(),
+                         projects=PROJECTS)
+
+
+@app.route('/admin/slow-queries')
+@admin_required
+def admin_slow_queries():
+    """Yavaş sorgular - normalize edilmiş SQL'e göre en kötüler."""
+    days = request.args.get('days', 7, type=int)
+    sort = request.args.get('sort', 'total')
+    order_by = {
+        'total': 'TotalMsSum',
+        'avg': 'AvgMs',
+        'max': 'MaxMs',
+        'count': 'Executions',
+    }.get(sort, 'TotalMsSum')
+    since = datetime.now() - timedelta(days=max(days, 1))
+
+    offenders = []
+    error = None
+    try:
+        conn = get_pv_connection()
+        cursor = conn.cursor(as_dict=True)
+        # Her sorgu şablonu için toplamlar + en yavaş örneğin SQL/parametre/route bilgisi
+        cursor.execute(f'''
+            WITH Agg AS (
+                SELECT QueryHash,
+                       COUNT(*) AS Executions,
+                       SUM(CAST(TotalMs AS BIGINT)) AS TotalMsSum,
+                       AVG(TotalMs) AS AvgMs,
+                       MAX(TotalMs) AS MaxMs,
+                       AVG(ExecuteMs) AS AvgExecuteMs,
+                       AVG(FetchMs) AS AvgFetchMs,
+                       AVG(RowsReturned) AS AvgRows,
+                       SUM(CAST(Failed AS INT)) AS Failures,
+                       MAX(LoggedAt) AS LastSeen
+                FROM SlowQueryLog
+                WHERE LoggedAt >= %s
+                GROUP BY QueryHash
+            )
+            SELECT TOP 50 a.*, w.DatabaseName, w.Route, w.NormalizedSql, w.SqlText, w.Params
+            FROM Agg a
+            CROSS APPLY (
+                SELECT TOP 1 DatabaseName, Route, NormalizedSql, SqlText, Params
+                FROM SlowQueryLog s
+                WHERE s.QueryHash = a.QueryHash AND s.LoggedAt >= %s
+                ORDER BY s.TotalMs DESC
+            ) w
+            ORDER BY {order_by} DESC
+        ''', (since, since))
+        offenders = cursor.fetchall()
+        conn.close()
+    except Exception as e:
+        print(f"DEBUG slow queries error: {e}")
+        error = str(e)
+
+    return render_template('admin_slow_queries.html',
+                         offenders=offenders,
+                         days=days,
+                         sort=sort,
+                         error=error,
+                         slow_query_config=SLOW_QUERY_LOG,
+                         writer_stats=slow_query_log.writer_stats(),
+                         current_user=get_current_user(),
+                         projects=PROJECTS)
+
+
+@app.route('/admin/profiles')
+@admin_required
+def admin_profiles():
+    """Kaydedilmiş istek profilleri."""
+    return render_template('admin_profiles.html',
+                         profiles=profiler.list_profiles(),
+                         selected=None,
+                         report=None,
+                         current_user=get_current_user(),
+                         projects=PROJECTS)
+
+
+@app.route('/admin/profiles/<profile_id>')
+@admin_required
+def admin_profile_detail(profile_id):
+    """Profil raporu; ?download=1 ile pstats dosyası (snakeviz vb. için)."""
+    if request.args.get('download') == '1':
+        path = profiler.profile_path(profile_id, '.prof')
+        if not path:
+            return "Profil bulunamadı", 404
+        return send_file(path, as_attachment=True, download_name=f'{profile_id}.prof')
+
+    path = profiler.profile_path(profile_id, '.txt')
+    if not path:
+        return "Profil bulunamadı", 404
+    with open(path, encoding='utf-8') as f:
+        report = f.read()
+
+    return render_template('admin_profiles.html',
+                         profiles=profiler.list_profiles(),
+                         selected=profile_id,
+                         report=report,
+                         current_user=get_current_user(),
+                         projects=PROJECTS)
+
+
+@app.route('/admin/metrics/prometheus')
+def admin_metrics_prometheus():
+    """Prometheus metin formatında metrikler (admin oturumu veya scrape token)."""
+    token = METRICS_CONFIG.get('scrape_token')
+    authorized = session.get('role') == 'Admin' or (
+        token and request.headers.get('Authorization') == f'Bearer {token}'
+    )
+    if not authorized:
+        return "Yetkiniz yok", 403
+    
+    writer_stats = event_log_writer.stats()
+    body = metrics.render_prometheus({
+        'photoverifier_event_log_queue_size': writer_stats['queue_size'],
+        'photoverifier_event_log_written_total': writer_stats['written'],
+        'photoverifier_event_log_dropped_total': writer_stats['dropped_overflow'] + writer_stats['dropped_error'],
+    })
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+
+def send_report_file(job):
+    """Bitmiş rapor işinin dosyasını parça parça gönderir (cache dosyası silinmez)."""
+    if not job.path or not os.path.exists(job.path):
+        return "Rapor dosyası artık yok, tekrar oluşturun", 410
+    size = os.path.getsize(job.path)
+    metrics.record_bytes('report', size)
+    return Response(
+        report_builder.stream_file(job.path, delete=False),
+        mimetype=job.mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{job.download_name}"',
+            'Content-Length': str(size),
+        }
+    )
+
+def send_report(report_type: str, project: str):
+    """
+    Doğrudan indirme linkleri (?format=xlsx|csv|parquet).
+    CSV cursor'dan doğrudan akış halinde gönderilir. xlsx/parquet cache'de güncelse
+    hemen gönderilir; değilse iş kuyruğa alınır ve istek thread'i beklemeden raporlar
+    sayfasına yönlendirilir (sayfa işi poll edip hazır olunca indirir).
+    """
+    params, error = report_params(report_type)
+    if error:
+        return error, 400
+    
+    fmt = request.args.get('format', 'xlsx')
+    if fmt == 'csv':
+        download_name = report_builder.download_name(report_type, project, 'csv')
+        return Response(
+            report_builder.csv_stream(report_type, project, params),
+            mimetype=report_builder.CSV_MIMETYPE,
+            headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+        )
+    error = report_format_error(fmt)
+    if error:
+        return error, 400
+    
+    job = report_jobs.submit(report_type, project, params, username=session.get('username'), fmt=fmt)
+    if job.status == 'done':
+        return send_report_file(job)
+    return redirect(url_for('reports', project=project, job=job.id))
+
+@app.route('/api/<project>/reports/<report_type>/jobs', methods=['POST'])
 @login_required
-def report_verifications(project):
-    """Doğrulama raporu - Excel export."""
+def api_report_job_submit(project, report_type):
+    """Rapor işi başlatır; iş numarası ve durumu döner."""
     if project not in PROJECTS:
-        return "Proje bulunamadı", 404
+        return jsonify({'error': 'Proje bulunamadı'}), 404
+    if report_type not in report_builder.REPORTS:
+        return jsonify({'error': 'Rapor bulunamadı'}), 404
     
-    from io import BytesIO
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
+    params, error = report_params(report_type)
+    if not error:
+        fmt = request.args.get('format', 'xlsx')
+        error = report_format_error(fmt)
+    if error:
+        return jsonify({'error': error}), 400
     
-    # Doğrulama verilerini al
-    conn = get_pv_connection()
-    cursor = conn.cursor(as_dict=True)
-    cursor.execute('''
-        SELECT v.PhotoId, v.PhotoType, v.VisitId, v.Status, v.Note, v.VerifiedAt,
-               u.Username, u.DisplayName
-        FROM Verifications v
-        LEFT JOIN Users u ON v.VerifiedBy = u.Id
-        WHERE v.Project = %s
-        ORDER BY v.VerifiedAt DESC
-    ''', (project,))
-    verifications = cursor.fetchall()
-    conn.close()
+    try:
+        job = report_jobs.submit(report_type, project, params, username=session.get('username'), fmt=fmt)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
     
-    # Proje DB'sinden fotoğraf detaylarını al
-    source = get_source(project)
+    log_event('ReportRequest', project=project, details=f"Report: {report_type}, Format: {fmt}, Filters: {params}, Job: {job.id}")
+    return jsonify(report_job_payload(job)), 202
+
+@app.route('/api/reports/jobs/<job_id>')
+@login_required
+def api_report_job_status(job_id):
+    """Rapor işinin durumu (sayfa poll eder)."""
+    job = report_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    return jsonify(report_job_payload(job))
+
+@app.route('/reports/jobs/<job_id>/download')
+@login_required
+def report_job_download(job_id):
+    """Hazır rapor dosyasını indirir."""
+    job = report_jobs.get(job_id)
+    if not job:
+        return "İş bulunamadı", 404
+    if job.status != 'done':
+        return "Rapor henüz hazır değil", 409
+    return send_report_file(job)
+
+def report_params(report_type: str):
+    """
+    Rapor filtreleri (query string): from, to, type, status, user_id, customer_code.
+    (params, hata mesajı) döndürür; sadece verilen filtreler params'a girer.
+    status=pending (doğrulanmamış) sadece duplicate ve mesafe raporlarında geçerli;
+    doğrulama raporu yalnızca doğrulanmış fotoğrafları içerir.
+    """
+    params = {}
+    for arg, key in (('from', 'date_from'), ('to', 'date_to')):
+        value = request.args.get(arg, '').strip()
+        if value:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return None, f"Geçersiz tarih: {value}"
+            params[key] = value
+    
+    photo_type = request.args.get('type', '').strip()
+    if photo_type:
+        if photo_type not in ('exhibition', 'planogram', 'visit'):
+            return None, f"Geçersiz fotoğraf türü: {photo_type}"
+        params['photo_type'] = photo_type
+    
+    status = request.args.get('status', '').strip()
+    if status:
+        if status not in ('approved', 'rejected', 'suspicious', 'pending'):
+            return None, f"Geçersiz durum: {status}"
+        if status == 'pending' and report_type == 'verifications':
+            return None, "Doğrulama raporunda 'Bekleyen' durumu kullanılamaz (sadece duplicate ve mesafe raporları)"
+        params['status'] = status
     
-    # Excel oluştur
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Doğrulama Raporu"
-    
-    # Header
-    headers = ['Fotoğraf ID', 'Tür', 'Ziyaret ID', 'Personel', 'Mağaza Kodu', 'Mağaza Adı', 'Durum', 'Yorum', 'Doğrulayan', 'Doğrulama Tarihi']
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Data
-    for row_num, v in enumerate(verifications, 2):
-        # Fotoğraf detaylarını al
-        detail = source._get_photo_detail(v['PhotoId'], v['PhotoType'], v['VisitId'])
-        
-        status_text = {'approved': 'Onaylandı', 'rejected': 'Reddedildi', 'suspicious': 'Şüpheli'}.get(v['Status'], v['Status'])
-        
-        ws.cell(row=row_num, column=1, value=v['PhotoId'])
-        ws.cell(row=row_num, column=2, value=v['PhotoType'])
-        ws.cell(row=row_num, column=3, value=v['VisitId'])
-        ws.cell(row=row_num, column=4, value=detail.get('personnel', ''))
-        ws.cell(row=row_num, column=5, value=detail.get('customer_code', ''))
-        ws.cell(row=row_num, column=6, value=detail.get('customer_name', ''))
-        ws.cell(row=row_num, column=7, value=status_text)
-        ws.cell(row=row_num, column=8, value=v['Note'] or '')
-        ws.cell(row=row_num, column=9, value=v['DisplayName'] or v['Username'] or '')
-        ws.cell(row=row_num, column=10, value=v['VerifiedAt'].strftime('%d.%m.%Y %H:%M') if v['VerifiedAt'] else '')
-    
-    # Kolon genişlikleri
-    column_widths = [12, 12, 12, 25, 15, 35, 15, 40, 20, 18]
-    for i, width in enumerate(column_widths, 1):
-        ws.column_dimensions[ws.cell(row=1, column=i).column_letter].width = width
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'{project}_dogrulama_raporu.xlsx'
-    )
+    user_id = request.args.get('user_id', type=int)
+    if user_id:
+        params['user_id'] = user_id
+    customer_code = request.args.get('customer_code', '').strip()
+    if customer_code:
+        params['customer_code'] = customer_code
+    return params, None
+
+def report_format_error(fmt: str):
+    """Dosyaya yazılan formatlar için hata mesajı (geçerliyse None)."""
+    if fmt not in report_builder.FORMATS:
+        return f"Desteklenmeyen format: {fmt}"
+    if fmt == 'parquet' and not report_builder.parquet_available():
+        return "Parquet için sunucuda pyarrow kurulu değil"
+    return None
+
+def report_job_payload(job) -> dict:
+    payload = job.to_dict()
+    if job.status == 'done':
+        payload['download_url'] = url_for('report_job_download', job_id=job.id)
+    return payload
+
+@app.route('/<project>/reports/verifications')
+@login_required
+def report_verifications(project):
+    """Doğrulama raporu - Excel export."""
+    if project not in PROJECTS:
+        return "Proje bulunamadı", 404
+    return send_report('verifications', project)
 
 @app.route('/<project>/reports/duplicates')
 @login_required
@@ -773,101 +1262,7 @@ def report_duplicates(project):
     """Duplicate raporu - Excel export."""
     if project not in PROJECTS:
         return "Proje bulunamadı", 404
-    
-    from io import BytesIO
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    import json
-    
-    # Duplicate verilerini al
-    conn = get_pv_connection()
-    cursor = conn.cursor(as_dict=True)
-    cursor.execute('''
-        SELECT Md5Hash, PhotoCount, Details, UpdatedAt
-        FROM DuplicateCache
-        WHERE Project = %s
-        ORDER BY PhotoCount DESC
-    ''', (project,))
-    duplicates = cursor.fetchall()
-    
-    # Doğrulama durumlarını al
-    cursor.execute('''
-        SELECT PhotoId, PhotoType, Status, Note, VerifiedBy
-        FROM Verifications
-        WHERE Project = %s
-    ''', (project,))
-    verifications_list = cursor.fetchall()
-    
-    # Kullanıcı isimlerini al
-    cursor.execute('SELECT Id, DisplayName, Username FROM Users')
-    users_list = cursor.fetchall()
-    conn.close()
-    
-    # Lookup dictionary'ler oluştur
-    verifications = {(v['PhotoId'], v['PhotoType']): v for v in verifications_list}
-    users = {u['Id']: u['DisplayName'] or u['Username'] for u in users_list}
-    
-    # Excel oluştur
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Duplicate Raporu"
-    
-    # Header
-    headers = ['Hash', 'Tekrar', 'Fotoğraf ID', 'Tür', 'Ziyaret ID', 'Personel', 'Mağaza Kodu', 'Mağaza Adı', 'Fotoğraf Tarihi', 'Mesafe (km)', 'Doğrulama', 'Yorum', 'Doğrulayan']
-    header_fill = PatternFill(start_color="C65911", end_color="C65911", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Data
-    row_num = 2
-    for dup in duplicates:
-        files = json.loads(dup['Details']) if dup['Details'] else []
-        for f in files:
-            photo_id = f.get('photo_id')
-            photo_type = f.get('photo_type')
-            
-            # Doğrulama durumunu bul
-            verification = verifications.get((photo_id, photo_type), {})
-            status = verification.get('Status', '')
-            status_text = {'approved': 'Onaylandı', 'rejected': 'Reddedildi', 'suspicious': 'Şüpheli'}.get(status, '')
-            note = verification.get('Note', '')
-            verified_by = users.get(verification.get('VerifiedBy'), '')
-            
-            ws.cell(row=row_num, column=1, value=dup['Md5Hash'][:12] + '...')
-            ws.cell(row=row_num, column=2, value=dup['PhotoCount'])
-            ws.cell(row=row_num, column=3, value=photo_id)
-            ws.cell(row=row_num, column=4, value=photo_type)
-            ws.cell(row=row_num, column=5, value=f.get('visit_id', ''))
-            ws.cell(row=row_num, column=6, value=f.get('personnel', ''))
-            ws.cell(row=row_num, column=7, value=f.get('customer_code', ''))
-            ws.cell(row=row_num, column=8, value=f.get('customer_name', ''))
-            ws.cell(row=row_num, column=9, value=str(f.get('photo_date', ''))[:19] if f.get('photo_date') else '')
-            ws.cell(row=row_num, column=10, value=f.get('distance_km', ''))
-            ws.cell(row=row_num, column=11, value=status_text)
-            ws.cell(row=row_num, column=12, value=note)
-            ws.cell(row=row_num, column=13, value=verified_by)
-            row_num += 1
-    
-    # Kolon genişlikleri
-    column_widths = [15, 8, 12, 12, 12, 25, 15, 35, 18, 12, 12, 30, 20]
-    for i, width in enumerate(column_widths, 1):
-        ws.column_dimensions[ws.cell(row=1, column=i).column_letter].width = width
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'{project}_duplicate_raporu.xlsx'
-    )
+    return send_report('duplicates', project)
 
 @app.route('/<project>/reports/distance-alerts')
 @login_required
@@ -875,70 +1270,7 @@ def report_distance_alerts(project):
     """Mesafe uyarı raporu - 1km+ uzaktan girişler."""
     if project not in PROJECTS:
         return "Proje bulunamadı", 404
-    
-    from io import BytesIO
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    import json
-    
-    conn = get_pv_connection()
-    cursor = conn.cursor(as_dict=True)
-    cursor.execute('''
-        SELECT Details
-        FROM DuplicateCache
-        WHERE Project = %s
-    ''', (project,))
-    rows = cursor.fetchall()
-    conn.close()
-    
-    # Excel oluştur
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Mesafe Uyarıları"
-    
-    # Header
-    headers = ['Fotoğraf ID', 'Tür', 'Ziyaret ID', 'Personel', 'Mağaza Kodu', 'Mağaza Adı', 'Fotoğraf Tarihi', 'Mesafe (km)']
-    header_fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Data
-    row_num = 2
-    for row in rows:
-        files = json.loads(row['Details']) if row['Details'] else []
-        for f in files:
-            distance = f.get('distance_km')
-            if distance and distance > 1:
-                ws.cell(row=row_num, column=1, value=f.get('photo_id', ''))
-                ws.cell(row=row_num, column=2, value=f.get('photo_type', ''))
-                ws.cell(row=row_num, column=3, value=f.get('visit_id', ''))
-                ws.cell(row=row_num, column=4, value=f.get('personnel', ''))
-                ws.cell(row=row_num, column=5, value=f.get('customer_code', ''))
-                ws.cell(row=row_num, column=6, value=f.get('customer_name', ''))
-                ws.cell(row=row_num, column=7, value=str(f.get('photo_date', ''))[:19] if f.get('photo_date') else '')
-                ws.cell(row=row_num, column=8, value=distance)
-                row_num += 1
-    
-    # Kolon genişlikleri
-    column_widths = [12, 12, 12, 25, 15, 35, 18, 12]
-    for i, width in enumerate(column_widths, 1):
-        ws.column_dimensions[ws.cell(row=1, column=i).column_letter].width = width
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'{project}_mesafe_uyari_raporu.xlsx'
-    )
+    return send_report('distance-alerts', project)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,11 @@
+"""
+Benchmarks - Çevrimdışı Performans Ölçümleri
+=============================================
+Canlı SQL Server (192.168.10.2) yerine yerel bir SQL Server'a (Docker
+mcr.microsoft.com/mssql/server veya LocalDB/Express) sentetik veri üretir,
+kaynak fonksiyonlarını, cache builder'ları ve Excel raporlarını ölçer ve
+regresyon karşılaştırması için JSON baseline yazar.
+
+    python -m benchmarks.run --scale s --output benchmarks/results/baseline.json
+    python -m benchmarks.run --scale s --skip-generate --compare benchmarks/results/baseline.json
+"""
@@ -0,0 +1,291 @@
+"""
+Sentetik veri üretimi
+=====================
+Tüm satırlar sunucu tarafında küme tabanlı T-SQL (tally CTE + INSERT ... SELECT)
+ile üretilir; Python'dan satır taşınmaz. Dağılımlar Id'lerden türetilir
+(rastgelelik yok), yani aynı ölçek aynı gün aynı veriyi üretir. Tarihler
+çalıştırıldığı güne göredir ki "son 7 gün" gibi aralıklar dolu olsun.
+
+    python -m benchmarks.datagen --scale s
+"""
+
+import argparse
+import hashlib
+import time
+
+from config import PROJECTS
+from . import local_db
+from .settings import BENCH_DB, SCALES, DATA_PROFILE, BENCH_PROJECT
+
+# 10^8 satıra kadar sayı üreten tally CTE (sistem tablolarına bağımlı değil)
+TALLY_CTE = """
+WITH L0 AS (SELECT 1 AS c FROM (VALUES (1),(1),(1),(1),(1),(1),(1),(1),(1),(1)) AS v(c)),
+     L1 AS (SELECT 1 AS c FROM L0 a CROSS JOIN L0 b),
+     L2 AS (SELECT 1 AS c FROM L1 a CROSS JOIN L1 b),
+     L3 AS (SELECT 1 AS c FROM L2 a CROSS JOIN L2 b),
+     Tally AS (SELECT TOP ({count}) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n FROM L3)
+"""
+
+BENCH_PASSWORD = 'bench'
+BENCH_VERIFIERS = 5
+
+
+def plan(total_photos: int, project_key: str) -> dict:
+    """Toplam fotoğraf sayısından tablo bazında satır sayılarını hesaplar."""
+    tables = PROJECTS[project_key]['photo_tables']
+    exhibition_per_visit = DATA_PROFILE['exhibition_per_visit'] if 'exhibition' in tables else 0
+    planogram_per_visit = DATA_PROFILE['planogram_per_visit'] if 'planogram' in tables else 0
+    per_visit = exhibition_per_visit + planogram_per_visit + (1 if 'visit' in tables else 0)
+
+    visits = max(1, total_photos // max(per_visit, 1))
+    return {
+        'photo_tables': list(tables),
+        'visits': visits,
+        'exhibition': visits * exhibition_per_visit,
+        'planogram': visits * planogram_per_visit,
+        'visit_photos': visits if 'visit' in tables else 0,
+        'exhibition_per_visit': max(exhibition_per_visit, 1),
+        'planogram_per_visit': max(planogram_per_visit, 1),
+        'users': max(10, visits // DATA_PROFILE['visits_per_user']),
+        'customers': max(50, visits // DATA_PROFILE['visits_per_customer']),
+        'days': DATA_PROFILE['days'],
+    }
+
+
+def _every(ratio: float) -> int:
+    """Oranı "her N satırda bir" değerine çevirir (0 -> hiç)."""
+    return max(1, round(1 / ratio)) if ratio > 0 else 2 ** 31 - 1
+
+
+# ==================== İFADELER ====================
+# Aynı Id için her tabloda aynı değeri üreten T-SQL ifadeleri
+
+def _visit_start(n: str, p: dict) -> str:
+    return f"DATEADD(second, 28800 + ({n} * 7919) % 36000, DATEADD(day, -(({n} - 1) % {p['days']}), @today))"
+
+
+def _visit_user(n: str, p: dict) -> str:
+    return f"((({n}) - 1) % {p['users']}) + 1"
+
+
+def _visit_customer(n: str, p: dict) -> str:
+    return f"((({n}) * 7919) % {p['customers']}) + 1"
+
+
+def _customer_code(c: str) -> str:
+    return f"'C' + RIGHT('0000000' + CAST({c} AS VARCHAR(10)), 7)"
+
+
+def _customer_lat(c: str) -> str:
+    return f"(41.0 + ({c} % 1000) * 0.0005)"
+
+
+def _customer_lon(c: str) -> str:
+    return f"(28.8 + (({c} * 37) % 1000) * 0.0005)"
+
+
+def _image_path(started: str, prefix: str, photo_id: str) -> str:
+    root = DATA_PROFILE['image_root'].replace("'", "''")
+    return (f"N'{root}\\' + REPLACE(CONVERT(CHAR(10), {started}, 111), '/', '\\') "
+            f"+ '\\{prefix}_' + CAST({photo_id} AS VARCHAR(12)) + '.jpg'")
+
+
+# ==================== PROJE VERİTABANI ====================
+
+def _project_batches(p: dict, role_id: int) -> list:
+    """(açıklama, T-SQL) listesi."""
+    far_every = _every(DATA_PROFILE['far_visit_ratio'])
+    today = "DECLARE @today DATETIME = CAST(CAST(GETDATE() AS DATE) AS DATETIME);"
+    batches = [
+        ('Users', TALLY_CTE.format(count=p['users']) + """
+            INSERT INTO Users WITH (TABLOCK) (Id, Name, Surname, IsDeleted)
+            SELECT n, N'Personel' + CAST(n AS NVARCHAR(10)),
+                   CASE n % 4 WHEN 0 THEN N'Yılmaz' WHEN 1 THEN N'Kaya' WHEN 2 THEN N'Demir' ELSE N'Şahin' END,
+                   0
+            FROM Tally
+        """),
+        ('UserRoles', TALLY_CTE.format(count=p['users']) + f"""
+            INSERT INTO UserRoles WITH (TABLOCK) (UserId, RoleId, IsDeleted)
+            SELECT n, CASE WHEN n % 10 = 0 THEN {role_id + 1} ELSE {role_id} END, 0
+            FROM Tally
+        """),
+        ('Customers', TALLY_CTE.format(count=p['customers']) + f"""
+            INSERT INTO Customers WITH (TABLOCK) (CustomerCode, CustomerName, Latitude, Longitude)
+            SELECT {_customer_code('n')}, N'Mağaza ' + CAST(n AS NVARCHAR(10)),
+                   {_customer_lat('n')}, {_customer_lon('n')}
+            FROM Tally
+        """),
+        ('TeammateRoute', TALLY_CTE.format(count=p['visits']) + f"""
+            INSERT INTO TeammateRoute WITH (TABLOCK) (Id, CustomerId)
+            SELECT n, {_customer_code(_visit_customer('n', p))}
+            FROM Tally
+        """),
+        ('TeammateVisit', today + TALLY_CTE.format(count=p['visits']) + f"""
+            INSERT INTO TeammateVisit WITH (TABLOCK)
+                (Id, TeammateRouteId, UserId, StartDate, FinishDate, CreatedDate, ImagePath, Latitude, Longitude, IsDeleted)
+            SELECT n, n, {_visit_user('n', p)}, s.started, DATEADD(minute, 20, s.started), s.started,
+                   {_image_path('s.started', 'v', 'n')},
+                   {_customer_lat('x.c')} + CASE WHEN n % {far_every} = 0 THEN 0.05 ELSE ((n * 13) % 10) * 0.0001 END,
+                   {_customer_lon('x.c')},
+                   CASE WHEN n % 200 = 0 THEN 1 ELSE 0 END
+            FROM Tally
+            CROSS APPLY (SELECT {_visit_start('n', p)} AS started) s
+            CROSS APPLY (SELECT {_visit_customer('n', p)} AS c) x
+        """),
+    ]
+
+    if p['exhibition']:
+        per_visit = p['exhibition_per_visit']
+        batches.append(('TeammateVisitExhibition', today + TALLY_CTE.format(count=p['exhibition']) + f"""
+            INSERT INTO TeammateVisitExhibition WITH (TABLOCK)
+                (Id, TeammateVisitId, ImagePath, CreatedDate, Type, PackageQuantity, ProductQuantity, IsDeleted)
+            SELECT n, x.visit_id, {_image_path('s.created', 'e', 'n')}, s.created,
+                   n % 3 + 1, n % 12, n % 30,
+                   CASE WHEN n % 250 = 0 THEN 1 ELSE 0 END
+            FROM Tally
+            CROSS APPLY (SELECT ((n - 1) / {per_visit}) + 1 AS visit_id) x
+            CROSS APPLY (SELECT DATEADD(minute, 1 + (n - 1) % {per_visit}, {_visit_start('x.visit_id', p)}) AS created) s
+        """))
+
+    if p['planogram']:
+        per_visit = p['planogram_per_visit']
+        batches.append(('TeammateVisitPlanogram', today + TALLY_CTE.format(count=p['planogram']) + f"""
+            INSERT INTO TeammateVisitPlanogram WITH (TABLOCK)
+                (Id, TeammateVisitId, ImagePath, BeforeImagePath, CreatedDate, LidQuantity, IsDeleted)
+            SELECT n, x.visit_id, {_image_path('s.created', 'p', 'n')}, {_image_path('s.created', 'pb', 'n')},
+                   s.created, n % 8,
+                   CASE WHEN n % 250 = 0 THEN 1 ELSE 0 END
+            FROM Tally
+            CROSS APPLY (SELECT ((n - 1) / {per_visit}) + 1 AS visit_id) x
+            CROSS APPLY (SELECT DATEADD(minute, 10 + (n - 1) % {per_visit}, {_visit_start('x.visit_id', p)}) AS created) s
+        """))
+
+    return batches
+
+
+# ==================== PHOTOVERIFIER VERİTABANI ====================
+
+def _pv_batches(p: dict, project_key: str) -> list:
+    project_db = BENCH_DB['project_database']
+    dup_every = _every(DATA_PROFILE['duplicate_ratio'])
+    verified_pct = round(DATA_PROFILE['verified_ratio'] * 100)
+    password_hash = hashlib.sha256(BENCH_PASSWORD.encode()).hexdigest()
+
+    users = [f"('bench_admin', '{password_hash}', N'Benchmark Admin', 'Admin')"]
+    users += [f"('bench_user{i}', '{password_hash}', N'Benchmark Kullanıcı {i}', 'Viewer')"
+              for i in range(1, BENCH_VERIFIERS + 1)]
+    batches = [('Users', "INSERT INTO Users (Username, PasswordHash, DisplayName, Role) VALUES " + ', '.join(users))]
+
+    # Fotoğraf anahtarı türler arasında tekil; her dup_every'inci fotoğraf bir öncekinin hash'ini alır
+    sources = [
+        ('exhibition', 'TeammateVisitExhibition', 't.TeammateVisitId', 't.CreatedDate', 0),
+        ('planogram', 'TeammateVisitPlanogram', 't.TeammateVisitId', 't.CreatedDate', p['exhibition']),
+        ('visit', 'TeammateVisit', 't.Id', 't.StartDate', p['exhibition'] + p['planogram']),
+    ]
+    for photo_type, table, visit_column, date_column, offset in sources:
+        if photo_type not in p['photo_tables']:
+            continue
+        batches.append((f'PhotoHashes ({photo_type})', f"""
+            INSERT INTO PhotoHashes WITH (TABLOCK)
+                (Project, PhotoType, PhotoId, VisitId, Md5Hash, FileSize, ImagePath, CreatedAt)
+            SELECT '{project_key}', '{photo_type}', t.Id, {visit_column},
+                   LOWER(CONVERT(CHAR(32), HASHBYTES('MD5', CAST(k.hash_key AS VARCHAR(20))), 2)),
+                   150000 + (k.photo_key * 7919) % 400000,
+                   t.ImagePath, {date_column}
+            FROM [{project_db}].dbo.{table} t
+            CROSS APPLY (SELECT CAST(t.Id AS BIGINT) + {offset} AS photo_key) pk
+            CROSS APPLY (SELECT pk.photo_key,
+                                CASE WHEN pk.photo_key % {dup_every} = 0 THEN pk.photo_key - 1 ELSE pk.photo_key END AS hash_key) k
+            WHERE t.ImagePath IS NOT NULL AND t.IsDeleted = 0
+        """))
+
+    batches.append(('Verifications', f"""
+        INSERT INTO Verifications WITH (TABLOCK)
+            (Project, PhotoType, PhotoId, VisitId, Status, Note, VerifiedAt, VerifiedBy)
+        SELECT Project, PhotoType, PhotoId, VisitId,
+               CASE (Id * 31) % 10 WHEN 7 THEN 'rejected' WHEN 8 THEN 'rejected' WHEN 9 THEN 'suspicious' ELSE 'approved' END,
+               CASE WHEN (Id * 31) % 10 >= 7 THEN N'Benchmark notu' END,
+               DATEADD(hour, 2 + Id % 48, CreatedAt),
+               1 + Id % {BENCH_VERIFIERS + 1}
+        FROM PhotoHashes
+        WHERE Project = '{project_key}' AND (Id * 7919) % 100 < {verified_pct}
+    """))
+
+    event_count = int(sum(p[k] for k in ('exhibition', 'planogram', 'visit_photos')) * DATA_PROFILE['event_logs_per_photo'])
+    if event_count:
+        batches.append(('EventLogs', TALLY_CTE.format(count=event_count) + f"""
+            INSERT INTO EventLogs WITH (TABLOCK) (UserId, Username, Action, Project, Details, IpAddress, CreatedAt)
+            SELECT u.user_id,
+                   CASE WHEN u.user_id = 1 THEN 'bench_admin' ELSE 'bench_user' + CAST(u.user_id - 1 AS VARCHAR(3)) END,
+                   CASE n % 10 WHEN 0 THEN 'Login' WHEN 1 THEN 'Logout' WHEN 2 THEN 'LoginFailed' ELSE 'Verify' END,
+                   CASE WHEN n % 10 < 3 THEN NULL ELSE '{project_key}' END,
+                   CASE WHEN n % 10 < 3 THEN NULL ELSE 'exhibition #' + CAST(n AS VARCHAR(12)) + ' -> approved' END,
+                   '10.0.0.' + CAST(n % 250 AS VARCHAR(3)),
+                   DATEADD(second, -((n * 7919) % {p['days'] * 86400}), GETDATE())
+            FROM Tally
+            CROSS APPLY (SELECT 1 + n % {BENCH_VERIFIERS + 1} AS user_id) u
+        """))
+
+    return batches
+
+
+# ==================== ÇALIŞTIRMA ====================
+
+def _run_batches(database: str, batches: list, timings: dict):
+    conn = local_db.connect(database, autocommit=True)
+    cursor = conn.cursor()
+    for name, sql in batches:
+        started = time.perf_counter()
+        cursor.execute(sql)
+        elapsed = time.perf_counter() - started
+        timings[f'{database}.{name}'] = round(elapsed, 2)
+        print(f"  {name}: {cursor.rowcount} satır, {elapsed:.1f} sn")
+    conn.close()
+
+
+def generate(total_photos: int, project_key: str = BENCH_PROJECT) -> dict:
+    """Benchmark veritabanlarını sıfırdan oluşturur ve sentetik veriyle doldurur."""
+    p = plan(total_photos, project_key)
+    role_id = PROJECTS[project_key].get('filters', {}).get('user_role_id', 4)
+    project_db = BENCH_DB['project_database']
+    pv_db = BENCH_DB['pv_database']
+    timings = {}
+    started = time.perf_counter()
+
+    print(f"🧪 Sentetik veri: {project_key} ({total_photos:,} fotoğraf) -> {BENCH_DB['host']}")
+    print(f"  Plan: {p}")
+
+    for database in (project_db, pv_db):
+        local_db.recreate_database(database)
+
+    local_db.run_script(project_db, f'{local_db.BENCH_DIR}/schema_project.sql')
+    local_db.run_script(pv_db, f'{local_db.BENCH_DIR}/schema_photoverifier.sql')
+    for script in local_db.migration_scripts():
+        print(f"  Migration: {script}")
+        local_db.run_script(pv_db, script)
+
+    _run_batches(project_db, _project_batches(p, role_id), timings)
+
+    index_started = time.perf_counter()
+    local_db.run_script(project_db, f'{local_db.BENCH_DIR}/schema_indexes.sql')
+    timings[f'{project_db}.indexes'] = round(time.perf_counter() - index_started, 2)
+
+    _run_batches(pv_db, _pv_batches(p, project_key), timings)
+
+    total = round(time.perf_counter() - started, 2)
+    print(f"✅ Veri hazır ({total} sn)")
+    return {'plan': p, 'timings': timings, 'total_seconds': total}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark veritabanlarını sentetik veriyle doldurur.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='xs')
+    parser.add_argument('--photos', type=int, help='Toplam fotoğraf sayısı (--scale yerine)')
+    parser.add_argument('--project', default=BENCH_PROJECT, choices=sorted(PROJECTS))
+    args = parser.parse_args()
+
+    generate(args.photos or SCALES[args.scale], args.project)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Sentetik görüntü ağacı
+======================
+Benchmark veritabanındaki ImagePath'lerden Image\\YYYY\\MM\\DD\\<ad>.jpg düzeninde
+dosyalar üretir. Boyutlar log-normal dağılır; belirli oranda birebir kopya
+(duplicate), birkaç byte farklı kopya (near-duplicate) ve eksik dosya bulunur.
+İçerik yoldan türetilen tohumla üretilir, yani aynı veri aynı ağacı verir.
+
+    python -m benchmarks.image_tree --project efes
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import time
+import zlib
+
+from config import PROJECTS
+from sources import get_source
+from . import local_db
+from .settings import BENCH_DB, BENCH_PROJECT, IMAGE_TREE
+
+_TABLES = {
+    'exhibition': 'TeammateVisitExhibition',
+    'planogram': 'TeammateVisitPlanogram',
+    'visit': 'TeammateVisit',
+}
+
+JPEG_HEADER = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00'
+JPEG_FOOTER = b'\xff\xd9'
+
+
+def image_root() -> str:
+    root = IMAGE_TREE['root']
+    if not os.path.isabs(root):
+        root = os.path.join(local_db.REPO_DIR, root)
+    return root
+
+
+def _iter_image_paths(project_key: str, days: int, batch: int = 5000):
+    """Proje DB'sinden (ImagePath) akışı - silinmemiş ve son `days` gün."""
+    conn = local_db.connect(BENCH_DB['project_database'])
+    cursor = conn.cursor()
+    for photo_type in PROJECTS[project_key]['photo_tables']:
+        date_column = 'StartDate' if photo_type == 'visit' else 'CreatedDate'
+        cursor.execute(f'''
+            SELECT ImagePath FROM {_TABLES[photo_type]}
+            WHERE ImagePath IS NOT NULL AND IsDeleted = 0
+              AND {date_column} >= DATEADD(day, -%s, CAST(GETDATE() AS DATE))
+            ORDER BY Id
+        ''', (days,))
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+    conn.close()
+
+
+def _every(ratio: float):
+    return max(1, round(1 / ratio)) if ratio > 0 else None
+
+
+def _file_size(rng: random.Random) -> int:
+    kb = rng.lognormvariate(math.log(IMAGE_TREE['median_kb']), IMAGE_TREE['sigma'])
+    return int(min(max(kb, IMAGE_TREE['min_kb']), IMAGE_TREE['max_kb']) * 1024)
+
+
+def generate(project_key: str = BENCH_PROJECT, days: int = 60, root: str = None, clean: bool = False) -> dict:
+    """Görüntü ağacını yazar ve özet istatistikleri döndürür."""
+    root = root or image_root()
+    if clean and os.path.isdir(root):
+        shutil.rmtree(root)
+
+    duplicate_every = _every(IMAGE_TREE['duplicate_ratio'])
+    near_every = _every(IMAGE_TREE['near_duplicate_ratio'])
+    missing_every = _every(IMAGE_TREE['missing_ratio'])
+    converter = get_source(project_key)._convert_image_path
+
+    stats = {'files': 0, 'bytes': 0, 'duplicates': 0, 'near_duplicates': 0, 'missing': 0}
+    created_dirs = set()
+    previous = None
+    started = time.perf_counter()
+
+    print(f"🖼️  Görüntü ağacı: {root}")
+    for i, db_path in enumerate(_iter_image_paths(project_key, days), start=1):
+        relative = converter(db_path)
+        if missing_every and i % missing_every == 0:
+            stats['missing'] += 1
+            continue
+
+        if previous is not None and duplicate_every and i % duplicate_every == 0:
+            content = previous
+            stats['duplicates'] += 1
+        elif previous is not None and near_every and i % near_every == 0:
+            # Yeniden kaydedilmiş / EXIF'i değişmiş kopya: içerik aynı, sonu farklı
+            content = previous[:-18] + zlib.crc32(relative.encode()).to_bytes(4, 'big') * 4 + JPEG_FOOTER
+            stats['near_duplicates'] += 1
+        else:
+            rng = random.Random(zlib.crc32(relative.encode()))
+            body_size = max(_file_size(rng) - len(JPEG_HEADER) - len(JPEG_FOOTER), 16)
+            content = JPEG_HEADER + rng.randbytes(body_size) + JPEG_FOOTER
+
+        path = os.path.join(root, *relative.split('/'))
+        directory = os.path.dirname(path)
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            created_dirs.add(directory)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        previous = content
+        stats['files'] += 1
+        stats['bytes'] += len(content)
+        if stats['files'] % 10000 == 0:
+            print(f"  {stats['files']} dosya, {stats['bytes'] / 1048576:.0f} MB")
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    stats['root'] = root
+    print(f"✅ {stats['files']} dosya ({stats['bytes'] / 1048576:.0f} MB), "
+          f"{stats['duplicates']} kopya, {stats['near_duplicates']} benzer, {stats['missing']} eksik")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark verisinden sentetik görüntü ağacı üretir.')
+    parser.add_argument('--project', default=BENCH_PROJECT, choices=sorted(PROJECTS))
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--root', help=f"Hedef klasör (varsayılan: {IMAGE_TREE['root']})")
+    parser.add_argument('--clean', action='store_true', help='Önce hedef klasörü sil')
+    args = parser.parse_args()
+
+    local_db.use_local_databases(args.project)
+    generate(args.project, args.days, args.root, args.clean)
+
+
+if __name__ == '__main__':
+    main()
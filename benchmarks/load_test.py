@@ -0,0 +1,340 @@
+"""
+HTTP yük testi
+==============
+Uygulamayı yerel benchmark veritabanı ve sentetik görüntü ağacıyla waitress
+altında (ayrı süreçte) başlatır; sanal kullanıcılar giriş yapıp fotoğraf
+listesi, duplicate sayfası, görüntü, doğrulama ve rapor isteklerini ağırlıklı
+bir karışımla gönderir. Artan eşzamanlılık adımlarında rota bazında
+p50/p95/p99 gecikme ve throughput raporlanır.
+
+    python -m benchmarks.load_test --mix browse --output benchmarks/results/load.json
+    python -m benchmarks.load_test --threads 8 --concurrency 4 --concurrency 16
+    python -m benchmarks.load_test --url http://localhost:5555   # çalışan sunucuya karşı
+"""
+
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+import config
+from config import PROJECTS
+from . import local_db
+from .datagen import BENCH_PASSWORD
+from .settings import BENCH_PROJECT, LOAD_TEST
+
+VIEWER_USERS = [f'bench_user{i}' for i in range(1, 6)]
+
+_PHOTO_RE = re.compile(r"verifyPhoto\('[^']*', (\d+), '(\w+)'")
+_IMAGE_RE = re.compile(r'src="(/image/[^"]+)"')
+
+
+# ==================== SUNUCU ====================
+
+def serve(project_key: str, port: int, threads: int, root: str):
+    """Alt süreç: uygulamayı benchmark veritabanlarıyla waitress altında çalıştırır."""
+    from waitress import serve as waitress_serve
+
+    local_db.use_local_databases(project_key)
+    config.PROJECTS[project_key]['image_path'] = root
+    from app import app
+    waitress_serve(app, host='127.0.0.1', port=port, threads=threads)
+
+
+def start_server(project_key: str, port: int, threads: int, root: str):
+    command = [sys.executable, '-m', 'benchmarks.load_test', '--serve', '--project', project_key,
+               '--port', str(port), '--threads', str(threads), '--root', root]
+    process = subprocess.Popen(command, cwd=local_db.REPO_DIR)
+    base_url = f'http://127.0.0.1:{port}'
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Sunucu başlamadı (çıkış kodu {process.returncode})")
+        try:
+            urllib.request.urlopen(base_url + '/login', timeout=2).read()
+            return process, base_url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('Sunucu 60 sn içinde hazır olmadı')
+
+
+# ==================== İSTEMCİ ====================
+
+class Client:
+    """Kendi cookie'siyle oturum açan sanal kullanıcı."""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def request(self, path: str, data: bytes = None, headers: dict = None) -> tuple:
+        """(başarılı mı, durum kodu, byte) döndürür; gövde sonuna kadar okunur."""
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers or {})
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                size = 0
+                while True:
+                    chunk = response.read(65536)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                # login_required yönlendirmesi = oturum kaybı
+                ok = not urllib.parse.urlparse(response.geturl()).path.startswith('/login')
+                return ok, response.status, size
+        except urllib.error.HTTPError as e:
+            return False, e.code, len(e.read() or b'')
+        except Exception:
+            return False, 0, 0
+
+    def request_report(self, path: str, poll_seconds: float = 0.5) -> tuple:
+        """
+        Rapor akışının tamamı: iş başlatılır (POST path), durum hazır olana kadar poll
+        edilir, dosya indirilir. (başarılı mı, durum kodu, byte) döndürür.
+        """
+        deadline = time.perf_counter() + self.timeout
+        try:
+            req = urllib.request.Request(self.base_url + path, data=b'', method='POST')
+            with self.opener.open(req, timeout=self.timeout) as response:
+                job = json.loads(response.read())
+            while job.get('status') not in ('done', 'failed') and not job.get('error'):
+                if time.perf_counter() > deadline:
+                    return False, 0, 0
+                time.sleep(poll_seconds)
+                with self.opener.open(f"{self.base_url}/api/reports/jobs/{job['job_id']}",
+                                      timeout=self.timeout) as response:
+                    job = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return False, e.code, len(e.read() or b'')
+        except Exception:
+            return False, 0, 0
+        if job.get('status') != 'done':
+            return False, 500, 0
+        return self.request(job['download_url'])
+
+    def login(self, username: str):
+        body = urllib.parse.urlencode({'username': username, 'password': BENCH_PASSWORD}).encode()
+        # Başarılı girişte index'e yönlendirilir; hatada /login sayfası döner
+        ok, status, _ = self.request('/login', body)
+        if not ok:
+            raise RuntimeError(f"{username} giriş yapamadı (HTTP {status})")
+
+
+def discover(base_url: str, project_key: str, days: int) -> tuple:
+    """Fotoğraf sayfalarından doğrulanacak (PhotoId, tür) ve görüntü URL havuzlarını toplar."""
+    client = Client(base_url, LOAD_TEST['timeout'])
+    client.login(VIEWER_USERS[0])
+    photos, images = [], []
+    for photo_type in PROJECTS[project_key]['photo_tables']:
+        req = urllib.request.Request(f"{base_url}/{project_key}/photos?type={photo_type}&days={days}")
+        html = client.opener.open(req, timeout=client.timeout).read().decode('utf-8', 'replace')
+        photos += [(int(photo_id), t) for photo_id, t in _PHOTO_RE.findall(html)]
+        images += _IMAGE_RE.findall(html)
+    if not photos or not images:
+        raise RuntimeError('Fotoğraf sayfalarında doğrulanacak fotoğraf / görüntü bulunamadı')
+    return photos, images
+
+
+class Workload:
+    """Rota karışımından rastgele istek üretir."""
+
+    def __init__(self, project_key: str, mix: dict, days: int, photos: list, images: list):
+        self.project_key = project_key
+        self.routes = list(mix)
+        self.weights = [mix[r] for r in self.routes]
+        self.days = days
+        self.photos = photos
+        self.images = images
+        self.photo_types = PROJECTS[project_key]['photo_tables']
+
+    def next_request(self, rng: random.Random) -> tuple:
+        """(rota, path, data, headers)."""
+        route = rng.choices(self.routes, self.weights)[0]
+        p = self.project_key
+        if route == 'photos':
+            return route, f"/{p}/photos?type={rng.choice(self.photo_types)}&days={self.days}", None, None
+        if route == 'image':
+            return route, urllib.parse.quote(rng.choice(self.images)), None, None
+        if route == 'duplicates':
+            return route, f"/{p}/duplicates", None, None
+        if route == 'stats':
+            return route, f"/api/{p}/stats?days={self.days}", None, None
+        if route == 'verify':
+            photo_id, photo_type = rng.choice(self.photos)
+            body = json.dumps({'photo_id': photo_id, 'photo_type': photo_type, 'note': 'load test',
+                               'status': rng.choice(('approved', 'rejected', 'suspicious'))}).encode()
+            return route, f"/api/{p}/verify", body, {'Content-Type': 'application/json'}
+        if route == 'report':
+            # İş başlat + poll + indir (Client.request_report)
+            return route, f"/api/{p}/reports/{rng.choice(LOAD_TEST['reports'])}/jobs", None, None
+        raise ValueError(f"Bilinmeyen rota: {route}")
+
+
+# ==================== ÖLÇÜM ====================
+
+def _percentile(values: list, pct: float) -> float:
+    """Sıralı listede en yakın sıra yöntemiyle yüzdelik."""
+    if not values:
+        return 0.0
+    index = min(len(values), max(1, math.ceil(pct / 100 * len(values)))) - 1
+    return values[index]
+
+
+def _summarize(samples: list, seconds: float) -> dict:
+    latencies = sorted(s[1] for s in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if not s[2]),
+        'rps': round(len(samples) / seconds, 2),
+        'mb_per_s': round(sum(s[3] for s in samples) / 1048576 / seconds, 2),
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def run_step(base_url: str, workload: Workload, concurrency: int, warmup: float, duration: float,
+             think_ms: int) -> dict:
+    """concurrency sanal kullanıcıyla warmup + duration sn yük uygular; rota bazında özet döndürür."""
+    clients = []
+    for i in range(concurrency):
+        client = Client(base_url, LOAD_TEST['timeout'])
+        client.login(VIEWER_USERS[i % len(VIEWER_USERS)])
+        clients.append(client)
+
+    samples = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def user_loop(client: Client, seed: int):
+        rng = random.Random(seed)
+        local = []
+        while True:
+            request_started = time.perf_counter()
+            if request_started >= stop_at:
+                break
+            route, path, data, headers = workload.next_request(rng)
+            if route == 'report':
+                ok, status, size = client.request_report(path)
+            else:
+                ok, status, size = client.request(path, data, headers)
+            finished = time.perf_counter()
+            # Adım sonunu aşan istekler de sayılır; sadece ısınmadakiler atılır
+            if request_started >= measure_from:
+                local.append((route, finished - request_started, ok, size, status))
+            if think_ms:
+                time.sleep(think_ms / 1000)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=user_loop, args=(client, concurrency * 1000 + i), daemon=True)
+               for i, client in enumerate(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = max(time.perf_counter() - measure_from, 1e-9)
+
+    routes = {}
+    for route in workload.routes:
+        route_samples = [s for s in samples if s[0] == route]
+        if route_samples:
+            routes[route] = _summarize(route_samples, elapsed)
+            routes[route]['statuses'] = sorted({s[4] for s in route_samples})
+    return {'concurrency': concurrency, 'seconds': round(elapsed, 2),
+            'total': _summarize(samples, elapsed), 'routes': routes}
+
+
+def _print_step(step: dict):
+    print(f"\n👥 Eşzamanlı kullanıcı: {step['concurrency']} ({step['seconds']} sn)")
+    print(f"  {'Rota':<12} {'İstek':>7} {'Hata':>6} {'İstek/sn':>9} {'MB/sn':>7} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in list(step['routes'].items()) + [('TOPLAM', step['total'])]:
+        print(f"  {name:<12} {r['requests']:>7} {r['errors']:>6} {r['rps']:>9.2f} {r['mb_per_s']:>7.2f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Waitress altında HTTP yük testi.')
+    parser.add_argument('--project', default=BENCH_PROJECT, choices=sorted(PROJECTS))
+    parser.add_argument('--url', help='Çalışan bir sunucuya karşı test et (sunucu başlatılmaz)')
+    parser.add_argument('--port', type=int, default=LOAD_TEST['port'])
+    parser.add_argument('--threads', type=int, default=LOAD_TEST['threads'], help='waitress thread sayısı')
+    parser.add_argument('--concurrency', type=int, action='append', help='Eşzamanlı kullanıcı (tekrarlanabilir)')
+    parser.add_argument('--step-seconds', type=float, default=LOAD_TEST['step_seconds'])
+    parser.add_argument('--warmup-seconds', type=float, default=LOAD_TEST['warmup_seconds'])
+    parser.add_argument('--think-ms', type=int, default=LOAD_TEST['think_ms'])
+    parser.add_argument('--mix', default='browse', choices=sorted(LOAD_TEST['mixes']))
+    parser.add_argument('--days', type=int, default=7, help='Fotoğraf listesi / istatistik gün aralığı')
+    parser.add_argument('--root', help='Görüntü ağacı klasörü (varsayılan: IMAGE_TREE root)')
+    parser.add_argument('--output', help='Sonuç JSON dosyası')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from .image_tree import image_root
+    root = os.path.abspath(args.root or image_root())
+
+    if args.serve:
+        serve(args.project, args.port, args.threads, root)
+        return
+
+    process = None
+    base_url = args.url.rstrip('/') if args.url else None
+    if not base_url:
+        if not os.path.isdir(root):
+            print(f"⚠️  Görüntü ağacı yok ({root}); önce: python -m benchmarks.image_tree")
+        process, base_url = start_server(args.project, args.port, args.threads, root)
+
+    steps = []
+    try:
+        photos, images = discover(base_url, args.project, args.days)
+        workload = Workload(args.project, LOAD_TEST['mixes'][args.mix], args.days, photos, images)
+        print(f"🎯 {base_url} - karışım={args.mix}, waitress threads={args.threads}, "
+              f"{len(photos)} fotoğraf / {len(images)} görüntü havuzu")
+        for concurrency in args.concurrency or LOAD_TEST['concurrency']:
+            step = run_step(base_url, workload, concurrency, args.warmup_seconds, args.step_seconds, args.think_ms)
+            _print_step(step)
+            steps.append(step)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'project': args.project,
+                    'url': args.url,
+                    'threads': None if args.url else args.threads,
+                    'mix': args.mix,
+                    'weights': LOAD_TEST['mixes'][args.mix],
+                    'step_seconds': args.step_seconds,
+                    'think_ms': args.think_ms,
+                },
+                'steps': steps,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
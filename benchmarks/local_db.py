@@ -0,0 +1,84 @@
+"""
+Yerel SQL Server bağlantıları ve uygulama konfigürasyonunun yerinde değiştirilmesi.
+"""
+
+import glob
+import os
+import re
+
+import config
+from sources import db
+from .settings import BENCH_DB
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_DIR, 'benchmarks')
+
+_GO = re.compile(r'^\s*GO\s*$', re.I | re.M)
+
+
+def db_config(database: str) -> dict:
+    """BENCH_DB ayarlarından uygulamanın kullandığı formatta bağlantı sözlüğü."""
+    return {
+        'host': BENCH_DB['host'],
+        'port': BENCH_DB.get('port', 1433),
+        'username': BENCH_DB['username'],
+        'password': BENCH_DB['password'],
+        'database': database,
+    }
+
+
+def connect(database: str, autocommit: bool = False):
+    """Ölçümsüz bağlantı (veri üretimi metriklere karışmasın)."""
+    conn = db.connect(db_config(database), instrumented=False)
+    if autocommit:
+        conn.autocommit(True)
+    return conn
+
+
+def use_local_databases(project_key: str):
+    """
+    config modülündeki sözlükleri yerinde değiştirir; uygulama, builder'lar ve
+    raporlar canlı sunucu yerine yerel benchmark veritabanlarına bağlanır.
+    """
+    server = {k: BENCH_DB[k] for k in ('host', 'port', 'username', 'password')}
+    config.DB_CONFIG.update(server)
+    config.PHOTOVERIFIER_DB.update(server, database=BENCH_DB['pv_database'])
+    config.PROJECTS[project_key]['database'] = BENCH_DB['project_database']
+
+    # Daha önce oluşturulmuş source varsa eski bağlantı bilgisiyle kalmasın
+    import sources
+    sources._sources.pop(project_key, None)
+
+
+def recreate_database(name: str):
+    """Veritabanını silip yeniden oluşturur (SIMPLE recovery - toplu yüklemede log büyümesin)."""
+    conn = connect('master', autocommit=True)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        IF DB_ID(N'{name}') IS NOT NULL
+        BEGIN
+            ALTER DATABASE [{name}] SET SINGLE_USER WITH ROLLBACK IMMEDIATE;
+            DROP DATABASE [{name}];
+        END
+    """)
+    cursor.execute(f"CREATE DATABASE [{name}]")
+    cursor.execute(f"ALTER DATABASE [{name}] SET RECOVERY SIMPLE")
+    conn.close()
+
+
+def run_script(database: str, path: str):
+    """GO ile ayrılmış T-SQL betiğini çalıştırır."""
+    with open(path, encoding='utf-8') as f:
+        batches = [b.strip() for b in _GO.split(f.read())]
+
+    conn = connect(database, autocommit=True)
+    cursor = conn.cursor()
+    for batch in batches:
+        if any(line.strip() and not line.strip().startswith('--') for line in batch.splitlines()):
+            cursor.execute(batch)
+    conn.close()
+
+
+def migration_scripts() -> list:
+    """sql/NNN_*.sql migration'ları (sıralı)."""
+    return sorted(glob.glob(os.path.join(REPO_DIR, 'sql', '*.sql')))
@@ -0,0 +1,271 @@
+"""
+Benchmark çalıştırıcı
+=====================
+Yerel benchmark veritabanlarına karşı kaynak fonksiyonlarını, cache builder'ları
+ve Excel raporlarını ölçer; JSON baseline yazar ve istenirse önceki bir
+baseline ile karşılaştırır (regresyon varsa çıkış kodu 1).
+
+    python -m benchmarks.run --scale s --output benchmarks/results/s.json
+    python -m benchmarks.run --scale s --skip-generate --compare benchmarks/results/s.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from config import PROJECTS, VERIFICATION_INDEX
+from . import local_db
+from .settings import SCALES, BENCH_PROJECT, RUN_DEFAULTS
+
+
+def _db_totals(metrics) -> tuple:
+    """Tüm veritabanları için toplam (sorgu sayısı, süre)."""
+    databases = metrics.snapshot()['databases']
+    return (sum(d['queries'] for d in databases.values()),
+            sum(d['seconds'] for d in databases.values()))
+
+
+def _size(value):
+    if isinstance(value, (list, dict, bytes)):
+        return len(value)
+    return None
+
+
+class Bench:
+    """Ölçüm sonuçlarını toplar."""
+
+    def __init__(self, repeat: int, only: list = None, skip: list = None):
+        self.repeat = repeat
+        self.only = only or []
+        self.skip = skip or []
+        self.results = {}
+
+    def _selected(self, name: str) -> bool:
+        if self.only and not any(name.startswith(prefix) for prefix in self.only):
+            return False
+        return not any(name.startswith(prefix) for prefix in self.skip)
+
+    def measure(self, name: str, fn, repeat: int = None, setup=None):
+        """fn'i repeat kez çalıştırır; süre, sorgu sayısı ve sonuç boyutunu kaydeder."""
+        if not self._selected(name):
+            return None
+        import metrics
+
+        runs = []
+        value = None
+        for _ in range(repeat or self.repeat):
+            if setup:
+                setup()
+            queries_before, db_seconds_before = _db_totals(metrics)
+            started = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - started
+            queries_after, db_seconds_after = _db_totals(metrics)
+            runs.append({
+                'seconds': elapsed,
+                'db_queries': queries_after - queries_before,
+                'db_seconds': db_seconds_after - db_seconds_before,
+            })
+
+        seconds = [r['seconds'] for r in runs]
+        self.results[name] = {
+            'median_s': round(statistics.median(seconds), 4),
+            'min_s': round(min(seconds), 4),
+            'max_s': round(max(seconds), 4),
+            'runs': len(runs),
+            'db_queries': runs[-1]['db_queries'],
+            'db_seconds': round(runs[-1]['db_seconds'], 4),
+            'size': _size(value),
+        }
+        r = self.results[name]
+        print(f"  {name:<45} {r['median_s'] * 1000:>10.1f} ms  ({r['db_queries']} sorgu, boyut={r['size']})")
+        return value
+
+
+# ==================== SENARYOLAR ====================
+
+def run_cases(bench: Bench, project_key: str, photos: int, range_days: int):
+    """Tüm benchmark senaryoları (sıra önemli: canlı -> cache build -> cache)."""
+    import app as web
+    import duplicate_cache_builder
+    import overview
+    import photo_cache_builder
+    import report_jobs
+    from sources import get_source
+    from sources.verification_index import VerificationIndex
+
+    source = get_source(project_key)
+    photo_types = PROJECTS[project_key]['photo_tables']
+    end = datetime.now()
+    end_date = end.strftime('%Y-%m-%d')
+    start_date = (end - timedelta(days=range_days - 1)).strftime('%Y-%m-%d')
+    month_start = (end - timedelta(days=29)).strftime('%Y-%m-%d')
+
+    print(f"\n⏱️  Ölçümler ({start_date} - {end_date}, tekrar={bench.repeat})")
+
+    # Doğrulama indeksi ilk yükleme (her çalıştırmada sıfırdan)
+    def reset_index():
+        source.verification_index = VerificationIndex(source, **VERIFICATION_INDEX)
+    bench.measure('verification_index.load', lambda: source.verification_index.lookup(photo_types[0], [1]),
+                  setup=reset_index)
+
+    bench.measure(f'get_stats.{range_days}d', lambda: source.get_stats(start_date, end_date))
+    bench.measure('get_stats.30d', lambda: source.get_stats(month_start, end_date))
+    bench.measure('get_personnel_list', lambda: source.get_personnel_list(start_date, end_date))
+    bench.measure('get_customer_list', lambda: source.get_customer_list(start_date, end_date))
+
+    # Fotoğraf listesi: cache boşken canlı sorgu, sonra cache ile
+    for photo_type in photo_types:
+        bench.measure(f'get_photos_grouped.{photo_type}.live',
+                      lambda t=photo_type: source.get_photos_grouped(t, start_date, end_date))
+
+    bench.measure('photo_cache_builder', lambda: photo_cache_builder.build_cache_for_project(project_key, days=range_days),
+                  repeat=1)
+
+    for photo_type in photo_types:
+        bench.measure(f'get_photos_grouped.{photo_type}.cache',
+                      lambda t=photo_type: source.get_photos_grouped(t, start_date, end_date))
+
+    # Tüm projeler özeti (fotoğraf sayıları cache'ten)
+    bench.measure(f'overview.{range_days}d', lambda: overview.build_overview(range_days))
+
+    # Duplicate tespiti (tek sorgu + toplu detay; maliyeti duplicate sayısıyla büyür, her ölçekte ölçülür)
+    bench.measure('find_duplicates', source.find_duplicates, repeat=1)
+    bench.measure('duplicate_cache_builder', lambda: duplicate_cache_builder.build_cache_for_project(project_key),
+                  repeat=1)
+    bench.measure('get_duplicates_from_cache', source.get_duplicates_from_cache)
+
+    # Excel raporları (Flask test client, admin oturumu)
+    client = web.app.test_client()
+    conn = local_db.connect(local_db.BENCH_DB['pv_database'])
+    cursor = conn.cursor()
+    cursor.execute("SELECT Id FROM Users WHERE Username = 'bench_admin'")
+    admin_id = cursor.fetchone()[0]
+    conn.close()
+    with client.session_transaction() as session:
+        session.update({'user_id': admin_id, 'username': 'bench_admin',
+                        'display_name': 'Benchmark Admin', 'role': 'Admin'})
+
+    def clear_report_cache():
+        shutil.rmtree(report_jobs.cache_dir(), ignore_errors=True)
+
+    # Sayfanın akışı: iş başlat, bitmesini bekle (poll yerine), dosyayı indir - hepsi tek ölçüm
+    for report in ('verifications', 'duplicates', 'distance-alerts'):
+        def fetch(url=f'/api/{project_key}/reports/{report}/jobs'):
+            response = client.post(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} -> {response.status_code}")
+            job = report_jobs.get(response.get_json()['job_id'])
+            job.wait()
+            if job.status != 'done':
+                raise RuntimeError(f"{url} -> {job.status}: {job.error}")
+            response = client.get(f'/reports/jobs/{job.id}/download')
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} indirme -> {response.status_code}")
+            return response.get_data()
+        bench.measure(f'report.{report}', fetch, setup=clear_report_cache)
+        bench.measure(f'report.{report}.cached', fetch)
+
+    web.event_log_writer.flush()
+
+
+# ==================== ÇIKTI / KARŞILAŞTIRMA ====================
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=local_db.REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Medyanı threshold oranından fazla artan ölçümleri döndürür (ve tabloyu yazdırır)."""
+    if baseline['meta'].get('photos') != current['meta'].get('photos'):
+        print(f"⚠️  Ölçek farklı: baseline {baseline['meta'].get('photos')} / şimdi {current['meta'].get('photos')}")
+
+    regressions = []
+    print(f"\n{'Ölçüm':<45} {'Baseline':>12} {'Şimdi':>12} {'Değişim':>9}")
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        old = baseline['results'].get(name)
+        new = current['results'].get(name)
+        if not old or not new:
+            print(f"{name:<45} {'-' if not old else old['median_s']:>12} {'-' if not new else new['median_s']:>12}")
+            continue
+        change = (new['median_s'] - old['median_s']) / old['median_s'] if old['median_s'] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  ❌ regresyon'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  ✅ iyileşme'
+        print(f"{name:<45} {old['median_s'] * 1000:>10.1f}ms {new['median_s'] * 1000:>10.1f}ms {change * 100:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Photo Verifier çevrimdışı benchmark.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='xs')
+    parser.add_argument('--photos', type=int, help='Toplam fotoğraf sayısı (--scale yerine)')
+    parser.add_argument('--project', default=BENCH_PROJECT, choices=sorted(PROJECTS))
+    parser.add_argument('--skip-generate', action='store_true', help='Mevcut benchmark verisini kullan')
+    parser.add_argument('--repeat', type=int, default=RUN_DEFAULTS['repeat'])
+    parser.add_argument('--range-days', type=int, default=RUN_DEFAULTS['range_days'])
+    parser.add_argument('--only', action='append', help='Sadece bu önekle başlayan ölçümler (tekrarlanabilir)')
+    parser.add_argument('--skip', action='append', help='Bu önekle başlayan ölçümleri atla (tekrarlanabilir)')
+    parser.add_argument('--output', help='Sonuç JSON dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak baseline JSON dosyası')
+    parser.add_argument('--threshold', type=float, default=RUN_DEFAULTS['regression_threshold'])
+    args = parser.parse_args()
+
+    photos = args.photos or SCALES[args.scale]
+    local_db.use_local_databases(args.project)
+
+    generation = None
+    if not args.skip_generate:
+        from .datagen import generate
+        generation = generate(photos, args.project)
+
+    bench = Bench(args.repeat, args.only, args.skip)
+    run_cases(bench, args.project, photos, args.range_days)
+
+    result = {
+        'meta': {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'project': args.project,
+            'photos': photos,
+            'repeat': args.repeat,
+            'range_days': args.range_days,
+            'generation': generation,
+        },
+        'results': bench.results,
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, result, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresyon: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ Regresyon yok")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Hash scanner benchmark
+======================
+Sentetik görüntü ağacına karşı hash_scanner.scan_project'i farklı worker /
+batch ayarlarıyla çalıştırır; dosya/sn, MB/sn, DB yazma/sn ve tepe bellek (RSS)
+raporlar. Her ayar ayrı bir süreçte ölçülür (RSS karışmasın, cache ısınmasın).
+
+    python -m benchmarks.scan_bench --images --output benchmarks/results/scan.json
+    python -m benchmarks.scan_bench --workers 1 --workers 8 --batch-size 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import config
+from config import PROJECTS
+from . import local_db
+from .settings import BENCH_DB, BENCH_PROJECT, SCAN_BENCH
+
+RESULT_PREFIX = 'RESULT_JSON '
+
+
+def _peak_rss_mb():
+    """Sürecin tepe bellek kullanımı (MB); ölçülemezse None."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux KB, macOS byte döndürür
+        return round(peak / (1048576 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        peak = getattr(memory, 'peak_wset', None)
+        return round(peak / 1048576, 1) if peak else None
+    except ImportError:
+        return None
+
+
+def _clear_hashes(project_key: str):
+    """Her ölçüm sıfırdan taransın diye projenin PhotoHashes kayıtlarını siler."""
+    conn = local_db.connect(BENCH_DB['pv_database'])
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM PhotoHashes WHERE Project = %s', (project_key,))
+    conn.commit()
+    conn.close()
+
+
+def run_single(project_key: str, days: int, workers: int, batch_size: int, root: str) -> dict:
+    """Alt süreçte tek ayarı ölçer."""
+    import hash_scanner
+
+    local_db.use_local_databases(project_key)
+    config.PROJECTS[project_key]['image_path'] = root
+    stats = hash_scanner.scan_project(project_key, days=days, workers=workers, batch_size=batch_size)
+    stats['peak_rss_mb'] = _peak_rss_mb()
+    return stats
+
+
+def run_config(project_key: str, days: int, workers: int, batch_size: int, root: str) -> dict:
+    """Bir ayarı temiz PhotoHashes ile ayrı süreçte çalıştırır ve oranları hesaplar."""
+    _clear_hashes(project_key)
+    command = [sys.executable, '-m', 'benchmarks.scan_bench', '--single',
+               '--project', project_key, '--days', str(days), '--root', root,
+               '--workers', str(workers), '--batch-size', str(batch_size)]
+    output = subprocess.run(command, cwd=local_db.REPO_DIR, capture_output=True, text=True)
+    lines = [line for line in output.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if output.returncode != 0 or not lines:
+        raise RuntimeError(f"workers={workers} batch={batch_size} başarısız:\n{output.stderr[-2000:]}")
+
+    stats = json.loads(lines[-1][len(RESULT_PREFIX):])
+    seconds = stats['seconds'] or 1e-9
+    files = stats['processed'] + stats['not_found'] + stats['errors']
+    stats.update({
+        'workers': workers,
+        'batch_size': batch_size,
+        'files_per_s': round(files / seconds, 1),
+        'mb_per_s': round(stats['bytes'] / 1048576 / seconds, 2),
+        'db_rows_per_s': round(stats['db_rows'] / seconds, 1),
+        'db_batches_per_s': round(stats['db_batches'] / seconds, 2),
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hash scanner throughput benchmark.')
+    parser.add_argument('--project', default=BENCH_PROJECT, choices=sorted(PROJECTS))
+    parser.add_argument('--days', type=int, default=SCAN_BENCH['days'])
+    parser.add_argument('--root', help='Görüntü ağacı klasörü (varsayılan: IMAGE_TREE root)')
+    parser.add_argument('--workers', type=int, action='append', help='Worker sayısı (tekrarlanabilir)')
+    parser.add_argument('--batch-size', type=int, action='append', help='INSERT batch boyutu (tekrarlanabilir)')
+    parser.add_argument('--images', action='store_true', help='Önce görüntü ağacını üret')
+    parser.add_argument('--clean', action='store_true', help='Görüntü ağacını silip yeniden üret')
+    parser.add_argument('--output', help='Sonuç JSON dosyası')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from .image_tree import image_root, generate
+    root = os.path.abspath(args.root or image_root())
+
+    if args.single:
+        stats = run_single(args.project, args.days, args.workers[0], args.batch_size[0], root)
+        print(RESULT_PREFIX + json.dumps(stats))
+        return
+
+    local_db.use_local_databases(args.project)
+    tree = None
+    if args.images or args.clean or not os.path.isdir(root):
+        tree = generate(args.project, args.days, root, clean=args.clean)
+
+    workers_list = args.workers or SCAN_BENCH['workers']
+    batch_sizes = args.batch_size or SCAN_BENCH['batch_sizes']
+
+    results = []
+    print(f"\n{'Workers':>8} {'Batch':>6} {'Dosya/sn':>10} {'MB/sn':>8} {'Satır/sn':>10} "
+          f"{'Batch/sn':>9} {'DB sn':>7} {'Süre sn':>8} {'RSS MB':>8}")
+    for workers in workers_list:
+        for batch_size in batch_sizes:
+            r = run_config(args.project, args.days, workers, batch_size, root)
+            results.append(r)
+            print(f"{workers:>8} {batch_size:>6} {r['files_per_s']:>10.1f} {r['mb_per_s']:>8.2f} "
+                  f"{r['db_rows_per_s']:>10.1f} {r['db_batches_per_s']:>9.2f} {r['db_seconds']:>7.2f} "
+                  f"{r['seconds']:>8.2f} {r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>8}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'project': args.project,
+                    'days': args.days,
+                    'root': root,
+                    'image_tree': tree,
+                },
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
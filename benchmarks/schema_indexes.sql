@@ -0,0 +1,10 @@
+-- Benchmark: proje veritabanı indeksleri (veri yüklendikten sonra oluşturulur)
+
+CREATE INDEX IX_TeammateVisit_CreatedDate ON TeammateVisit (CreatedDate);
+CREATE INDEX IX_TeammateVisit_UserId ON TeammateVisit (UserId);
+CREATE INDEX IX_TeammateVisit_TeammateRouteId ON TeammateVisit (TeammateRouteId);
+CREATE INDEX IX_TeammateVisitExhibition_CreatedDate ON TeammateVisitExhibition (CreatedDate);
+CREATE INDEX IX_TeammateVisitExhibition_TeammateVisitId ON TeammateVisitExhibition (TeammateVisitId);
+CREATE INDEX IX_TeammateVisitPlanogram_CreatedDate ON TeammateVisitPlanogram (CreatedDate);
+CREATE INDEX IX_TeammateVisitPlanogram_TeammateVisitId ON TeammateVisitPlanogram (TeammateVisitId);
+GO
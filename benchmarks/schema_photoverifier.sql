@@ -0,0 +1,75 @@
+-- Benchmark: PhotoVerifier veritabanı (sql/*.sql migration'larından önceki temel şema)
+
+CREATE TABLE Users (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    Username NVARCHAR(100) NOT NULL UNIQUE,
+    PasswordHash NVARCHAR(64) NULL,
+    DisplayName NVARCHAR(200) NULL,
+    Email NVARCHAR(200) NULL,
+    Role NVARCHAR(20) NOT NULL DEFAULT 'Viewer',
+    IsActive BIT NOT NULL DEFAULT 1,
+    AuthSource NVARCHAR(20) NOT NULL DEFAULT 'Local',
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    LastLoginAt DATETIME NULL
+);
+
+CREATE TABLE EventLogs (
+    Id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    UserId INT NULL,
+    Username NVARCHAR(100) NULL,
+    Action NVARCHAR(50) NOT NULL,
+    Project NVARCHAR(50) NULL,
+    Details NVARCHAR(1000) NULL,
+    IpAddress NVARCHAR(50) NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE()
+);
+
+CREATE TABLE Verifications (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    Project NVARCHAR(50) NOT NULL,
+    PhotoType NVARCHAR(20) NOT NULL,
+    PhotoId INT NOT NULL,
+    VisitId INT NULL,
+    Status NVARCHAR(20) NOT NULL,
+    Note NVARCHAR(1000) NULL,
+    VerifiedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    VerifiedBy INT NULL,
+    CONSTRAINT UQ_Verifications_Photo UNIQUE (Project, PhotoType, PhotoId)
+);
+
+CREATE TABLE PhotoHashes (
+    Id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    Project NVARCHAR(50) NOT NULL,
+    PhotoType NVARCHAR(20) NOT NULL,
+    PhotoId INT NOT NULL,
+    VisitId INT NULL,
+    Md5Hash CHAR(32) NULL,
+    FileSize BIGINT NULL,
+    ImagePath NVARCHAR(500) NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE()
+);
+CREATE INDEX IX_PhotoHashes_Photo ON PhotoHashes (Project, PhotoType, PhotoId);
+CREATE INDEX IX_PhotoHashes_Hash ON PhotoHashes (Project, Md5Hash);
+
+CREATE TABLE DuplicateCache (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    Project NVARCHAR(50) NOT NULL,
+    Md5Hash CHAR(32) NOT NULL,
+    PhotoCount INT NOT NULL,
+    PhotoIds NVARCHAR(MAX) NULL,
+    Details NVARCHAR(MAX) NULL,
+    UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+);
+CREATE INDEX IX_DuplicateCache_Project ON DuplicateCache (Project);
+
+CREATE TABLE PhotoListCache (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    Project NVARCHAR(50) NOT NULL,
+    PhotoType NVARCHAR(20) NOT NULL,
+    CacheDate DATE NOT NULL,
+    Details NVARCHAR(MAX) NULL,
+    PhotoCount INT NOT NULL DEFAULT 0,
+    UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+);
+CREATE INDEX IX_PhotoListCache_Day ON PhotoListCache (Project, PhotoType, CacheDate);
+GO
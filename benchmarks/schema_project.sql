@@ -0,0 +1,63 @@
+-- Benchmark: proje veritabanı (TeamGuerilla* ile aynı kolonlar, sadece uygulamanın okudukları)
+-- Id'ler IDENTITY değil; sentetik veri deterministik Id'lerle yazılır.
+
+CREATE TABLE Users (
+    Id INT PRIMARY KEY,
+    Name NVARCHAR(100) NOT NULL,
+    Surname NVARCHAR(100) NOT NULL,
+    IsDeleted BIT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE UserRoles (
+    UserId INT NOT NULL,
+    RoleId INT NOT NULL,
+    IsDeleted BIT NOT NULL DEFAULT 0,
+    PRIMARY KEY (UserId, RoleId)
+);
+
+CREATE TABLE Customers (
+    CustomerCode NVARCHAR(50) PRIMARY KEY,
+    CustomerName NVARCHAR(200) NOT NULL,
+    Latitude FLOAT NULL,
+    Longitude FLOAT NULL
+);
+
+CREATE TABLE TeammateRoute (
+    Id INT PRIMARY KEY,
+    CustomerId NVARCHAR(50) NOT NULL
+);
+
+CREATE TABLE TeammateVisit (
+    Id INT PRIMARY KEY,
+    TeammateRouteId INT NOT NULL,
+    UserId INT NOT NULL,
+    StartDate DATETIME NOT NULL,
+    FinishDate DATETIME NULL,
+    CreatedDate DATETIME NOT NULL,
+    ImagePath NVARCHAR(500) NULL,
+    Latitude FLOAT NULL,
+    Longitude FLOAT NULL,
+    IsDeleted BIT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE TeammateVisitExhibition (
+    Id INT PRIMARY KEY,
+    TeammateVisitId INT NOT NULL,
+    ImagePath NVARCHAR(500) NULL,
+    CreatedDate DATETIME NOT NULL,
+    Type INT NULL,
+    PackageQuantity INT NULL,
+    ProductQuantity INT NULL,
+    IsDeleted BIT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE TeammateVisitPlanogram (
+    Id INT PRIMARY KEY,
+    TeammateVisitId INT NOT NULL,
+    ImagePath NVARCHAR(500) NULL,
+    BeforeImagePath NVARCHAR(500) NULL,
+    CreatedDate DATETIME NOT NULL,
+    LidQuantity INT NULL,
+    IsDeleted BIT NOT NULL DEFAULT 0
+);
+GO
@@ -0,0 +1,82 @@
+"""
+Benchmark ayarları - yerel SQL Server ve veri ölçekleri.
+"""
+
+# Yerel SQL Server (ör. docker run -e ACCEPT_EULA=Y -e MSSQL_SA_PASSWORD=Bench_12345 -p 1433:1433 mcr.microsoft.com/mssql/server:2022-latest)
+BENCH_DB = {
+    'host': 'localhost',
+    'port': 1433,
+    'username': 'sa',
+    'password': 'Bench_12345',
+    'project_database': 'PhotoVerifierBench_Project',
+    'pv_database': 'PhotoVerifierBench',
+}
+
+# Ölçek adı -> toplam fotoğraf sayısı (teşhir + planogram + ziyaret)
+SCALES = {
+    'xs': 10_000,
+    's': 100_000,
+    'm': 1_000_000,
+    'l': 5_000_000,
+}
+
+# Sentetik veri dağılımı
+DATA_PROFILE = {
+    'days': 60,                     # Bugünden geriye kaç güne yayılsın
+    'exhibition_per_visit': 3,
+    'planogram_per_visit': 1,
+    'visits_per_user': 2000,
+    'visits_per_customer': 50,
+    'duplicate_ratio': 0.02,        # Başka bir fotoğrafla aynı hash'e sahip fotoğraf oranı
+    'far_visit_ratio': 0.05,        # Mağazadan 1km+ uzakta başlatılan ziyaret oranı
+    'verified_ratio': 0.30,
+    'event_logs_per_photo': 0.1,
+    'image_root': r'\\benchserver\d$\BenchFiles\Image',
+}
+
+# Ölçülecek proje (tüm fotoğraf türleri + rol filtresi olduğu için efes)
+BENCH_PROJECT = 'efes'
+
+# Ölçüm ayarları
+RUN_DEFAULTS = {
+    'repeat': 3,
+    'range_days': 7,                # get_photos_grouped / get_stats tarih aralığı
+    'regression_threshold': 0.20,   # --compare: medyan bu orandan fazla yavaşlarsa regresyon
+}
+
+# Sentetik görüntü ağacı (hash_scanner benchmark'ı için) - Image\YYYY\MM\DD\<ad>.jpg
+IMAGE_TREE = {
+    'root': 'benchmarks/data/images',   # Göreli ise repo köküne göre
+    'median_kb': 250,
+    'sigma': 0.6,                       # Log-normal boyut dağılımı
+    'min_kb': 30,
+    'max_kb': 3000,
+    'duplicate_ratio': 0.02,            # Bir önceki dosyanın birebir kopyası (aynı MD5)
+    'near_duplicate_ratio': 0.01,       # Bir önceki dosyadan birkaç byte farklı (farklı MD5)
+    'missing_ratio': 0.005,             # Hiç yazılmayan dosya (scanner: not_found)
+}
+
+# hash_scanner benchmark'ı: denenecek worker / batch kombinasyonları
+SCAN_BENCH = {
+    'workers': [1, 4, 8],
+    'batch_sizes': [1, 200],
+    'days': 60,
+}
+
+# HTTP yük testi (waitress) - her adımda eşzamanlı kullanıcı sayısı artırılır
+LOAD_TEST = {
+    'port': 5599,
+    'threads': 4,                       # run_production.py ile aynı
+    'concurrency': [1, 2, 4, 8, 16, 32],
+    'step_seconds': 30,
+    'warmup_seconds': 5,
+    'think_ms': 0,                      # İstekler arası bekleme (0 = kapalı döngü)
+    'timeout': 120,
+    # Rota karışımları: ağırlıklar göreli
+    'mixes': {
+        'browse': {'photos': 20, 'image': 60, 'duplicates': 5, 'stats': 5, 'verify': 9, 'report': 1},
+        'review': {'photos': 10, 'image': 50, 'duplicates': 5, 'stats': 2, 'verify': 32, 'report': 1},
+        'reports': {'photos': 10, 'image': 30, 'duplicates': 10, 'stats': 10, 'verify': 10, 'report': 30},
+    },
+    'reports': ['verifications', 'duplicates', 'distance-alerts'],
+}
@@ -80,6 +80,107 @@ PHOTO_TYPE_CONFIG = {
     },
 }
 
+# Bellek içi doğrulama indeksi (diğer süreçlerin yazdıkları RowVer ile poll edilir)
+VERIFICATION_INDEX = {
+    'enabled': True,
+    'poll_seconds': 5,
+}
+
+# Bağlantı havuzu (sources/db.py): veritabanı başına boşta tutulan bağlantı ve en uzun yaşam (saniye)
+DB_POOL = {
+    'enabled': True,
+    'max_idle': 8,
+    'max_age_seconds': 300,
+}
+
+# İstek içi paralel sorgular (sources/parallel.py): worker sayısı ve varsayılan süre sınırı (saniye)
+DB_FANOUT = {
+    'workers': 16,
+    'timeout_seconds': 30,
+}
+
+# İnceleme kuyruğu (/<project>/review): varsayılan / en fazla batch boyu, kira süresi (saniye).
+# Kuyruğu photo_cache_builder (cache penceresi) ve review_queue_backfill (backfill_days geriye,
+# backfill_window_days'lik dilimlerle) doldurur.
+REVIEW_QUEUE = {
+    'batch_size': 20,
+    'max_batch_size': 100,
+    'lease_seconds': 600,
+    'backfill_days': 365,
+    'backfill_window_days': 7,
+}
+
+# EventLogs arka plan yazıcısı (overflow: drop_oldest, drop_newest, block)
+EVENT_LOG_WRITER = {
+    'max_queue': 10000,
+    'batch_size': 200,
+    'flush_interval': 2.0,
+    'overflow': 'drop_oldest',
+}
+
+# /admin/logs: sayfa boyu, filtreli sayımın üst sınırı ve sayım cache süresi (saniye)
+EVENT_LOG_BROWSER = {
+    'per_page': 50,
+    'count_cap': 10000,
+    'count_cache_seconds': 60,
+}
+
+# EventLogs saklama (event_log_archiver.py, gece çalışır)
+# hot_days: EventLogs'ta kalan gün (haftalık rapor geçen takvim haftasını okur; en az 14 uygulanır)
+# archive_days: arşivde tutulan gün (None: hiç silinmez)
+# batch_size: tek transaction'da taşınan satır; pause_seconds: batch'ler arası bekleme
+EVENT_LOG_RETENTION = {
+    'hot_days': 90,
+    'archive_days': 730,
+    'batch_size': 5000,
+    'pause_seconds': 0.2,
+}
+
+# Performans metrikleri (/admin/metrics)
+# scrape_token: Prometheus'un oturum açmadan /admin/metrics/prometheus okuyabilmesi için (Bearer token)
+METRICS_CONFIG = {
+    'scrape_token': None,
+}
+
+# Yavaş sorgu kaydı: threshold_ms üzerindeki sorgular log_dir/slow_queries.log
+# dosyasına ve (write_to_db ise) PhotoVerifier.SlowQueryLog tablosuna yazılır
+SLOW_QUERY_LOG = {
+    'enabled': True,
+    'threshold_ms': 500,
+    'log_dir': 'logs',
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 5,
+    'max_sql_length': 8000,
+    'max_params_length': 2000,
+    'log_params': False,            # Parametre değerleri yazılsın mı (Users / PasswordHash ifadelerinde hiçbir zaman)
+    'write_to_db': True,
+}
+
+# İstek profilleri (?_profile=1, sadece admin); son `keep` profil dir altında tutulur
+PROFILER_CONFIG = {
+    'enabled': True,
+    'dir': 'profiles',
+    'keep': 50,
+    'top_functions': 60,
+    'top_callees': 15,
+    'top_allocations': 25,
+    'traceback_frames': 10,
+}
+
+# Excel raporları: write-only modda satır satır yazılır, geçici dosyaya alınıp parça parça gönderilir.
+# Arka plan işleri workers thread'inde üretilir; sonuçlar (tür, proje, parametreler, veri sürümü)
+# anahtarıyla cache_dir altında tutulur.
+REPORT_CONFIG = {
+    'spool_dir': None,              # None = sistemin geçici klasörü
+    'stream_chunk_size': 256 * 1024,
+    'workers': 2,
+    'cache_dir': 'report_cache',
+    'cache_keep': 30,               # En fazla bu kadar rapor dosyası tutulur
+    'job_ttl_seconds': 3600,        # Biten işler bu süre sonra listeden düşer
+    'csv_flush_rows': 1000,         # CSV akışında parça başına satır
+    'parquet_row_group_rows': 50000,
+}
+
 EMAIL_CONFIG = {
     'smtp_server': 'mail.teamguerillamarketing.com',  # veya smtp.gmail.com
     'smtp_port': 587,
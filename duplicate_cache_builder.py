@@ -24,6 +24,22 @@ def get_pv_connection():
     )
 
 
+# Tek INSERT'te en fazla satır (12 kolon x 170 = 2040 parametre < 2100)
+MAX_INSERT_ROWS = 170
+
+
+def insert_file_rows(cursor, rows: list):
+    """DuplicateCacheFiles'a çok satırlı INSERT."""
+    for i in range(0, len(rows), MAX_INSERT_ROWS):
+        chunk = rows[i:i + MAX_INSERT_ROWS]
+        placeholders = ','.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+        cursor.execute(f'''
+            INSERT INTO DuplicateCacheFiles (Project, Md5Hash, PhotoCount, PhotoType, PhotoId, VisitId,
+                                             UserId, Personnel, CustomerCode, CustomerName, PhotoDate, DistanceKm)
+            VALUES {placeholders}
+        ''', tuple(value for row in chunk for value in row))
+
+
 def build_cache_for_project(project_key: str):
     """Bir proje için duplicate cache oluşturur."""
     print(f"\n📦 {project_key.upper()} cache oluşturuluyor...")
@@ -38,8 +54,10 @@ def build_cache_for_project(project_key: str):
     
     # Eski cache'i temizle
     cursor.execute('DELETE FROM DuplicateCache WHERE Project = %s', (project_key,))
+    cursor.execute('DELETE FROM DuplicateCacheFiles WHERE Project = %s', (project_key,))
     
     # Yeni cache'i yaz
+    file_rows = []
     for dup in duplicates:
         photo_ids = json.dumps([f['photo_id'] for f in dup['files']])
         details = json.dumps(dup['files'], default=str, ensure_ascii=False)
@@ -48,6 +66,16 @@ def build_cache_for_project(project_key: str):
             INSERT INTO DuplicateCache (Project, Md5Hash, PhotoCount, PhotoIds, Details)
             VALUES (%s, %s, %s, %s, %s)
         ''', (project_key, dup['hash'], dup['count'], photo_ids, details))
+        
+        for f in dup['files']:
+            file_rows.append((
+                project_key, dup['hash'], dup['count'], f['photo_type'], f['photo_id'], f.get('visit_id'),
+                f.get('user_id'), f.get('personnel') or None, f.get('customer_code') or None,
+                f.get('customer_name') or None, f.get('photo_date') or None, f.get('distance_km'),
+            ))
+    
+    # Raporların filtrelediği fotoğraf bazlı satırlar
+    insert_file_rows(cursor, file_rows)
     
     conn.commit()
     conn.close()
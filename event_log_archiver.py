@@ -0,0 +1,109 @@
+"""
+Event Log Archiver
+==================
+hot_days'den eski EventLogs satırlarını EventLogsArchive'e (PAGE sıkıştırmalı)
+taşır, archive_days'den eski arşiv satırlarını siler.
+Gece çalıştırılmak üzere tasarlanmıştır. Her batch ayrı transaction'dır:
+log tablosu uzun süre kilitlenmez, yarıda kesilirse kaldığı yerden devam eder.
+"""
+
+import time
+import pymssql
+from datetime import datetime, timedelta
+
+from config import PHOTOVERIFIER_DB, EVENT_LOG_RETENTION
+
+
+def get_pv_connection():
+    """PhotoVerifier veritabanı bağlantısı."""
+    return pymssql.connect(
+        server=PHOTOVERIFIER_DB['host'],
+        port=PHOTOVERIFIER_DB.get('port', 1433),
+        user=PHOTOVERIFIER_DB['username'],
+        password=PHOTOVERIFIER_DB['password'],
+        database=PHOTOVERIFIER_DB['database']
+    )
+
+
+# weekly_report.report_week: Pazar günü çalışan rapor 13 gün öncesinin Pazartesi'sinden okur
+MIN_HOT_DAYS = 14
+
+# Silme ve arşive yazma tek ifadede: satır ya hot tabloda ya arşivde, arada kaybolmaz
+MOVE_BATCH = '''
+    DELETE TOP ({batch_size}) FROM EventLogs
+    OUTPUT deleted.Id, deleted.UserId, deleted.Username, deleted.Action, deleted.Project,
+           deleted.Details, deleted.IpAddress, deleted.CreatedAt
+    INTO EventLogsArchive (Id, UserId, Username, Action, Project, Details, IpAddress, CreatedAt)
+    WHERE CreatedAt < %s
+'''
+
+PURGE_BATCH = '''
+    DELETE TOP ({batch_size}) FROM EventLogsArchive
+    WHERE CreatedAt < %s
+'''
+
+
+def _run_batches(conn, query: str, cutoff: datetime, batch_size: int, pause: float) -> int:
+    """Sorguyu etkilenen satır kalmayana kadar batch'ler halinde çalıştırır."""
+    cursor = conn.cursor()
+    total = 0
+    while True:
+        cursor.execute(query.format(batch_size=batch_size), (cutoff,))
+        affected = cursor.rowcount
+        conn.commit()
+        total += affected
+        if affected < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def archive_event_logs(hot_days: int = None, archive_days: int = None) -> dict:
+    """Eski logları arşive taşır, arşivin süresi dolanları siler."""
+    hot_days = hot_days or EVENT_LOG_RETENTION.get('hot_days', 90)
+    if archive_days is None:
+        archive_days = EVENT_LOG_RETENTION.get('archive_days')
+    batch_size = EVENT_LOG_RETENTION.get('batch_size', 5000)
+    pause = EVENT_LOG_RETENTION.get('pause_seconds', 0.2)
+
+    # Haftalık rapor geçen takvim haftasını (en fazla 13 gün öncesine kadar) sadece hot
+    # EventLogs tablosundan okur; o hafta arşive taşınmamalı
+    hot_days = max(hot_days, MIN_HOT_DAYS)
+    now = datetime.now()
+    result = {'archived': 0, 'purged': 0}
+
+    conn = get_pv_connection()
+    try:
+        cutoff = now - timedelta(days=hot_days)
+        print(f"  📦 {cutoff.strftime('%Y-%m-%d')} öncesi loglar arşive taşınıyor...")
+        result['archived'] = _run_batches(conn, MOVE_BATCH, cutoff, batch_size, pause)
+        print(f"  ✅ {result['archived']} satır taşındı")
+
+        if archive_days:
+            purge_cutoff = now - timedelta(days=archive_days)
+            print(f"  🗑️ {purge_cutoff.strftime('%Y-%m-%d')} öncesi arşiv siliniyor...")
+            result['purged'] = _run_batches(conn, PURGE_BATCH, purge_cutoff, batch_size, pause)
+            print(f"  ✅ {result['purged']} satır silindi")
+    finally:
+        conn.close()
+
+    return result
+
+
+def run_archiver():
+    """Arşivleme işini çalıştırır."""
+    print("="*50)
+    print("🗄️ EVENT LOG ARCHIVER")
+    print(f"   Başlangıç: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*50)
+
+    archive_event_logs()
+
+    print("\n" + "="*50)
+    print("✅ Arşivleme tamamlandı!")
+    print(f"   Bitiş: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    run_archiver()
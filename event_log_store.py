@@ -0,0 +1,178 @@
+"""
+Event Log Store - Event Log Okuma
+=================================
+/admin/logs sayfası için EventLogs okuması. Sayfalama OFFSET ile değil
+(CreatedAt, Id) anahtarıyla yapılır: her sayfa indeksten sadece kendi satırlarını
+okur, tablo büyüdükçe yavaşlamaz. Toplam kayıt sayısı filtresizken tablo
+metadata'sından (yaklaşık), filtreliyken üst sınırlı sayımla alınır ve kısa
+süre cache'lenir. include_archive=True ile okumalar hot tablo ve arşivi
+(EventLogsAll view, sql/007) birlikte kapsar.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import PHOTOVERIFIER_DB, EVENT_LOG_BROWSER
+from sources import db
+
+# Filtre formundaki işlem türleri
+ACTIONS = ['Login', 'Logout', 'LoginFailed', 'Verify', 'PasswordChange', 'UserCreate', 'UserEdit',
+           'ReportRequest']
+
+_CURSOR_FORMAT = '%Y%m%d%H%M%S%f'
+
+_count_lock = threading.Lock()
+_count_cache: Dict[tuple, Tuple[float, int, bool]] = {}
+
+
+# ==================== SAYFA ANAHTARI ====================
+
+def encode_cursor(row: Dict) -> str:
+    """Satırın (CreatedAt, Id) değerini URL'de taşınacak anahtara çevirir."""
+    return f"{row['CreatedAt'].strftime(_CURSOR_FORMAT)}-{row['Id']}"
+
+
+def decode_cursor(value: str) -> Optional[Tuple[datetime, int]]:
+    """Geçersiz anahtar için None döner."""
+    try:
+        created_at, log_id = value.split('-', 1)
+        return datetime.strptime(created_at, _CURSOR_FORMAT), int(log_id)
+    except (ValueError, AttributeError):
+        return None
+
+
+# ==================== SORGULAR ====================
+
+def _filter_sql(filters: Dict) -> Tuple[str, tuple]:
+    """
+    filters: username, action, project, date_from, date_to (YYYY-MM-DD, bitiş günü dahil).
+    Her eşitlik filtresinin (Kolon, CreatedAt) indeksi var (sql/006).
+    """
+    sql, params = '', ()
+    for key, column in (('username', 'Username'), ('action', 'Action'), ('project', 'Project')):
+        if filters.get(key):
+            sql += f' AND {column} = %s'
+            params += (filters[key],)
+    if filters.get('date_from'):
+        sql += ' AND CreatedAt >= %s'
+        params += (filters['date_from'],)
+    if filters.get('date_to'):
+        sql += ' AND CreatedAt < DATEADD(day, 1, CAST(%s AS DATE))'
+        params += (filters['date_to'],)
+    return sql, params
+
+
+def _table(include_archive: bool) -> str:
+    return 'EventLogsAll' if include_archive else 'EventLogs'
+
+
+def get_page(filters: Dict = None, after: str = None, before: str = None,
+             per_page: int = None, include_archive: bool = False) -> Dict:
+    """
+    Bir sayfa log döndürür (en yeni önce).
+    after: bu anahtardan daha eski kayıtlar (sonraki sayfa)
+    before: bu anahtardan daha yeni kayıtlar (önceki sayfa)
+    Dönüş: {'logs', 'newer', 'older'} - newer/older bir sonraki isteğin anahtarı veya None
+    """
+    filters = filters or {}
+    per_page = per_page or EVENT_LOG_BROWSER.get('per_page', 50)
+    where, params = _filter_sql(filters)
+
+    position = decode_cursor(before) if before else decode_cursor(after) if after else None
+    backward = bool(before and position)
+    if position:
+        created_at, log_id = position
+        op = '>' if backward else '<'
+        where += f' AND (CreatedAt {op} %s OR (CreatedAt = %s AND Id {op} %s))'
+        params += (created_at, created_at, log_id)
+    order = 'ASC' if backward else 'DESC'
+
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor(as_dict=True)
+        # Bir fazla satır: devamı olup olmadığını ayrı sorgu olmadan anlamak için
+        cursor.execute(f'''
+            SELECT TOP ({per_page + 1}) Id, UserId, Username, Action, Project, Details, IpAddress, CreatedAt
+            FROM {_table(include_archive)}
+            WHERE 1 = 1{where}
+            ORDER BY CreatedAt {order}, Id {order}
+        ''', params)
+        logs = cursor.fetchall()
+    finally:
+        conn.close()
+
+    has_more = len(logs) > per_page
+    logs = logs[:per_page]
+    if backward:
+        logs.reverse()
+
+    # İleri giderken daha yeni sayfa her zaman var (ilk sayfa hariç); geri giderken tersi
+    has_newer = has_more if backward else bool(position)
+    has_older = bool(position) if backward else has_more
+    return {
+        'logs': logs,
+        'newer': encode_cursor(logs[0]) if logs and has_newer else None,
+        'older': encode_cursor(logs[-1]) if logs and has_older else None,
+    }
+
+
+def get_total(filters: Dict = None, include_archive: bool = False) -> Tuple[int, bool]:
+    """
+    (kayıt sayısı, yaklaşık mı) döndürür.
+    Filtresiz: sys.partitions satır sayısı (tabloyu taramaz, yaklaşık).
+    Filtreli: en fazla count_cap kayıt sayılır; sınır aşıldıysa (count_cap, True) döner.
+    Sonuç count_cache_seconds boyunca cache'lenir.
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    key = (include_archive,) + tuple(sorted(filters.items()))
+    ttl = EVENT_LOG_BROWSER.get('count_cache_seconds', 60)
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and now - cached[0] < ttl:
+            return cached[1], cached[2]
+
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor(as_dict=True)
+        if not filters:
+            tables = ('EventLogs', 'EventLogsArchive') if include_archive else ('EventLogs',)
+            objects = ', '.join(f"OBJECT_ID('{table}')" for table in tables)
+            cursor.execute(f'''
+                SELECT COALESCE(SUM(rows), 0) as total
+                FROM sys.partitions
+                WHERE object_id IN ({objects}) AND index_id IN (0, 1)
+            ''')
+            total, approximate = cursor.fetchone()['total'], True
+        else:
+            cap = EVENT_LOG_BROWSER.get('count_cap', 10000)
+            where, params = _filter_sql(filters)
+            cursor.execute(f'''
+                SELECT COUNT(*) as total
+                FROM (SELECT TOP ({cap + 1}) Id FROM {_table(include_archive)} WHERE 1 = 1{where}) t
+            ''', params)
+            total = cursor.fetchone()['total']
+            approximate = total > cap
+            total = min(total, cap)
+    finally:
+        conn.close()
+
+    with _count_lock:
+        _count_cache[key] = (now, total, approximate)
+        # Eski filtre kombinasyonları birikmesin
+        for stale in [k for k, v in _count_cache.items() if now - v[0] >= ttl]:
+            del _count_cache[stale]
+    return total, approximate
+
+
+def get_usernames() -> List[str]:
+    """Filtre formu için kullanıcı adları (Users tablosundan; EventLogs taranmaz)."""
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor(as_dict=True)
+        cursor.execute('SELECT Username FROM Users ORDER BY Username')
+        return [row['Username'] for row in cursor.fetchall()]
+    finally:
+        conn.close()
@@ -7,12 +7,21 @@ Zamanlanmış görev olarak çalıştırılabilir.
 
 import os
 import hashlib
+import time
 import pymssql
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from config import PROJECTS, PHOTOVERIFIER_DB, get_project_config
 from sources import get_source
 
+# Tek INSERT'te en fazla satır (7 kolon x 285 = 1995 parametre < 2100)
+MAX_INSERT_ROWS = 285
+
+# Worker başına havuzda bekleyen en fazla dosya (I/O kuyruğu dolu kalsın, bellek sınırlı olsun)
+HASH_IN_FLIGHT_PER_WORKER = 4
+
 
 def get_pv_connection():
     """PhotoVerifier veritabanı bağlantısı."""
@@ -25,11 +34,24 @@ def get_pv_connection():
     )
 
 
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> tuple:
+    """Dosyanın MD5 hash'ini parça parça okuyarak hesaplar; (md5, boyut) döndürür."""
+    md5 = hashlib.md5()
+    size = 0
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            md5.update(chunk)
+            size += len(chunk)
+    return md5.hexdigest(), size
+
+
 def calculate_md5(file_path: str) -> str:
     """Dosyanın MD5 hash'ini hesaplar."""
     try:
-        with open(file_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+        return hash_file(file_path)[0]
     except Exception as e:
         print(f"  Hash hatası: {file_path} - {e}")
         return None
@@ -41,8 +63,67 @@ def get_local_path(project_config: dict, image_url: str) -> str:
     return os.path.join(base_path, image_url)
 
 
-def scan_project(project_key: str, days: int = 30):
-    """Bir projenin fotoğraflarını tarar."""
+def _hash_result(local_path: str) -> tuple:
+    """Thread havuzunda çalışır: ('ok', md5, boyut) / ('not_found',) / ('error', mesaj)."""
+    try:
+        md5_hash, file_size = hash_file(local_path)
+        return 'ok', md5_hash, file_size
+    except FileNotFoundError:
+        return ('not_found',)
+    except Exception as e:
+        return 'error', str(e)
+
+
+def _hash_stream(executor, items: list, in_flight: int):
+    """
+    Fotoğrafları sırayla (item, sonuç) olarak döndürür; havuzda sürekli en fazla
+    in_flight dosya hesaplanır. Biten her sonuç yerine hemen yenisi eklenir, böylece
+    paralellik DB yazım batch'inin boyuna bağlı değildir.
+    """
+    queue = deque()
+    remaining = iter(items)
+    for item in remaining:
+        queue.append((item, executor.submit(_hash_result, item['local_path'])))
+        if len(queue) >= in_flight:
+            break
+    while queue:
+        item, future = queue.popleft()
+        result = future.result()
+        next_item = next(remaining, None)
+        if next_item is not None:
+            queue.append((next_item, executor.submit(_hash_result, next_item['local_path'])))
+        yield item, result
+
+
+def _insert_hashes(cursor, rows: list):
+    """PhotoHashes'e çok satırlı INSERT (SQL Server: en fazla 1000 satır / 2100 parametre)."""
+    for i in range(0, len(rows), MAX_INSERT_ROWS):
+        chunk = rows[i:i + MAX_INSERT_ROWS]
+        placeholders = ','.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+        cursor.execute(f'''
+            INSERT INTO PhotoHashes (Project, PhotoType, PhotoId, VisitId, Md5Hash, FileSize, ImagePath)
+            VALUES {placeholders}
+        ''', tuple(value for row in chunk for value in row))
+
+
+def _existing_photo_ids(cursor, project_key: str, photo_type: str, photo_ids: list) -> set:
+    """Daha önce taranmış fotoğraflar (tek sorgu, aday Id aralığıyla sınırlı)."""
+    if not photo_ids:
+        return set()
+    cursor.execute('''
+        SELECT PhotoId FROM PhotoHashes
+        WHERE Project = %s AND PhotoType = %s AND PhotoId BETWEEN %s AND %s
+    ''', (project_key, photo_type, min(photo_ids), max(photo_ids)))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def scan_project(project_key: str, days: int = 30, workers: int = 4, batch_size: int = 200) -> dict:
+    """
+    Bir projenin fotoğraflarını tarar.
+    Taranmış Id'ler tek sorguda alınır, hash'ler workers thread ile hesaplanır
+    (workers x HASH_IN_FLIGHT_PER_WORKER dosya havuzda), sonuçlar bundan bağımsız
+    olarak batch_size'lık çok satırlı INSERT'lerle yazılır. İstatistikleri döndürür.
+    """
     print(f"\n{'='*50}")
     print(f"📸 {project_key.upper()} taranıyor...")
     print('='*50)
@@ -53,85 +134,96 @@ def scan_project(project_key: str, days: int = 30):
     end_date = datetime.now().strftime('%Y-%m-%d')
     start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
     
-    print(f"Tarih aralığı: {start_date} - {end_date}")
+    print(f"Tarih aralığı: {start_date} - {end_date} (workers={workers}, batch={batch_size})")
     
     # Veritabanı bağlantısı
     conn = get_pv_connection()
     cursor = conn.cursor()
     
-    stats = {'processed': 0, 'skipped': 0, 'not_found': 0, 'errors': 0}
+    stats = {'processed': 0, 'skipped': 0, 'not_found': 0, 'errors': 0,
+             'bytes': 0, 'db_rows': 0, 'db_batches': 0, 'db_seconds': 0.0}
+    started = time.perf_counter()
     
-    # Her fotoğraf türü için
-    for photo_type in config.get('photo_tables', []):
-        print(f"\n📂 {photo_type} fotoğrafları...")
-        
-        try:
-            if photo_type == 'exhibition':
-                photos = source.get_exhibition_photos(start_date, end_date)
-            elif photo_type == 'planogram':
-                photos = source.get_planogram_photos(start_date, end_date)
-            elif photo_type == 'visit':
-                photos = source.get_visit_photos(start_date=start_date, end_date=end_date)
-            else:
-                continue
-        except Exception as e:
-            print(f"  Sorgu hatası: {e}")
-            continue
-        
-        print(f"  Bulunan: {len(photos)} fotoğraf")
-        
-        for i, photo in enumerate(photos):
-            photo_id = photo['PhotoId']
-            visit_id = photo.get('VisitId')
-            image_url = photo.get('ImageUrl', '')
-            image_path = photo.get('ImagePath', '')
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Her fotoğraf türü için
+        for photo_type in config.get('photo_tables', []):
+            print(f"\n📂 {photo_type} fotoğrafları...")
             
-            # Zaten tarandı mı?
-            cursor.execute('''
-                SELECT 1 FROM PhotoHashes 
-                WHERE Project = %s AND PhotoType = %s AND PhotoId = %s
-            ''', (project_key, photo_type, photo_id))
-            
-            if cursor.fetchone():
-                stats['skipped'] += 1
+            try:
+                if photo_type == 'exhibition':
+                    photos = source.get_exhibition_photos(start_date, end_date)
+                elif photo_type == 'planogram':
+                    photos = source.get_planogram_photos(start_date, end_date)
+                elif photo_type == 'visit':
+                    photos = source.get_visit_photos(start_date=start_date, end_date=end_date)
+                else:
+                    continue
+            except Exception as e:
+                print(f"  Sorgu hatası: {e}")
                 continue
             
-            # Dosya yolunu oluştur
-            local_path = get_local_path(config, image_url)
+            print(f"  Bulunan: {len(photos)} fotoğraf")
             
-            if not os.path.exists(local_path):
-                stats['not_found'] += 1
-                continue
+            # Zaten taranmışları tek seferde ele
+            existing = _existing_photo_ids(cursor, project_key, photo_type, [p['PhotoId'] for p in photos])
+            pending = []
+            for photo in photos:
+                if photo['PhotoId'] in existing:
+                    stats['skipped'] += 1
+                    continue
+                pending.append({
+                    'photo_id': photo['PhotoId'],
+                    'visit_id': photo.get('VisitId'),
+                    'image_path': photo.get('ImagePath', ''),
+                    'local_path': get_local_path(config, photo.get('ImageUrl', '')),
+                })
             
-            # Hash hesapla
-            md5_hash = calculate_md5(local_path)
+            def flush(rows):
+                write_started = time.perf_counter()
+                _insert_hashes(cursor, rows)
+                conn.commit()
+                stats['db_seconds'] += time.perf_counter() - write_started
+                stats['processed'] += len(rows)
+                stats['db_rows'] += len(rows)
+                stats['db_batches'] += 1
             
-            if md5_hash:
-                file_size = os.path.getsize(local_path)
+            rows = []
+            in_flight = max(1, workers) * HASH_IN_FLIGHT_PER_WORKER
+            for done, (item, result) in enumerate(_hash_stream(executor, pending, in_flight), 1):
+                if result[0] == 'ok':
+                    _, md5_hash, file_size = result
+                    rows.append((project_key, photo_type, item['photo_id'], item['visit_id'],
+                                 md5_hash, file_size, item['image_path']))
+                    stats['bytes'] += file_size
+                elif result[0] == 'not_found':
+                    stats['not_found'] += 1
+                else:
+                    print(f"  Hash hatası: {item['local_path']} - {result[1]}")
+                    stats['errors'] += 1
                 
-                cursor.execute('''
-                    INSERT INTO PhotoHashes (Project, PhotoType, PhotoId, VisitId, Md5Hash, FileSize, ImagePath)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ''', (project_key, photo_type, photo_id, visit_id, md5_hash, file_size, image_path))
+                if len(rows) >= max(1, batch_size):
+                    flush(rows)
+                    rows = []
                 
-                stats['processed'] += 1
-            else:
-                stats['errors'] += 1
+                # İlerleme
+                if done % 1000 == 0:
+                    print(f"  İşlenen: {done}/{len(pending)}")
             
-            # İlerleme
-            if (i + 1) % 100 == 0:
-                print(f"  İşlenen: {i + 1}/{len(photos)}")
-                conn.commit()
-        
-        conn.commit()
+            if rows:
+                flush(rows)
     
     conn.close()
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    stats['db_seconds'] = round(stats['db_seconds'], 3)
     
     print(f"\n📊 {project_key.upper()} Sonuç:")
     print(f"  Yeni işlenen: {stats['processed']}")
     print(f"  Zaten mevcut: {stats['skipped']}")
     print(f"  Dosya bulunamadı: {stats['not_found']}")
     print(f"  Hata: {stats['errors']}")
+    print(f"  Süre: {stats['seconds']} sn ({stats['bytes'] / 1048576:.1f} MB)")
+    
+    return stats
 
 
 def scan_all(days: int = 30):
@@ -0,0 +1,256 @@
+"""
+Metrics - Performans Ölçümleri
+===============================
+İstek bazlı süre histogramları, veritabanı sorgu sayısı/süresi, cache isabet
+oranları ve gönderilen byte miktarları. Admin sayfası ve Prometheus metin
+formatı için tek kayıt defteri.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Saniye cinsinden istek süresi kovaları
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# İstek başına sorgu sayısı kovaları
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+class Histogram:
+    """Sabit kovalı histogram (Prometheus uyumlu, kümülatif çıktı)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Kova üst sınırlarından yaklaşık yüzdelik değeri."""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, bound in enumerate(self.buckets):
+            cumulative += self.counts[i]
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        """(üst sınır, kümülatif sayı) çiftleri."""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestMetrics:
+    """Tek bir isteğin ölçümleri (ContextVar üzerinden taşınır)."""
+
+    def __init__(self, endpoint: str, method: str):
+        self.endpoint = endpoint or 'unknown'
+        self.method = method
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds: float, count: int = 1):
+        with self._lock:
+            self.db_queries += count
+            self.db_seconds += seconds
+
+
+_current_request: ContextVar[Optional[RequestMetrics]] = ContextVar('current_request_metrics', default=None)
+_lock = threading.Lock()
+
+_route_latency: Dict[tuple, Histogram] = {}      # (endpoint, method) -> Histogram
+_route_queries: Dict[tuple, Histogram] = {}      # (endpoint, method) -> Histogram
+_route_db_seconds: Dict[tuple, float] = {}
+_route_status: Dict[tuple, int] = {}             # (endpoint, method, status) -> count
+_db_queries: Dict[str, int] = {}                 # db -> count
+_db_seconds: Dict[str, float] = {}
+_cache: Dict[tuple, int] = {}                    # (cache, 'hit'|'miss') -> count
+_bytes: Dict[str, int] = {}                      # name -> bytes
+_started_at = time.time()
+
+
+# ==================== İSTEK ====================
+
+def start_request(endpoint: str, method: str) -> RequestMetrics:
+    """İstek ölçümünü başlatır."""
+    metrics = RequestMetrics(endpoint, method)
+    _current_request.set(metrics)
+    return metrics
+
+
+def current_request() -> Optional[RequestMetrics]:
+    """Aktif isteğin ölçümleri (istek dışında None)."""
+    return _current_request.get()
+
+
+def finish_request(metrics: RequestMetrics, status: int):
+    """İstek ölçümünü kaydeder."""
+    if metrics is None or metrics.finished:
+        return
+    metrics.finished = True
+    elapsed = time.perf_counter() - metrics.started
+    key = (metrics.endpoint, metrics.method)
+
+    with _lock:
+        _route_latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+        _route_queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(metrics.db_queries)
+        _route_db_seconds[key] = _route_db_seconds.get(key, 0.0) + metrics.db_seconds
+        status_key = (metrics.endpoint, metrics.method, status)
+        _route_status[status_key] = _route_status.get(status_key, 0) + 1
+
+    _current_request.set(None)
+
+
+# ==================== VERİTABANI / CACHE / BYTE ====================
+
+def record_query(db: str, seconds: float, count: int = 1):
+    """Sorgu süresini (execute veya fetch) kaydeder; count=0 sadece süre ekler."""
+    with _lock:
+        _db_queries[db] = _db_queries.get(db, 0) + count
+        _db_seconds[db] = _db_seconds.get(db, 0.0) + seconds
+
+    request_metrics = _current_request.get()
+    if request_metrics is not None:
+        request_metrics.add_query(seconds, count)
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0):
+    """Cache isabet / ıska sayılarını kaydeder."""
+    with _lock:
+        if hits:
+            _cache[(cache, 'hit')] = _cache.get((cache, 'hit'), 0) + hits
+        if misses:
+            _cache[(cache, 'miss')] = _cache.get((cache, 'miss'), 0) + misses
+
+
+def record_bytes(name: str, amount: int):
+    """Gönderilen byte miktarını kaydeder."""
+    with _lock:
+        _bytes[name] = _bytes.get(name, 0) + amount
+
+
+# ==================== ÇIKTI ====================
+
+def snapshot() -> Dict:
+    """Admin sayfası için özet."""
+    with _lock:
+        routes = []
+        for (endpoint, method), hist in sorted(_route_latency.items()):
+            queries = _route_queries[(endpoint, method)]
+            errors = sum(count for (e, m, status), count in _route_status.items()
+                         if e == endpoint and m == method and status >= 500)
+            routes.append({
+                'endpoint': endpoint,
+                'method': method,
+                'count': hist.count,
+                'errors': errors,
+                'avg_ms': round(hist.sum / hist.count * 1000, 1) if hist.count else 0,
+                'p50_ms': _bound_ms(hist.quantile(0.50)),
+                'p95_ms': _bound_ms(hist.quantile(0.95)),
+                'p99_ms': _bound_ms(hist.quantile(0.99)),
+                'avg_queries': round(queries.sum / queries.count, 1) if queries.count else 0,
+                'avg_db_ms': round(_route_db_seconds[(endpoint, method)] / hist.count * 1000, 1) if hist.count else 0,
+                'total_seconds': round(hist.sum, 2),
+            })
+        routes.sort(key=lambda r: r['total_seconds'], reverse=True)
+
+        caches = {}
+        for (cache, kind), count in _cache.items():
+            caches.setdefault(cache, {'hit': 0, 'miss': 0})[kind] = count
+        for values in caches.values():
+            total = values['hit'] + values['miss']
+            values['ratio'] = round(values['hit'] / total * 100, 1) if total else None
+
+        return {
+            'uptime_seconds': int(time.time() - _started_at),
+            'routes': routes,
+            'databases': {db: {'queries': _db_queries[db], 'seconds': round(_db_seconds.get(db, 0.0), 2)} for db in sorted(_db_queries)},
+            'caches': caches,
+            'bytes': dict(_bytes),
+        }
+
+
+def _bound_ms(value):
+    if value is None:
+        return None
+    return '>30000' if value == float('inf') else round(value * 1000)
+
+
+def render_prometheus(extra_gauges: Dict[str, float] = None) -> str:
+    """Prometheus metin formatı (text/plain; version=0.0.4)."""
+    lines = []
+    with _lock:
+        lines.append('# HELP photoverifier_request_duration_seconds HTTP istek süresi')
+        lines.append('# TYPE photoverifier_request_duration_seconds histogram')
+        for (endpoint, method), hist in sorted(_route_latency.items()):
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            for bound, total in hist.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'photoverifier_request_duration_seconds_bucket{{{labels},le="{le}"}} {total}')
+            lines.append(f'photoverifier_request_duration_seconds_sum{{{labels}}} {hist.sum:.6f}')
+            lines.append(f'photoverifier_request_duration_seconds_count{{{labels}}} {hist.count}')
+
+        lines.append('# HELP photoverifier_request_db_queries İstek başına veritabanı sorgu sayısı')
+        lines.append('# TYPE photoverifier_request_db_queries histogram')
+        for (endpoint, method), hist in sorted(_route_queries.items()):
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            for bound, total in hist.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'photoverifier_request_db_queries_bucket{{{labels},le="{le}"}} {total}')
+            lines.append(f'photoverifier_request_db_queries_sum{{{labels}}} {hist.sum:.0f}')
+            lines.append(f'photoverifier_request_db_queries_count{{{labels}}} {hist.count}')
+
+        lines.append('# HELP photoverifier_request_db_seconds_total İsteklerde veritabanında geçen süre')
+        lines.append('# TYPE photoverifier_request_db_seconds_total counter')
+        for (endpoint, method), seconds in sorted(_route_db_seconds.items()):
+            lines.append(f'photoverifier_request_db_seconds_total{{endpoint="{endpoint}",method="{method}"}} {seconds:.6f}')
+
+        lines.append('# HELP photoverifier_requests_total Durum koduna göre istek sayısı')
+        lines.append('# TYPE photoverifier_requests_total counter')
+        for (endpoint, method, status), count in sorted(_route_status.items()):
+            lines.append(f'photoverifier_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines.append('# HELP photoverifier_db_queries_total Veritabanı sorgu sayısı')
+        lines.append('# TYPE photoverifier_db_queries_total counter')
+        for db, count in sorted(_db_queries.items()):
+            lines.append(f'photoverifier_db_queries_total{{db="{db}"}} {count}')
+
+        lines.append('# HELP photoverifier_db_seconds_total Veritabanı sorgu + fetch süresi')
+        lines.append('# TYPE photoverifier_db_seconds_total counter')
+        for db, seconds in sorted(_db_seconds.items()):
+            lines.append(f'photoverifier_db_seconds_total{{db="{db}"}} {seconds:.6f}')
+
+        lines.append('# HELP photoverifier_cache_requests_total Cache isabet / ıska sayısı')
+        lines.append('# TYPE photoverifier_cache_requests_total counter')
+        for (cache, kind), count in sorted(_cache.items()):
+            lines.append(f'photoverifier_cache_requests_total{{cache="{cache}",result="{kind}"}} {count}')
+
+        lines.append('# HELP photoverifier_bytes_served_total Gönderilen byte')
+        lines.append('# TYPE photoverifier_bytes_served_total counter')
+        for name, amount in sorted(_bytes.items()):
+            lines.append(f'photoverifier_bytes_served_total{{handler="{name}"}} {amount}')
+
+    for name, value in (extra_gauges or {}).items():
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+
+    return '\n'.join(lines) + '\n'
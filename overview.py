@@ -0,0 +1,94 @@
+"""
+Overview - Tüm Projeler Özeti
+=============================
+Her projenin fotoğraf sayıları, doğrulama / bekleyen sayıları ve duplicate
+özeti tek sayfada. Bütün proje x parça çağrıları aynı anda çalışır (sayfa
+süresi en yavaş sorguya yaklaşır); her parçanın süresi ayrıca döner.
+Fotoğraflar PhotoListCache'ten, duplicate sayıları DuplicateCache'ten okunur;
+canlı sorgu sadece cache'de olmayan günler içindir. Bekleyen: aynı fotoğraf
+kümesinden doğrulaması olmayanlar (doğrulama indeksiyle).
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from config import PROJECTS
+from sources import get_source
+from sources.parallel import run_parallel
+
+OVERVIEW_DAYS = 7
+
+# Proje başına toplanan parçalar
+_PARTS = {
+    'photos': lambda source, start, end: source.get_photo_counts(start, end, with_pending=True),
+    'verifications': lambda source, start, end: source.get_verification_counts(start, end),
+    'duplicates': lambda source, start, end: source.get_duplicate_summary(),
+}
+
+
+def _timed(fn):
+    """Çağrıyı süresiyle birlikte döndürür: (sonuç, ms, hata)."""
+    def run():
+        started = time.perf_counter()
+        try:
+            result, error = fn(), None
+        except Exception as e:
+            print(f"DEBUG overview error: {e}")
+            result, error = None, str(e)
+        return result, round((time.perf_counter() - started) * 1000, 1), error
+    return run
+
+
+def build_overview(days: int = OVERVIEW_DAYS) -> Dict:
+    """
+    Dönüş: {'date_range', 'total_ms', 'projects': {proje: {...}}}
+    Proje satırı: name, photos, total_photos, cache_days, live_days, verifications
+    (aralıkta verilen kararlar), verified / pending (total_photos'tan doğrulanan /
+    bekleyen), verified_percent, duplicates, timings (parça -> ms), ms, errors
+    """
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    started = time.perf_counter()
+
+    calls = {}
+    for project_key in PROJECTS:
+        source = get_source(project_key)
+        for part, fn in _PARTS.items():
+            calls[(project_key, part)] = _timed(lambda fn=fn, source=source: fn(source, start_date, end_date))
+    timeout_result = (None, None, 'Süre aşıldı')
+    results = run_parallel(calls, defaults={key: timeout_result for key in calls})
+
+    overview = {'date_range': f"{start_date} - {end_date}", 'days': days, 'projects': {}}
+    for project_key, project in PROJECTS.items():
+        parts = {part: results[(project_key, part)] for part in _PARTS}
+        photos = parts['photos'][0]
+        verifications = parts['verifications'][0] or {}
+
+        # Toplam, doğrulanan ve bekleyen aynı fotoğraf kümesinden; parça hata verdiyse bilinmiyor
+        if photos:
+            total_photos = sum(photos['counts'].values())
+            pending = sum(photos['pending'].values())
+            verified = total_photos - pending
+        else:
+            photos = {'counts': {}, 'cache_days': 0, 'live_days': 0}
+            total_photos, pending, verified = 0, None, None
+        overview['projects'][project_key] = {
+            'name': project['name'],
+            'photos': photos['counts'],
+            'total_photos': total_photos,
+            'cache_days': photos['cache_days'],
+            'live_days': photos['live_days'],
+            'verifications': verifications,
+            'verified': verified,
+            'pending': pending,
+            'verified_percent': round(verified / total_photos * 100, 1) if total_photos and verified is not None else 0,
+            'duplicates': parts['duplicates'][0],
+            'timings': {part: value[1] for part, value in parts.items()},
+            # Parçalar paralel: projenin süresi en yavaş parçası
+            'ms': max((value[1] or 0) for value in parts.values()),
+            'errors': {part: value[2] for part, value in parts.items() if value[2]},
+        }
+
+    overview['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return overview
@@ -10,7 +10,7 @@ import pymssql
 from datetime import datetime, timedelta
 
 from config import PROJECTS, PHOTOVERIFIER_DB
-from sources import get_source
+from sources import get_source, BaseSource
 
 
 def get_pv_connection():
@@ -24,6 +24,30 @@ def get_pv_connection():
     )
 
 
+def build_day_payload(day_photos: list) -> dict:
+    """
+    Bir günün cache içeriğini oluşturur.
+    Fotoğraflar ziyarete göre gruplanır ve tarihe göre sıralanır; ziyaret bilgisi
+    (mağaza, personel, tarih) ziyaret başına bir kez yazılır.
+    Personel ve mağaza filtreleri için ziyaret indeksleri de eklenir.
+    """
+    visits = BaseSource._group_into_visits(day_photos, slim=True)
+    
+    by_user = {}
+    by_customer = {}
+    for i, visit in enumerate(visits):
+        if visit.get('user_id') is not None:
+            by_user.setdefault(str(visit['user_id']), []).append(i)
+        if visit.get('customer_code') is not None:
+            by_customer.setdefault(str(visit['customer_code']), []).append(i)
+    
+    return {
+        'visits': visits,
+        'by_user': by_user,
+        'by_customer': by_customer,
+    }
+
+
 def build_cache_for_project(project_key: str, days: int = 7):
     """Bir proje için fotoğraf cache oluşturur."""
     print(f"\n📸 {project_key.upper()} cache oluşturuluyor...")
@@ -53,8 +77,13 @@ def build_cache_for_project(project_key: str, days: int = 7):
             
             print(f"    Bulunan: {len(photos)} fotoğraf")
             
-            # Tarihe göre grupla
+            # Tarihe göre grupla (fotoğrafsız günler de yazılır ki cache aralığı tam kapsasın)
             by_date = {}
+            day = datetime.strptime(start_date, '%Y-%m-%d')
+            while day.strftime('%Y-%m-%d') <= end_date:
+                by_date[day.strftime('%Y-%m-%d')] = []
+                day += timedelta(days=1)
+            
             for photo in photos:
                 photo_date = photo.get('PhotoDate') or photo.get('StartDate')
                 if photo_date:
@@ -66,7 +95,7 @@ def build_cache_for_project(project_key: str, days: int = 7):
             # Her gün için cache yaz
             for cache_date, day_photos in by_date.items():
                 # JSON'a çevir (datetime'ları string yap)
-                photos_json = json.dumps(day_photos, default=str, ensure_ascii=False)
+                photos_json = json.dumps(build_day_payload(day_photos), default=str, ensure_ascii=False)
                 
                 # Önce sil sonra ekle
                 cursor.execute('''
@@ -79,8 +108,11 @@ def build_cache_for_project(project_key: str, days: int = 7):
                     VALUES (%s, %s, %s, %s, %s)
                 ''', (project_key, photo_type, cache_date, photos_json, len(day_photos)))
             
+            # Doğrulanmamış fotoğraflar inceleme kuyruğuna
+            queued = source.enqueue_for_review(cursor, photo_type, photos)
+            
             conn.commit()
-            print(f"    ✅ {len(by_date)} gün cache'e yazıldı")
+            print(f"    ✅ {len(by_date)} gün cache'e yazıldı, {queued} fotoğraf inceleme kuyruğuna eklendi")
             
         except Exception as e:
             print(f"    ❌ Hata: {e}")
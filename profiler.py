@@ -0,0 +1,193 @@
+"""
+Profiler - İstek Bazlı Profil Çıkarma
+======================================
+Admin'in ?_profile=1 veya X-Profile: 1 ile işaretlediği tek bir isteği
+cProfile (fonksiyon çağrı ağacı) ve tracemalloc (bellek ayırmaları) ile
+ölçer; raporu diske yazar. Aynı anda tek istek profillenir.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import PROFILER_CONFIG
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_ID_PATTERN = re.compile(r'^[\w.-]+$')
+_busy = threading.Lock()
+
+
+class RequestProfile:
+    """Profillenen isteğin çalışan profiler'ı ve başlangıç bilgileri."""
+
+    def __init__(self, method: str, path: str, endpoint: str, username: str):
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint or 'unknown'
+        self.username = username
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.profile = cProfile.Profile()
+        self.own_tracemalloc = False
+        self.finished = False
+
+
+def profile_dir() -> str:
+    path = PROFILER_CONFIG.get('dir', 'profiles')
+    if not os.path.isabs(path):
+        path = os.path.join(_BASE_DIR, path)
+    return path
+
+
+# ==================== BAŞLAT / BİTİR ====================
+
+def start(method: str, path: str, endpoint: str, username: str) -> Optional[RequestProfile]:
+    """Profillemeyi başlatır; başka bir istek profilleniyorsa None döner."""
+    if not PROFILER_CONFIG.get('enabled', True):
+        return None
+    if not _busy.acquire(blocking=False):
+        return None
+
+    try:
+        profile = RequestProfile(method, path, endpoint, username)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILER_CONFIG.get('traceback_frames', 10))
+            profile.own_tracemalloc = True
+        tracemalloc.reset_peak()
+        profile.profile.enable()
+        return profile
+    except Exception:
+        _busy.release()
+        raise
+
+
+def finish(profile: Optional[RequestProfile], status: int, request_metrics=None) -> Optional[str]:
+    """Profillemeyi durdurur, raporu yazar ve profil kimliğini döndürür."""
+    if profile is None or profile.finished:
+        return None
+    profile.finished = True
+
+    try:
+        profile.profile.disable()
+        elapsed = time.perf_counter() - profile.started
+        snapshot = tracemalloc.take_snapshot()
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        if profile.own_tracemalloc:
+            tracemalloc.stop()
+
+        endpoint_slug = re.sub(r'[^\w.-]', '_', profile.endpoint)
+        profile_id = f"{profile.started_at:%Y%m%d_%H%M%S_%f}_{endpoint_slug}"
+        meta = {
+            'id': profile_id,
+            'method': profile.method,
+            'path': profile.path,
+            'endpoint': profile.endpoint,
+            'username': profile.username,
+            'status': status,
+            'started_at': profile.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration_ms': round(elapsed * 1000, 1),
+            'db_queries': request_metrics.db_queries if request_metrics else None,
+            'db_ms': round(request_metrics.db_seconds * 1000, 1) if request_metrics else None,
+            'peak_kb': round(peak_bytes / 1024),
+            'retained_kb': round(current_bytes / 1024),
+        }
+
+        directory = profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        profile.profile.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+        with open(os.path.join(directory, f'{profile_id}.txt'), 'w', encoding='utf-8') as f:
+            f.write(_render_report(meta, profile.profile, snapshot))
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        _prune(directory)
+        return profile_id
+    except Exception as e:
+        print(f"DEBUG profiler error: {e}")
+        return None
+    finally:
+        _busy.release()
+
+
+def _render_report(meta: Dict, profile: cProfile.Profile, snapshot) -> str:
+    """Özet + kümülatif süreye göre çağrı listesi + en pahalıların alt çağrıları + bellek."""
+    top_functions = PROFILER_CONFIG.get('top_functions', 60)
+    top_callees = PROFILER_CONFIG.get('top_callees', 15)
+    top_allocations = PROFILER_CONFIG.get('top_allocations', 25)
+
+    out = io.StringIO()
+    out.write(f"{meta['method']} {meta['path']}  ({meta['endpoint']})\n")
+    out.write(f"Kullanıcı: {meta['username']}  Zaman: {meta['started_at']}  Durum: {meta['status']}\n")
+    out.write(f"Süre: {meta['duration_ms']} ms  DB: {meta['db_queries']} sorgu / {meta['db_ms']} ms\n")
+    out.write(f"Bellek: tepe {meta['peak_kb']} KB, istek sonunda tutulan {meta['retained_kb']} KB\n")
+
+    out.write('\n' + '=' * 30 + ' KÜMÜLATİF SÜRE ' + '=' * 30 + '\n')
+    stats = pstats.Stats(profile, stream=out)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(top_functions)
+
+    out.write('\n' + '=' * 30 + ' ÇAĞRI AĞACI (en pahalı fonksiyonların alt çağrıları) ' + '=' * 30 + '\n')
+    stats.print_callees(top_callees)
+
+    out.write('\n' + '=' * 30 + ' KENDİ SÜRESİ ' + '=' * 30 + '\n')
+    stats.sort_stats('tottime').print_stats(top_functions // 2)
+
+    out.write('\n' + '=' * 30 + ' BELLEK AYIRMALARI (satır bazında) ' + '=' * 30 + '\n')
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+    for stat in snapshot.statistics('lineno')[:top_allocations]:
+        frame = stat.traceback[0]
+        out.write(f"{stat.size / 1024:10.1f} KB  {stat.count:8d} blok  {frame.filename}:{frame.lineno}\n")
+
+    return out.getvalue()
+
+
+def _prune(directory: str):
+    """Sadece son PROFILER_CONFIG['keep'] profili tutar."""
+    keep = PROFILER_CONFIG.get('keep', 50)
+    ids = sorted((name[:-5] for name in os.listdir(directory) if name.endswith('.json')), reverse=True)
+    for profile_id in ids[keep:]:
+        for ext in ('.json', '.txt', '.prof'):
+            try:
+                os.remove(os.path.join(directory, profile_id + ext))
+            except OSError:
+                pass
+
+
+# ==================== LİSTE / OKUMA ====================
+
+def list_profiles() -> List[Dict]:
+    """Kayıtlı profiller (yeniden eskiye)."""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str, ext: str) -> Optional[str]:
+    """Profil dosyasının yolu (geçersiz kimlik veya dosya yoksa None)."""
+    if not _ID_PATTERN.match(profile_id) or ext not in ('.json', '.txt', '.prof'):
+        return None
+    path = os.path.join(profile_dir(), profile_id + ext)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,422 @@
+"""
+Report Builder - Excel Rapor Üretimi
+====================================
+Raporların satırları veritabanı cursor'ından akış halinde okunur ve openpyxl
+write-only modunda dosyaya satır satır yazılır; bellek kullanımı satır
+sayısıyla büyümez. Dosya geçici klasöre yazılır, parça parça gönderilir ve
+gönderim bitince silinir. Aynı satırlar CSV (doğrudan akış) ve Parquet
+(row group'lar halinde, pyarrow kuruluysa) olarak da alınabilir.
+"""
+
+import csv
+import io
+import os
+import tempfile
+from typing import Dict, Iterator, List, Tuple
+
+from config import PHOTOVERIFIER_DB, REPORT_CONFIG
+from sources import get_source, db
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Doğrulama raporunda fotoğraf detaylarının toplu alındığı satır sayısı
+DETAIL_CHUNK_SIZE = 1000
+
+STATUS_TEXT = {'approved': 'Onaylandı', 'rejected': 'Reddedildi', 'suspicious': 'Şüpheli'}
+
+# 'timestamp' kolonları: satır üreticiler datetime verir; Excel'de bu biçimde gösterilir,
+# CSV'de ISO metin, Parquet'te timestamp(ms) olarak yazılır
+DISPLAY_DATETIME_FORMAT = '%d.%m.%Y %H:%M'
+
+
+# ==================== SATIR ÜRETİCİLER ====================
+
+def _date_filters(column: str, date_from: str = None, date_to: str = None) -> Tuple[str, tuple]:
+    """Tarih aralığı koşulu; bitiş günü dahil."""
+    sql, params = '', ()
+    if date_from:
+        sql += f' AND {column} >= %s'
+        params += (date_from,)
+    if date_to:
+        sql += f' AND {column} < DATEADD(day, 1, CAST(%s AS DATE))'
+        params += (date_to,)
+    return sql, params
+
+
+def verification_rows(project: str, date_from: str = None, date_to: str = None, photo_type: str = None,
+                      status: str = None, user_id: int = None, customer_code: str = None) -> Iterator[List]:
+    """
+    Doğrulama raporu satırları (en yeni doğrulama önce).
+    Tarih (doğrulama tarihi), tür ve durum Verifications sorgusunda; personel ve
+    mağaza proje DB'sindeki detay sorgusunda filtrelenir.
+    """
+    where, params = _date_filters('v.VerifiedAt', date_from, date_to)
+    if photo_type:
+        where += ' AND v.PhotoType = %s'
+        params += (photo_type,)
+    if status:
+        where += ' AND v.Status = %s'
+        params += (status,)
+    detail_filtered = bool(user_id or customer_code)
+
+    source = get_source(project)
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor(as_dict=True)
+        cursor.execute(f'''
+            SELECT v.PhotoId, v.PhotoType, v.VisitId, v.Status, v.Note, v.VerifiedAt,
+                   u.Username, u.DisplayName
+            FROM Verifications v
+            LEFT JOIN Users u ON v.VerifiedBy = u.Id
+            WHERE v.Project = %s{where}
+            ORDER BY v.VerifiedAt DESC
+        ''', (project, *params))
+        # Fotoğraf detayları parça parça toplu alınır
+        while True:
+            chunk = cursor.fetchmany(DETAIL_CHUNK_SIZE)
+            if not chunk:
+                break
+            details = source.get_photo_details_bulk([(v['PhotoId'], v['PhotoType'], v['VisitId']) for v in chunk],
+                                                    user_id=user_id, customer_code=customer_code)
+            for v in chunk:
+                detail = details.get((v['PhotoId'], v['PhotoType']))
+                if detail is None:
+                    if detail_filtered:
+                        continue
+                    detail = {}
+                yield [
+                    v['PhotoId'],
+                    v['PhotoType'],
+                    v['VisitId'],
+                    detail.get('personnel', ''),
+                    detail.get('customer_code', ''),
+                    detail.get('customer_name', ''),
+                    STATUS_TEXT.get(v['Status'], v['Status']),
+                    v['Note'] or '',
+                    v['DisplayName'] or v['Username'] or '',
+                    v['VerifiedAt'],
+                ]
+    finally:
+        conn.close()
+
+
+def _duplicate_file_filters(date_from: str = None, date_to: str = None, photo_type: str = None,
+                            status: str = None, user_id: int = None, customer_code: str = None) -> Tuple[str, tuple]:
+    """DuplicateCacheFiles (f) + Verifications (v) sorgusu için filtre koşulları."""
+    where, params = _date_filters('f.PhotoDate', date_from, date_to)
+    if photo_type:
+        where += ' AND f.PhotoType = %s'
+        params += (photo_type,)
+    if user_id:
+        where += ' AND f.UserId = %s'
+        params += (user_id,)
+    if customer_code:
+        where += ' AND f.CustomerCode = %s'
+        params += (customer_code,)
+    if status == 'pending':
+        where += ' AND v.Id IS NULL'
+    elif status:
+        where += ' AND v.Status = %s'
+        params += (status,)
+    return where, params
+
+
+_DUPLICATE_FILES_QUERY = '''
+    SELECT f.Md5Hash, f.PhotoCount, f.PhotoId, f.PhotoType, f.VisitId, f.Personnel,
+           f.CustomerCode, f.CustomerName, f.PhotoDate, f.DistanceKm,
+           v.Status, v.Note, COALESCE(u.DisplayName, u.Username) as VerifiedByName
+    FROM DuplicateCacheFiles f
+    LEFT JOIN Verifications v ON v.Project = f.Project AND v.PhotoType = f.PhotoType AND v.PhotoId = f.PhotoId
+    LEFT JOIN Users u ON v.VerifiedBy = u.Id
+    WHERE f.Project = %s{where}
+    ORDER BY {order}
+'''
+
+
+def duplicate_rows(project: str, **filters) -> Iterator[List]:
+    """Duplicate raporu satırları: her hash grubundaki her fotoğraf bir satır (filtreler SQL'de)."""
+    where, params = _duplicate_file_filters(**filters)
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor(as_dict=True)
+        cursor.execute(_DUPLICATE_FILES_QUERY.format(where=where, order='f.PhotoCount DESC, f.Md5Hash, f.Id'),
+                       (project, *params))
+        for f in cursor:
+            yield [
+                f['Md5Hash'][:12] + '...',
+                f['PhotoCount'],
+                f['PhotoId'],
+                f['PhotoType'],
+                f['VisitId'] or '',
+                f['Personnel'] or '',
+                f['CustomerCode'] or '',
+                f['CustomerName'] or '',
+                f['PhotoDate'],
+                f['DistanceKm'] if f['DistanceKm'] is not None else '',
+                STATUS_TEXT.get(f['Status'] or '', ''),
+                f['Note'] or '',
+                f['VerifiedByName'] or '',
+            ]
+    finally:
+        conn.close()
+
+
+def distance_alert_rows(project: str, **filters) -> Iterator[List]:
+    """Mesafe uyarı raporu satırları: mağazaya 1 km'den uzak çekilen fotoğraflar (filtreler SQL'de)."""
+    where, params = _duplicate_file_filters(**filters)
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor(as_dict=True)
+        cursor.execute(_DUPLICATE_FILES_QUERY.format(where=where + ' AND f.DistanceKm > 1',
+                                                     order='f.PhotoDate DESC, f.Id'),
+                       (project, *params))
+        for f in cursor:
+            yield [
+                f['PhotoId'],
+                f['PhotoType'],
+                f['VisitId'] or '',
+                f['Personnel'] or '',
+                f['CustomerCode'] or '',
+                f['CustomerName'] or '',
+                f['PhotoDate'],
+                f['DistanceKm'],
+            ]
+    finally:
+        conn.close()
+
+
+# ==================== RAPOR TANIMLARI ====================
+
+REPORTS: Dict[str, Dict] = {
+    'verifications': {
+        'title': 'Doğrulama Raporu',
+        'filename': '{project}_dogrulama_raporu',
+        'color': '366092',
+        'headers': ['Fotoğraf ID', 'Tür', 'Ziyaret ID', 'Personel', 'Mağaza Kodu', 'Mağaza Adı',
+                    'Durum', 'Yorum', 'Doğrulayan', 'Doğrulama Tarihi'],
+        'widths': [12, 12, 12, 25, 15, 35, 15, 40, 20, 18],
+        'columns': [('photo_id', 'int'), ('photo_type', 'str'), ('visit_id', 'int'), ('personnel', 'str'),
+                    ('customer_code', 'str'), ('customer_name', 'str'), ('status', 'str'), ('note', 'str'),
+                    ('verified_by', 'str'), ('verified_at', 'timestamp')],
+        'rows': verification_rows,
+        'tables': ['Verifications'],
+    },
+    'duplicates': {
+        'title': 'Duplicate Raporu',
+        'filename': '{project}_duplicate_raporu',
+        'color': 'C65911',
+        'headers': ['Hash', 'Tekrar', 'Fotoğraf ID', 'Tür', 'Ziyaret ID', 'Personel', 'Mağaza Kodu',
+                    'Mağaza Adı', 'Fotoğraf Tarihi', 'Mesafe (km)', 'Doğrulama', 'Yorum', 'Doğrulayan'],
+        'widths': [15, 8, 12, 12, 12, 25, 15, 35, 18, 12, 12, 30, 20],
+        'columns': [('hash', 'str'), ('photo_count', 'int'), ('photo_id', 'int'), ('photo_type', 'str'),
+                    ('visit_id', 'int'), ('personnel', 'str'), ('customer_code', 'str'), ('customer_name', 'str'),
+                    ('photo_date', 'timestamp'), ('distance_km', 'float'), ('status', 'str'), ('note', 'str'),
+                    ('verified_by', 'str')],
+        'rows': duplicate_rows,
+        'tables': ['DuplicateCacheFiles', 'Verifications'],
+    },
+    'distance-alerts': {
+        'title': 'Mesafe Uyarıları',
+        'filename': '{project}_mesafe_uyari_raporu',
+        'color': 'C00000',
+        'headers': ['Fotoğraf ID', 'Tür', 'Ziyaret ID', 'Personel', 'Mağaza Kodu', 'Mağaza Adı',
+                    'Fotoğraf Tarihi', 'Mesafe (km)'],
+        'widths': [12, 12, 12, 25, 15, 35, 18, 12],
+        'columns': [('photo_id', 'int'), ('photo_type', 'str'), ('visit_id', 'int'), ('personnel', 'str'),
+                    ('customer_code', 'str'), ('customer_name', 'str'), ('photo_date', 'timestamp'),
+                    ('distance_km', 'float')],
+        'rows': distance_alert_rows,
+        'tables': ['DuplicateCacheFiles', 'Verifications'],
+    },
+}
+
+
+# Raporun okuduğu tabloların değişiklik işaretçisi (satır sayısı + en son değişiklik)
+_VERSION_QUERIES = {
+    'Verifications': 'SELECT COUNT(*), MAX(RowVer) FROM Verifications WHERE Project = %s',
+    'DuplicateCacheFiles': 'SELECT COUNT(*), MAX(UpdatedAt) FROM DuplicateCacheFiles WHERE Project = %s',
+}
+
+
+def data_version(report_type: str, project: str) -> str:
+    """Rapor verisinin sürümü; kaynak tablolarda değişiklik olunca değişir."""
+    conn = db.connect(PHOTOVERIFIER_DB)
+    try:
+        cursor = conn.cursor()
+        parts = []
+        for table in REPORTS[report_type]['tables']:
+            cursor.execute(_VERSION_QUERIES[table], (project,))
+            count, last = cursor.fetchone()
+            last = last.hex() if isinstance(last, (bytes, bytearray)) else str(last)
+            parts.append(f"{table}:{count}:{last}")
+        return '|'.join(parts)
+    finally:
+        conn.close()
+
+
+# ==================== XLSX YAZIMI ====================
+
+def write_xlsx(path: str, spec: Dict, rows: Iterator[List]) -> int:
+    """Satırları write-only çalışma kitabına yazar; yazılan veri satırı sayısını döndürür."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(spec['title'])
+
+    # Write-only modda kolon genişlikleri satırlardan önce verilmeli
+    for i, width in enumerate(spec['widths'], 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+
+    header_fill = PatternFill(start_color=spec['color'], end_color=spec['color'], fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True)
+    header_alignment = Alignment(horizontal='center')
+    header = []
+    for title in spec['headers']:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    # Tarihler sadece Excel'de görüntü metnine çevrilir
+    timestamp_columns = [i for i, (_, kind) in enumerate(spec['columns']) if kind == 'timestamp']
+    count = 0
+    for row in rows:
+        for i in timestamp_columns:
+            row[i] = row[i].strftime(DISPLAY_DATETIME_FORMAT) if row[i] else ''
+        ws.append(row)
+        count += 1
+
+    wb.save(path)
+    return count
+
+
+# ==================== CSV / PARQUET ====================
+
+def _typed(value, kind: str):
+    """Parquet için değer: boş değerler None, sayılar sayı, tarihler datetime, diğerleri metin."""
+    if value is None or value == '':
+        return None
+    if kind == 'int':
+        return int(value)
+    if kind == 'float':
+        return float(value)
+    if kind == 'timestamp':
+        return value
+    return str(value)
+
+
+def _csv_value(value, kind: str):
+    """CSV hücresi: tarihler ISO metin (YYYY-MM-DDTHH:MM:SS), boşlar boş."""
+    if kind == 'timestamp':
+        return value.isoformat(timespec='seconds') if value else ''
+    return value
+
+
+def csv_stream(report_type: str, project: str, params: Dict = None) -> Iterator[bytes]:
+    """Raporu cursor'dan okunduğu sırayla CSV olarak üretir (csv_flush_rows satırda bir parça)."""
+    spec = REPORTS[report_type]
+    flush_rows = REPORT_CONFIG.get('csv_flush_rows', 1000)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([name for name, _ in spec['columns']])
+    kinds = [kind for _, kind in spec['columns']]
+
+    for i, row in enumerate(spec['rows'](project, **(params or {})), 1):
+        writer.writerow([_csv_value(value, kind) for value, kind in zip(row, kinds)])
+        if i % flush_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def write_parquet(path: str, spec: Dict, rows: Iterator[List]) -> int:
+    """Satırları parquet_row_group_rows'luk row group'lar halinde yazar; satır sayısını döndürür."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(), 'timestamp': pa.timestamp('ms')}
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in spec['columns']])
+    kinds = [kind for _, kind in spec['columns']]
+    group_rows = REPORT_CONFIG.get('parquet_row_group_rows', 50000)
+
+    def write_group(writer, batch):
+        columns = [pa.array([_typed(value, kind) for value in values], type=arrow_types[kind])
+                   for values, kind in zip(zip(*batch), kinds)]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= group_rows:
+                write_group(writer, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            write_group(writer, batch)
+            count += len(batch)
+    return count
+
+
+# Dosyaya yazılan formatlar (CSV dosyaya yazılmadan akış halinde gönderilir)
+FORMATS = {
+    'xlsx': {'mimetype': XLSX_MIMETYPE, 'writer': write_xlsx},
+    'parquet': {'mimetype': 'application/vnd.apache.parquet', 'writer': write_parquet},
+}
+CSV_MIMETYPE = 'text/csv; charset=utf-8'
+
+
+def download_name(report_type: str, project: str, fmt: str) -> str:
+    return f"{REPORTS[report_type]['filename'].format(project=project)}.{fmt}"
+
+
+def build_report(report_type: str, project: str, params: Dict = None, fmt: str = 'xlsx',
+                 spool_dir: str = None) -> Tuple[str, str, int]:
+    """
+    Raporu geçici dosyaya yazar (xlsx veya parquet).
+    spool_dir: geçici dosyanın klasörü (varsayılan REPORT_CONFIG['spool_dir']).
+    (dosya yolu, indirme adı, satır sayısı) döndürür; dosyayı çağıran siler.
+    """
+    spec = REPORTS[report_type]
+    fd, path = tempfile.mkstemp(prefix=f'pv_{project}_{report_type}_', suffix=f'.{fmt}',
+                                dir=spool_dir or REPORT_CONFIG.get('spool_dir'))
+    os.close(fd)
+    try:
+        count = FORMATS[fmt]['writer'](path, spec, spec['rows'](project, **(params or {})))
+    except Exception:
+        os.remove(path)
+        raise
+    return path, download_name(report_type, project, fmt), count
+
+
+def stream_file(path: str, delete: bool = True) -> Iterator[bytes]:
+    """Dosyayı parça parça okur; yanıt kapanınca (delete ise) dosyayı siler."""
+    chunk_size = REPORT_CONFIG.get('stream_chunk_size', 256 * 1024)
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if delete:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"DEBUG report temp delete error: {e}")
@@ -0,0 +1,207 @@
+"""
+Report Jobs - Arka Plan Rapor İşleri
+====================================
+Excel raporları istek thread'inde değil, küçük bir thread havuzunda üretilir.
+submit() iş numarası döndürür; sayfa durumu poll eder, hazır olunca dosya
+indirilir. Sonuçlar (rapor türü, proje, parametreler, veri sürümü) anahtarıyla
+diskte tutulur: veri değişmediyse aynı rapor tekrar üretilmez.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import report_builder
+from config import REPORT_CONFIG
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+_jobs: Dict[str, 'ReportJob'] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class ReportJob:
+    """Tek bir rapor üretim işi."""
+
+    def __init__(self, report_type: str, project: str, params: Dict, username: str, cache_key: str,
+                 fmt: str = 'xlsx'):
+        self.id = uuid.uuid4().hex
+        self.report_type = report_type
+        self.format = fmt
+        self.project = project
+        self.params = params
+        self.username = username
+        self.cache_key = cache_key
+        self.status = 'queued'          # queued / running / done / failed
+        self.cached = False
+        self.rows = None
+        self.error = None
+        self.path = None
+        self.download_name = report_builder.download_name(report_type, project, fmt)
+        self.mimetype = report_builder.FORMATS[fmt]['mimetype']
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _finish(self, status: str, error: str = None):
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now()
+        self._done.set()
+
+    def to_dict(self) -> Dict:
+        seconds = None
+        if self.started_at:
+            seconds = round(((self.finished_at or datetime.now()) - self.started_at).total_seconds(), 1)
+        return {
+            'job_id': self.id,
+            'report_type': self.report_type,
+            'format': self.format,
+            'project': self.project,
+            'params': self.params,
+            'status': self.status,
+            'cached': self.cached,
+            'rows': self.rows,
+            'error': self.error,
+            'seconds': seconds,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'download_name': self.download_name,
+        }
+
+
+def cache_dir() -> str:
+    path = REPORT_CONFIG.get('cache_dir', 'report_cache')
+    if not os.path.isabs(path):
+        path = os.path.join(_BASE_DIR, path)
+    return path
+
+
+def cache_key(report_type: str, project: str, params: Dict, version: str, fmt: str = 'xlsx') -> str:
+    raw = json.dumps([report_type, fmt, project, params, version], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _cache_path(key: str, fmt: str) -> str:
+    return os.path.join(cache_dir(), f'{key}.{fmt}')
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=REPORT_CONFIG.get('workers', 2),
+                                       thread_name_prefix='report-job')
+    return _executor
+
+
+# ==================== İŞ YÖNETİMİ ====================
+
+def submit(report_type: str, project: str, params: Dict = None, username: str = None,
+           fmt: str = 'xlsx') -> ReportJob:
+    """
+    Rapor işini kuyruğa alır. Aynı veri sürümü için cache'de dosya varsa iş hemen
+    'done' döner; aynı anahtarlı iş zaten kuyrukta/çalışıyorsa o iş döner.
+    """
+    if report_type not in report_builder.REPORTS:
+        raise ValueError(f"Bilinmeyen rapor: {report_type}")
+    if fmt not in report_builder.FORMATS:
+        raise ValueError(f"Desteklenmeyen format: {fmt}")
+    params = params or {}
+    key = cache_key(report_type, project, params, report_builder.data_version(report_type, project), fmt)
+
+    with _lock:
+        _expire_jobs()
+        for job in _jobs.values():
+            if job.cache_key == key and not job.finished:
+                return job
+
+        job = ReportJob(report_type, project, params, username, key, fmt)
+        _jobs[job.id] = job
+
+        path = _cache_path(key, fmt)
+        if os.path.exists(path):
+            job.path = path
+            job.cached = True
+            job.started_at = job.created_at
+            job._finish('done')
+            os.utime(path)      # Son kullanılan en son silinsin
+            return job
+
+    _get_executor().submit(_run, job)
+    return job
+
+
+def get(job_id: str) -> Optional[ReportJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def list_jobs(project: str = None) -> List[Dict]:
+    with _lock:
+        jobs = [j for j in _jobs.values() if project is None or j.project == project]
+    return [j.to_dict() for j in sorted(jobs, key=lambda j: j.created_at, reverse=True)]
+
+
+def _run(job: ReportJob):
+    """Thread havuzunda: raporu geçici dosyaya yazar, sonra cache'e taşır."""
+    job.status = 'running'
+    job.started_at = datetime.now()
+    temp_path = None
+    try:
+        # Geçici dosya cache klasöründe açılır: os.replace aynı birimde kalır
+        # (sistem temp'i başka diskteyse taşıma EXDEV / NOT_SAME_DEVICE ile düşer)
+        os.makedirs(cache_dir(), exist_ok=True)
+        temp_path, _, rows = report_builder.build_report(job.report_type, job.project, job.params, job.format,
+                                                         spool_dir=cache_dir())
+        path = _cache_path(job.cache_key, job.format)
+        os.replace(temp_path, path)
+        temp_path = None
+        job.path = path
+        job.rows = rows
+        job._finish('done')
+        _prune_cache()
+    except Exception as e:
+        print(f"DEBUG report job error ({job.report_type}/{job.project}): {e}")
+        job._finish('failed', str(e))
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError as e:
+                print(f"DEBUG report temp delete error: {e}")
+
+
+def _expire_jobs():
+    """Süresi dolan bitmiş işleri listeden çıkarır (_lock altında çağrılır)."""
+    ttl = REPORT_CONFIG.get('job_ttl_seconds', 3600)
+    now = datetime.now()
+    for job_id in [j.id for j in _jobs.values()
+                   if j.finished and (now - j.finished_at).total_seconds() > ttl]:
+        del _jobs[job_id]
+
+
+def _prune_cache():
+    """En son kullanılan cache_keep dosya dışındakileri siler."""
+    keep = REPORT_CONFIG.get('cache_keep', 30)
+    try:
+        extensions = tuple(f'.{fmt}' for fmt in report_builder.FORMATS)
+        # pv_ ile başlayanlar üretimi süren işlerin geçici dosyaları
+        entries = [os.path.join(cache_dir(), name) for name in os.listdir(cache_dir())
+                   if name.endswith(extensions) and not name.startswith('pv_')]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[keep:]:
+            os.remove(path)
+    except OSError as e:
+        print(f"DEBUG report cache prune error: {e}")
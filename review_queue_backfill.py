@@ -0,0 +1,94 @@
+"""
+Review Queue Backfill
+=====================
+photo_cache_builder kuyruğa sadece cache penceresindeki (varsayılan son 7 gün)
+fotoğrafları ekler. Bu betik geçmişteki doğrulanmamış fotoğrafları
+REVIEW_QUEUE['backfill_days'] geriye kadar, window_days'lik dilimler halinde
+kuyruğa ekler. Kuyrukta olan veya doğrulanmış fotoğraflar atlanır; tekrar
+çalıştırmak güvenlidir. İlk kurulumda bir kez, sonra gece çalıştırılır.
+"""
+
+import pymssql
+from datetime import datetime, timedelta
+
+from config import PROJECTS, PHOTOVERIFIER_DB, REVIEW_QUEUE
+from sources import get_source
+
+
+def get_pv_connection():
+    """PhotoVerifier veritabanı bağlantısı."""
+    return pymssql.connect(
+        server=PHOTOVERIFIER_DB['host'],
+        port=PHOTOVERIFIER_DB.get('port', 1433),
+        user=PHOTOVERIFIER_DB['username'],
+        password=PHOTOVERIFIER_DB['password'],
+        database=PHOTOVERIFIER_DB['database']
+    )
+
+
+def _fetch_photos(source, photo_type: str, start_date: str, end_date: str) -> list:
+    if photo_type == 'exhibition':
+        return source.get_exhibition_photos(start_date, end_date)
+    if photo_type == 'planogram':
+        return source.get_planogram_photos(start_date, end_date)
+    if photo_type == 'visit':
+        return source.get_visit_photos(start_date=start_date, end_date=end_date)
+    return []
+
+
+def backfill_project(project_key: str, days: int = None, window_days: int = None) -> int:
+    """
+    Projenin son `days` gününü yeniden eskiye dilim dilim kuyruğa ekler.
+    Her dilim ayrı transaction'dır. Eklenen fotoğraf sayısını döndürür.
+    """
+    days = days or REVIEW_QUEUE.get('backfill_days', 365)
+    window_days = max(1, window_days or REVIEW_QUEUE.get('backfill_window_days', 7))
+    print(f"\n📋 {project_key.upper()} kuyruğa ekleniyor (son {days} gün)...")
+
+    source = get_source(project_key)
+    conn = get_pv_connection()
+    cursor = conn.cursor()
+    total = 0
+
+    try:
+        for photo_type in PROJECTS[project_key].get('photo_tables', []):
+            added = 0
+            window_end = datetime.now()
+            oldest = datetime.now() - timedelta(days=days)
+            while window_end > oldest:
+                window_start = max(window_end - timedelta(days=window_days - 1), oldest)
+                start_date, end_date = window_start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')
+                try:
+                    photos = _fetch_photos(source, photo_type, start_date, end_date)
+                    added += source.enqueue_for_review(cursor, photo_type, photos)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"  ❌ {photo_type} {start_date} - {end_date}: {e}")
+                window_end = window_start - timedelta(days=1)
+            print(f"  📂 {photo_type}: {added} fotoğraf eklendi")
+            total += added
+    finally:
+        conn.close()
+
+    return total
+
+
+def backfill_all(days: int = None):
+    """Tüm projeler için geçmiş backfill."""
+    print("="*50)
+    print("📋 REVIEW QUEUE BACKFILL")
+    print(f"   Başlangıç: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*50)
+
+    total = sum(backfill_project(project_key, days) for project_key in PROJECTS)
+
+    print("\n" + "="*50)
+    print(f"✅ Toplam {total} fotoğraf kuyruğa eklendi")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    import sys
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    backfill_all(days)
@@ -4,6 +4,9 @@ Photo Verifier - Production Server
 Waitress WSGI server ile production çalıştırma.
 """
 
+import signal
+import sys
+
 from waitress import serve
 from app import app
 
@@ -14,4 +17,9 @@ if __name__ == '__main__':
     print("http://0.0.0.0:5555")
     print("=" * 50)
     
+    # SIGTERM/SIGBREAK'te normal çıkış: atexit ile bekleyen event logları yazılır
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    if hasattr(signal, 'SIGBREAK'):
+        signal.signal(signal.SIGBREAK, lambda *args: sys.exit(0))
+    
     serve(app, host='0.0.0.0', port=5555, threads=4)
@@ -4,16 +4,22 @@ Base Source - Temel Veritabanı İşlemleri
 Tüm projeler için ortak sorgular ve işlemler.
 """
 import os
-import pymssql
 import hashlib
 from datetime import datetime
 from typing import List, Dict, Optional
 from config import PHOTO_TYPE_CONFIG
-from config import PHOTOVERIFIER_DB
+from config import PHOTOVERIFIER_DB, VERIFICATION_INDEX, REVIEW_QUEUE
+from . import db
+from .parallel import run_parallel
+from .verification_index import VerificationIndex
+import metrics
 
 class BaseSource:
     """Temel veri kaynağı sınıfı."""
     
+    # Ziyaret seviyesindeki alanlar (cache'de fotoğraf başına tekrarlanmaz)
+    VISIT_FIELDS = ('VisitId', 'UserId', 'VisitStartDate', 'CustomerId', 'CustomerName', 'CustomerCode', 'Personnel')
+    
     def __init__(self, config: dict):
         self.config = config
         self.project_key = config['key']
@@ -23,26 +29,41 @@ class BaseSource:
         
         # Doğrulama DB'si (SQL Server - PhotoVerifier)
         self.pv_db_config = PHOTOVERIFIER_DB
+        
+        # Bellek içi doğrulama durumu indeksi
+        self.verification_index = VerificationIndex(self, **VERIFICATION_INDEX)
     
     def _get_connection(self):
-        """SQL Server bağlantısı oluşturur."""
-        return pymssql.connect(
-            server=self.db_config['host'],
-            port=self.db_config.get('port', 1433),
-            user=self.db_config['username'],
-            password=self.db_config['password'],
-            database=self.db_config['database']
-        )
+        """SQL Server bağlantısı (havuzdan; close() ile havuza döner)."""
+        return db.connect(self.db_config, pooled=True)
 
     def _get_pv_connection(self):
-        """PhotoVerifier veritabanı bağlantısı oluşturur."""
-        return pymssql.connect(
-            server=self.pv_db_config['host'],
-            port=self.pv_db_config.get('port', 1433),
-            user=self.pv_db_config['username'],
-            password=self.pv_db_config['password'],
-            database=self.pv_db_config['database']
-        )    
+        """PhotoVerifier veritabanı bağlantısı (havuzdan; close() ile havuza döner)."""
+        return db.connect(self.pv_db_config, pooled=True)
+
+    def run_parallel(self, calls: Dict, timeout: float = None, defaults: Dict = None) -> Dict:
+        """Bağımsız çağrıları aynı anda çalıştırır (bkz. sources/parallel.py)."""
+        return run_parallel(calls, timeout=timeout, defaults=defaults)
+
+    def _query_scalar(self, query: str, params: tuple):
+        """Tek değer döndüren sorguyu kendi bağlantısında çalıştırır."""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def _query_rows(self, query: str, params: tuple) -> List[Dict]:
+        """Sorgunun tüm satırlarını kendi bağlantısında getirir."""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(as_dict=True)
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
 
     def _fix_turkish_chars(self, text: str) -> str:
         """Bozuk Türkçe karakterleri düzeltir."""
@@ -298,36 +319,127 @@ class BaseSource:
             print(f"DEBUG ERROR in get_visit_photos: {e}")
             return []
     
-    def get_photos_grouped(self, photo_type: str, start_date: str, end_date: str, user_id: int = None, customer_code: str = None) -> List[Dict]:
-        """Fotoğrafları ziyarete göre gruplandırarak getirir."""
+    def get_photos_grouped(self, photo_type: str, start_date: str, end_date: str, user_id: int = None, customer_code: str = None, explain: Dict = None) -> List[Dict]:
+        """
+        Fotoğrafları ziyarete göre gruplandırarak getirir.
+        explain sözlüğü verilirse gün bazında kaynak (cache/canlı) ve süre bilgisi doldurulur.
+        """
         print(f"DEBUG get_photos_grouped: type={photo_type}, from={start_date}, to={end_date}, user={user_id}, customer={customer_code}")
         
+        if photo_type not in ('exhibition', 'planogram', 'visit'):
+            print(f"DEBUG unknown photo_type: {photo_type}")
+            return []
+        
         try:
-            # Filtre yoksa ve cache varsa, cache'den oku
-            if not user_id and not customer_code and self.has_photo_cache(photo_type, start_date, end_date):
-                print("DEBUG: Cache'den okunuyor...")
-                photos = self.get_photos_from_cache(photo_type, start_date, end_date)
-            else:
-                # Canlı sorgu
-                print("DEBUG: Canlı sorgu yapılıyor...")
-                if photo_type == 'exhibition':
-                    photos = self.get_exhibition_photos(start_date, end_date, user_id, customer_code)
-                elif photo_type == 'planogram':
-                    photos = self.get_planogram_photos(start_date, end_date, user_id, customer_code)
-                elif photo_type == 'visit':
-                    photos = self.get_visit_photos(start_date=start_date, end_date=end_date, user_id=user_id, customer_code=customer_code)
-                else:
-                    print(f"DEBUG unknown photo_type: {photo_type}")
-                    return []
-            
-            print(f"DEBUG photos count: {len(photos)}")
+            fetched = self.fetch_photos(photo_type, start_date, end_date, user_id, customer_code)
+            result = fetched['visits']
+            verifications = fetched['verifications']
+            if explain is not None:
+                explain.update(fetched['explain'])
         except Exception as e:
             print(f"DEBUG ERROR in get_photos_grouped: {e}")
             import traceback
             traceback.print_exc()
             return []
         
-        # Ziyarete göre grupla
+        for group in result:
+            for photo in group['photos']:
+                photo['verification'] = verifications.get(photo['PhotoId'])
+        
+        print(f"DEBUG grouped visits count: {len(result)}")
+        return result
+    
+    def fetch_photos(self, photo_type: str, start_date: str, end_date: str, user_id: int = None, customer_code: str = None) -> Dict:
+        """
+        Fotoğraf getirme hattı: cache okuma, eksik günler için canlı sorgu ve
+        doğrulama bilgileri tek PhotoVerifier bağlantısı üzerinden yapılır.
+        Cache kontrolü ayrı bir COUNT yerine okuma sorgusunun dönen günlerinden çıkarılır.
+        
+        Dönüş: {'visits': [...], 'verifications': {PhotoId: {...}}, 'explain': {...}}
+        Ziyaretler tarihe göre yeniden eskiye sıralıdır.
+        """
+        import json
+        import time
+        
+        started = time.perf_counter()
+        explain = {
+            'photo_type': photo_type,
+            'date_range': f"{start_date} - {end_date}",
+            'days': {},
+            'timings': {},
+        }
+        sorted_lists = []
+        
+        conn = self._get_pv_connection()
+        try:
+            cursor = conn.cursor(as_dict=True)
+            
+            # 1. Cache oku (aynı zamanda hangi günlerin cache'de olduğunu gösterir)
+            t = time.perf_counter()
+            cursor.execute('''
+                SELECT CacheDate, Details
+                FROM PhotoListCache
+                WHERE Project = %s AND PhotoType = %s
+                AND CacheDate BETWEEN %s AND %s
+                ORDER BY CacheDate DESC
+            ''', (self.project_key, photo_type, start_date, end_date))
+            rows = cursor.fetchall()
+            explain['timings']['cache_read_ms'] = round((time.perf_counter() - t) * 1000, 1)
+            
+            t = time.perf_counter()
+            for row in rows:
+                day = str(row['CacheDate'])[:10]
+                day_visits = self._decode_cache_day(json.loads(row['Details']), user_id, customer_code) if row['Details'] else []
+                sorted_lists.append(day_visits)
+                explain['days'][day] = {'source': 'cache', 'photos': sum(len(v['photos']) for v in day_visits)}
+            explain['timings']['cache_decode_ms'] = round((time.perf_counter() - t) * 1000, 1)
+            
+            # 2. Cache'de olmayan günler için canlı sorgu (ardışık günler tek sorguda)
+            t = time.perf_counter()
+            missing_days = [d for d in self._date_range(start_date, end_date) if d not in explain['days']]
+            for range_start, range_end in self._contiguous_ranges(missing_days):
+                live_photos = self._get_live_photos(photo_type, range_start, range_end, user_id, customer_code)
+                sorted_lists.append(self._group_into_visits(live_photos))
+                for day in self._date_range(range_start, range_end):
+                    explain['days'][day] = {'source': 'live', 'photos': 0}
+                for photo in live_photos:
+                    photo_date = photo.get('PhotoDate') or photo.get('StartDate')
+                    day = str(photo_date)[:10]
+                    if day in explain['days']:
+                        explain['days'][day]['photos'] += 1
+            explain['timings']['live_ms'] = round((time.perf_counter() - t) * 1000, 1)
+            
+            # Günlük listeler zaten sıralı: yeniden sıralamak yerine birleştir
+            t = time.perf_counter()
+            visits = self._merge_sorted_visits(sorted_lists)
+            explain['timings']['merge_ms'] = round((time.perf_counter() - t) * 1000, 1)
+            
+            # 3. Doğrulama bilgileri (bellek indeksi, kullanılamıyorsa aynı bağlantı)
+            t = time.perf_counter()
+            photo_ids = [p['PhotoId'] for v in visits for p in v['photos']]
+            verifications = self.verification_index.lookup(photo_type, photo_ids)
+            explain['verification_source'] = 'index' if verifications is not None else 'db'
+            if verifications is None:
+                verifications = self._query_verification_statuses(cursor, photo_ids, photo_type)
+            explain['timings']['verification_ms'] = round((time.perf_counter() - t) * 1000, 1)
+        finally:
+            conn.close()
+        
+        explain['days'] = dict(sorted(explain['days'].items(), reverse=True))
+        explain['cache_days'] = sum(1 for d in explain['days'].values() if d['source'] == 'cache')
+        explain['live_days'] = sum(1 for d in explain['days'].values() if d['source'] == 'live')
+        metrics.record_cache('photo_list', hits=explain['cache_days'], misses=explain['live_days'])
+        explain['photo_count'] = len(photo_ids)
+        explain['timings']['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        
+        return {'visits': visits, 'verifications': verifications, 'explain': explain}
+    
+    @classmethod
+    def _group_into_visits(cls, photos: List[Dict], slim: bool = False) -> List[Dict]:
+        """
+        Fotoğrafları ziyarete göre gruplar, ziyaret tarihine göre yeniden eskiye sıralar.
+        slim=True ise ziyaret seviyesindeki alanlar fotoğraflardan çıkarılır (cache için).
+        """
         grouped = {}
         for photo in photos:
             visit_id = photo.get('VisitId')
@@ -338,31 +450,120 @@ class BaseSource:
                     'customer_code': photo.get('CustomerCode', ''),
                     'personnel': photo.get('Personnel', ''),
                     'visit_date': photo.get('VisitStartDate') or photo.get('StartDate'),
+                    'user_id': photo.get('UserId'),
                     'photos': []
                 }
+            if slim:
+                photo = {k: v for k, v in photo.items() if k not in cls.VISIT_FIELDS}
             grouped[visit_id]['photos'].append(photo)
         
-        # Liste olarak döndür, tarihe göre sıralı
         result = list(grouped.values())
         result.sort(key=lambda x: str(x['visit_date'] or ''), reverse=True)
+        return result
+    
+    @staticmethod
+    def _merge_sorted_visits(sorted_lists: List[List[Dict]]) -> List[Dict]:
+        """
+        Tarihe göre sıralı ziyaret listelerini birleştirir.
+        Gece yarısını geçen ziyaretler iki günde görünebilir; fotoğrafları tek ziyarette toplanır.
+        """
+        import heapq
         
-        # Doğrulama bilgilerini TOPLU al
-        all_photo_ids = []
-        for group in result:
-            for photo in group['photos']:
-                all_photo_ids.append(photo['PhotoId'])
+        merged = {}
+        for visit in heapq.merge(*sorted_lists, key=lambda x: str(x['visit_date'] or ''), reverse=True):
+            existing = merged.get(visit['visit_id'])
+            if existing:
+                existing['photos'].extend(visit['photos'])
+            else:
+                merged[visit['visit_id']] = visit
+        return list(merged.values())
+    
+    def _get_live_photos(self, photo_type: str, start_date: str, end_date: str, user_id: int = None, customer_code: str = None) -> List[Dict]:
+        """Fotoğraf türüne göre canlı sorguyu çalıştırır."""
+        if photo_type == 'exhibition':
+            return self.get_exhibition_photos(start_date, end_date, user_id, customer_code)
+        elif photo_type == 'planogram':
+            return self.get_planogram_photos(start_date, end_date, user_id, customer_code)
+        elif photo_type == 'visit':
+            return self.get_visit_photos(start_date=start_date, end_date=end_date, user_id=user_id, customer_code=customer_code)
+        return []
+    
+    @staticmethod
+    def _date_range(start_date: str, end_date: str) -> List[str]:
+        """İki tarih arasındaki günleri (dahil) 'YYYY-MM-DD' listesi olarak döndürür."""
+        from datetime import timedelta
+        day = datetime.strptime(start_date, '%Y-%m-%d')
+        last = datetime.strptime(end_date, '%Y-%m-%d')
+        days = []
+        while day <= last:
+            days.append(day.strftime('%Y-%m-%d'))
+            day += timedelta(days=1)
+        return days
+    
+    @staticmethod
+    def _contiguous_ranges(days: List[str]) -> List[tuple]:
+        """Gün listesini ardışık (başlangıç, bitiş) aralıklarına böler."""
+        from datetime import timedelta
+        ranges = []
+        for day in sorted(days):
+            if ranges and (datetime.strptime(day, '%Y-%m-%d') - datetime.strptime(ranges[-1][1], '%Y-%m-%d')) == timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+    
+    # Ziyaretin tüm fotoğrafları tek sorguda: ziyaret satırı (bilgi + ziyaret fotoğrafı), teşhir ve planogram.
+    # Kolon tipleri ilk SELECT'te sabitlenir; diğer dallardaki NULL'lar bu tiplere uyar.
+    # {exhibition_type}: Type kolonu bazı projelerde yok (has_exhibition_type)
+    _VISIT_PHOTOS_QUERY = """
+        SELECT 
+            'visit' as PhotoType,
+            v.Id as PhotoId,
+            v.ImagePath,
+            v.StartDate as CreatedDate,
+            v.StartDate,
+            v.FinishDate,
+            r.CustomerId,
+            c.CustomerName,
+            c.CustomerCode,
+            u.Name + ' ' + u.Surname as Personnel,
+            CAST(NULL AS INT) as Type, CAST(NULL AS INT) as PackageQuantity, CAST(NULL AS INT) as ProductQuantity,
+            CAST(NULL AS INT) as LidQuantity, CAST(NULL AS NVARCHAR(500)) as BeforeImagePath,
+            0 as SortOrder
+        FROM TeammateVisit v
+        INNER JOIN TeammateRoute r ON v.TeammateRouteId = r.Id
+        INNER JOIN Customers c ON r.CustomerId = c.CustomerCode
+        INNER JOIN Users u ON v.UserId = u.Id
+        WHERE v.Id = %(visit_id)s
         
-        verifications = self.get_verification_statuses_bulk(all_photo_ids, photo_type)
+        UNION ALL
         
-        for group in result:
-            for photo in group['photos']:
-                photo['verification'] = verifications.get(photo['PhotoId'])
+        SELECT 'exhibition', Id, ImagePath, CreatedDate, NULL, NULL, NULL, NULL, NULL, NULL,
+               {exhibition_type}, PackageQuantity, ProductQuantity, NULL, NULL, 1
+        FROM TeammateVisitExhibition
+        WHERE TeammateVisitId = %(visit_id)s AND ImagePath IS NOT NULL AND IsDeleted = 0
         
-        print(f"DEBUG grouped visits count: {len(result)}")
-        return result
+        UNION ALL
+        
+        SELECT 'planogram', Id, ImagePath, CreatedDate, NULL, NULL, NULL, NULL, NULL, NULL,
+               NULL, NULL, NULL, LidQuantity, BeforeImagePath, 2
+        FROM TeammateVisitPlanogram
+        WHERE TeammateVisitId = %(visit_id)s AND ImagePath IS NOT NULL AND IsDeleted = 0
+        
+        ORDER BY SortOrder, CreatedDate
+    """
     
-    def get_all_visit_photos(self, visit_id: int) -> Dict:
-        """Bir ziyaretin TÜM fotoğraflarını getirir (exhibition + planogram + visit)."""
+    _VISIT_PHOTO_FIELDS = {
+        'exhibition': ('PhotoId', 'ImagePath', 'CreatedDate', 'Type', 'PackageQuantity', 'ProductQuantity'),
+        'planogram': ('PhotoId', 'ImagePath', 'CreatedDate', 'LidQuantity', 'BeforeImagePath'),
+    }
+    
+    def get_all_visit_photos(self, visit_id: int, with_verifications: bool = True) -> Dict:
+        """
+        Bir ziyaretin TÜM fotoğraflarını getirir (exhibition + planogram + visit).
+        Tek UNION ALL sorgusu; with_verifications ise doğrulama durumları toplu eklenir
+        (photo['verification']).
+        """
         result = {
             'visit_id': visit_id,
             'info': None,
@@ -372,64 +573,47 @@ class BaseSource:
         }
         
         conn = self._get_connection()
-        cursor = conn.cursor(as_dict=True)
+        try:
+            cursor = conn.cursor(as_dict=True)
+            exhibition_type = "Type" if self.config.get('has_exhibition_type', True) else "NULL"
+            cursor.execute(self._VISIT_PHOTOS_QUERY.format(exhibition_type=exhibition_type), {'visit_id': visit_id})
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
         
-        # Ziyaret bilgisi
-        cursor.execute("""
-            SELECT 
-                v.Id as VisitId,
-                v.StartDate,
-                v.FinishDate,
-                v.ImagePath,
-                r.CustomerId,
-                c.CustomerName,
-                c.CustomerCode,
-                u.Name + ' ' + u.Surname as Personnel
-            FROM TeammateVisit v
-            INNER JOIN TeammateRoute r ON v.TeammateRouteId = r.Id
-            INNER JOIN Customers c ON r.CustomerId = c.CustomerCode
-            INNER JOIN Users u ON v.UserId = u.Id
-            WHERE v.Id = %s
-        """, (visit_id,))
-        
-        visit_info = cursor.fetchone()
-        if visit_info:
-            result['info'] = visit_info
-            if visit_info['ImagePath']:
-                result['visit'].append({
-                    'PhotoId': visit_id,
-                    'ImagePath': visit_info['ImagePath'],
-                    'ImageUrl': self._convert_image_path(visit_info['ImagePath']),
-                    'PhotoType': 'visit'
-                })
+        for row in rows:
+            photo_type = row['PhotoType']
+            if photo_type == 'visit':
+                result['info'] = {
+                    'VisitId': row['PhotoId'],
+                    'StartDate': row['StartDate'],
+                    'FinishDate': row['FinishDate'],
+                    'ImagePath': row['ImagePath'],
+                    'CustomerId': row['CustomerId'],
+                    'CustomerName': row['CustomerName'],
+                    'CustomerCode': row['CustomerCode'],
+                    'Personnel': row['Personnel'],
+                }
+                if not row['ImagePath']:
+                    continue
+                photo = {'PhotoId': visit_id, 'ImagePath': row['ImagePath']}
+            else:
+                photo = {field: row[field] for field in self._VISIT_PHOTO_FIELDS[photo_type]}
+            photo['ImageUrl'] = self._convert_image_path(photo['ImagePath'])
+            photo['PhotoType'] = photo_type
+            result[photo_type].append(photo)
+        
+        if not with_verifications:
+            return result
         
-        # Teşhir fotoğrafları
-        cursor.execute("""
-            SELECT Id as PhotoId, ImagePath, CreatedDate, Type, PackageQuantity, ProductQuantity
-            FROM TeammateVisitExhibition
-            WHERE TeammateVisitId = %s AND ImagePath IS NOT NULL AND IsDeleted = 0
-            ORDER BY CreatedDate
-        """, (visit_id,))
-        
-        for row in cursor.fetchall():
-            row['ImageUrl'] = self._convert_image_path(row['ImagePath'])
-            row['PhotoType'] = 'exhibition'
-            result['exhibition'].append(row)
-        
-        # Planogram fotoğrafları
-        cursor.execute("""
-            SELECT Id as PhotoId, ImagePath, CreatedDate, LidQuantity, BeforeImagePath
-            FROM TeammateVisitPlanogram
-            WHERE TeammateVisitId = %s AND ImagePath IS NOT NULL AND IsDeleted = 0
-            ORDER BY CreatedDate
-        """, (visit_id,))
-        
-        for row in cursor.fetchall():
-            row['ImageUrl'] = self._convert_image_path(row['ImagePath'])
-            row['PhotoType'] = 'planogram'
-            result['planogram'].append(row)
+        # Doğrulama durumları (bellek indeksi, yoksa tür başına tek sorgu)
+        keys = [(photo['PhotoId'], photo_type)
+                for photo_type in ('visit', 'exhibition', 'planogram') for photo in result[photo_type]]
+        verifications = self.get_verification_statuses_by_key(keys)
+        for photo_type in ('visit', 'exhibition', 'planogram'):
+            for photo in result[photo_type]:
+                photo['verification'] = verifications.get((photo['PhotoId'], photo_type))
         
-        conn.close()
         return result
     
     def get_verification_statuses_bulk(self, photo_ids: List[int], photo_type: str) -> Dict[int, Dict]:
@@ -437,32 +621,61 @@ class BaseSource:
         if not photo_ids:
             return {}
         
+        indexed = self.verification_index.lookup(photo_type, photo_ids)
+        if indexed is not None:
+            return indexed
+        
         try:
             conn = self._get_pv_connection()
             cursor = conn.cursor(as_dict=True)
+            results = self._query_verification_statuses(cursor, photo_ids, photo_type)
+            conn.close()
+            return results
+        except Exception as e:
+            print(f"DEBUG get_verification_statuses_bulk error: {e}")
+            return {}
+    
+    def get_verification_statuses_by_key(self, keys: List[tuple]) -> Dict[tuple, Dict]:
+        """
+        Farklı türlerdeki fotoğrafların doğrulama durumlarını getirir.
+        keys: [(photo_id, photo_type), ...] - dönüş aynı anahtarlarla.
+        """
+        by_type = {}
+        for photo_id, photo_type in keys:
+            by_type.setdefault(photo_type, []).append(photo_id)
+        
+        results = {}
+        for photo_type, photo_ids in by_type.items():
+            for photo_id, verification in self.get_verification_statuses_bulk(photo_ids, photo_type).items():
+                results[(photo_id, photo_type)] = verification
+        return results
+    
+    def _query_verification_statuses(self, cursor, photo_ids: List[int], photo_type: str, chunk_size: int = 1000) -> Dict[int, Dict]:
+        """Verilen cursor üzerinden doğrulama durumlarını getirir (SQL Server parametre limiti için parçalı)."""
+        results = {}
+        photo_ids = list(dict.fromkeys(photo_ids))
+        
+        for i in range(0, len(photo_ids), chunk_size):
+            chunk = photo_ids[i:i + chunk_size]
             
             # IN clause için placeholder oluştur
-            placeholders = ','.join(['%s'] * len(photo_ids))
+            placeholders = ','.join(['%s'] * len(chunk))
             
             cursor.execute(f'''
                 SELECT PhotoId, Status as status, Note as note, VerifiedAt as verified_at
                 FROM Verifications
                 WHERE Project = %s AND PhotoType = %s AND PhotoId IN ({placeholders})
-            ''', (self.project_key, photo_type, *photo_ids))
+            ''', (self.project_key, photo_type, *chunk))
             
-            results = cursor.fetchall()
-            conn.close()
-            
-            # Dict'e çevir
-            return {r['PhotoId']: r for r in results}
-        except Exception as e:
-            print(f"DEBUG get_verification_statuses_bulk error: {e}")
-            return {}
+            for r in cursor.fetchall():
+                results[r['PhotoId']] = r
+        
+        return results
     
     # ==================== İSTATİSTİKLER ====================
     
     def get_stats(self, start_date: str, end_date: str) -> Dict:
-        """İstatistikleri getirir."""
+        """İstatistikleri getirir (sayımlar paralel, her biri ayrı bağlantıda)."""
         stats = {
             'date_range': f"{start_date} - {end_date}",
             'exhibition_count': 0,
@@ -475,100 +688,280 @@ class BaseSource:
         user_filter = self._build_user_filter()
         user_join = "LEFT JOIN UserRoles ur ON v.UserId = ur.UserId" if user_filter else ""
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Exhibition
-        cursor.execute(f"""
-            SELECT COUNT(*) FROM TeammateVisitExhibition e
-            INNER JOIN TeammateVisit v ON e.TeammateVisitId = v.Id
-            {user_join}
-            WHERE e.ImagePath IS NOT NULL AND e.IsDeleted = 0
-            AND CAST(e.CreatedDate AS DATE) BETWEEN %s AND %s
-            {user_filter}
-        """, (start_date, end_date))
-        stats['exhibition_count'] = cursor.fetchone()[0]
+        queries = {
+            'exhibition_count': self._photo_count_query('exhibition'),
+            'planogram_count': self._photo_count_query('planogram'),
+            'visit_count': self._photo_count_query('visit'),
+            # Unique visits
+            'unique_visits': f"""
+                SELECT COUNT(DISTINCT e.TeammateVisitId) FROM TeammateVisitExhibition e
+                INNER JOIN TeammateVisit v ON e.TeammateVisitId = v.Id
+                {user_join}
+                WHERE CAST(e.CreatedDate AS DATE) BETWEEN %s AND %s
+                {user_filter}
+            """,
+            # Active personnel
+            'active_personnel': f"""
+                SELECT COUNT(DISTINCT v.UserId) FROM TeammateVisit v
+                {user_join}
+                WHERE CAST(v.CreatedDate AS DATE) BETWEEN %s AND %s
+                {user_filter}
+            """,
+        }
         
-        # Planogram
-        cursor.execute(f"""
-            SELECT COUNT(*) FROM TeammateVisitPlanogram p
+        params = (start_date, end_date)
+        stats.update(self.run_parallel({
+            key: (lambda query=query: self._query_scalar(query, params))
+            for key, query in queries.items()
+        }))
+        return stats
+    
+    def _photo_count_query(self, photo_type: str, select_ids: bool = False) -> str:
+        """
+        Tarih aralığındaki (CreatedDate, dahil) fotoğraf sayısı sorgusu; parametreler (başlangıç, bitiş).
+        select_ids: sayı yerine fotoğraf Id'lerini döndürür.
+        """
+        user_filter = self._build_user_filter()
+        user_join = "LEFT JOIN UserRoles ur ON v.UserId = ur.UserId" if user_filter else ""
+        if photo_type == 'visit':
+            return f"""
+                SELECT {'v.Id AS PhotoId' if select_ids else 'COUNT(*)'} FROM TeammateVisit v
+                {user_join}
+                WHERE v.ImagePath IS NOT NULL AND v.IsDeleted = 0
+                AND CAST(v.CreatedDate AS DATE) BETWEEN %s AND %s
+                {user_filter}
+            """
+        table = 'TeammateVisitExhibition' if photo_type == 'exhibition' else 'TeammateVisitPlanogram'
+        return f"""
+            SELECT {'p.Id AS PhotoId' if select_ids else 'COUNT(*)'} FROM {table} p
             INNER JOIN TeammateVisit v ON p.TeammateVisitId = v.Id
             {user_join}
             WHERE p.ImagePath IS NOT NULL AND p.IsDeleted = 0
             AND CAST(p.CreatedDate AS DATE) BETWEEN %s AND %s
             {user_filter}
-        """, (start_date, end_date))
-        stats['planogram_count'] = cursor.fetchone()[0]
-        
-        # Visit
-        cursor.execute(f"""
-            SELECT COUNT(*) FROM TeammateVisit v
-            {user_join}
-            WHERE v.ImagePath IS NOT NULL AND v.IsDeleted = 0
-            AND CAST(v.CreatedDate AS DATE) BETWEEN %s AND %s
-            {user_filter}
-        """, (start_date, end_date))
-        stats['visit_count'] = cursor.fetchone()[0]
+        """
+    
+    def get_photo_counts(self, start_date: str, end_date: str, with_pending: bool = False) -> Dict:
+        """
+        Tür bazında fotoğraf sayıları. PhotoListCache'ten okunur; cache'de olmayan günler
+        canlı sorguyla tamamlanır.
+        with_pending: cache'teki günlerin fotoğraf Id'leri (Details) ve eksik günlerin canlı
+        Id'leri doğrulamalarla eşlenir; doğrulaması olmayanlar 'pending' olarak döner (sayı
+        ve bekleyen aynı fotoğraf kümesinden). Doğrulama okuma hatası çağırana fırlatılır.
+        Dönüş: {'counts': {tür: sayı}, 'pending': {tür: sayı} (with_pending ise),
+                'cache_days': n, 'live_days': n}
+        """
+        photo_types = self.config.get('photo_tables', [])
+        days = self._date_range(start_date, end_date)
         
-        # Unique visits
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT e.TeammateVisitId) FROM TeammateVisitExhibition e
-            INNER JOIN TeammateVisit v ON e.TeammateVisitId = v.Id
-            {user_join}
-            WHERE CAST(e.CreatedDate AS DATE) BETWEEN %s AND %s
-            {user_filter}
-        """, (start_date, end_date))
-        stats['unique_visits'] = cursor.fetchone()[0]
+        conn = self._get_pv_connection()
+        try:
+            cursor = conn.cursor(as_dict=True)
+            cursor.execute(f'''
+                SELECT PhotoType, CacheDate, PhotoCount{', Details' if with_pending else ''}
+                FROM PhotoListCache
+                WHERE Project = %s AND CacheDate BETWEEN %s AND %s
+            ''', (self.project_key, start_date, end_date))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
         
-        # Active personnel
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT v.UserId) FROM TeammateVisit v
-            {user_join}
-            WHERE CAST(v.CreatedDate AS DATE) BETWEEN %s AND %s
-            {user_filter}
-        """, (start_date, end_date))
-        stats['active_personnel'] = cursor.fetchone()[0]
+        import json
+        cached = {}
+        for row in rows:
+            if with_pending:
+                visits = self._decode_cache_day(json.loads(row['Details'])) if row['Details'] else []
+                value = [photo['PhotoId'] for visit in visits for photo in visit['photos']]
+            else:
+                value = row['PhotoCount']
+            cached.setdefault(row['PhotoType'], {})[str(row['CacheDate'])[:10]] = value
         
-        conn.close()
-        return stats
+        result = {'counts': {}, 'cache_days': 0, 'live_days': 0}
+        if with_pending:
+            result['pending'] = {}
+        for photo_type in photo_types:
+            type_days = cached.get(photo_type, {})
+            missing_days = [day for day in days if day not in type_days]
+            live_ranges = self._contiguous_ranges(missing_days)
+            if with_pending:
+                photo_ids = [photo_id for day in days for photo_id in type_days.get(day, [])]
+                for range_start, range_end in live_ranges:
+                    query = self._photo_count_query(photo_type, select_ids=True)
+                    photo_ids += [row['PhotoId'] for row in self._query_rows(query, (range_start, range_end))]
+                photo_ids = list(dict.fromkeys(photo_ids))
+                result['counts'][photo_type] = len(photo_ids)
+                result['pending'][photo_type] = len(photo_ids) - self._count_verified(photo_type, photo_ids)
+            else:
+                count = sum(type_days.get(day, 0) for day in days)
+                for range_start, range_end in live_ranges:
+                    count += self._query_scalar(self._photo_count_query(photo_type), (range_start, range_end))
+                result['counts'][photo_type] = count
+            result['cache_days'] += len(days) - len(missing_days)
+            result['live_days'] += len(missing_days)
+        return result
+    
+    def _count_verified(self, photo_type: str, photo_ids: List[int]) -> int:
+        """Doğrulaması olan fotoğraf sayısı (indeks, yoksa veritabanı); hata yutulmaz."""
+        if not photo_ids:
+            return 0
+        verified = self.verification_index.lookup(photo_type, photo_ids)
+        if verified is None:
+            conn = self._get_pv_connection()
+            try:
+                verified = self._query_verification_statuses(conn.cursor(as_dict=True), photo_ids, photo_type)
+            finally:
+                conn.close()
+        return len(verified)
+    
+    def get_verification_counts(self, start_date: str, end_date: str) -> Dict:
+        """Tarih aralığında (doğrulama tarihi, dahil) durum bazında doğrulama sayıları."""
+        counts = {status: 0 for status in self.VERIFICATION_STATUSES}
+        conn = self._get_pv_connection()
+        try:
+            cursor = conn.cursor(as_dict=True)
+            cursor.execute('''
+                SELECT Status, COUNT(*) as count
+                FROM Verifications
+                WHERE Project = %s AND VerifiedAt >= %s AND VerifiedAt < DATEADD(day, 1, CAST(%s AS DATE))
+                GROUP BY Status
+            ''', (self.project_key, start_date, end_date))
+            for row in cursor.fetchall():
+                counts[row['Status']] = row['count']
+        finally:
+            conn.close()
+        return counts
+    
+    def get_duplicate_summary(self) -> Optional[Dict]:
+        """Duplicate cache özeti (grup ve fotoğraf sayısı, güncelleme zamanı); cache yoksa None."""
+        conn = self._get_pv_connection()
+        try:
+            cursor = conn.cursor(as_dict=True)
+            cursor.execute('''
+                SELECT COUNT(*) as groups, COALESCE(SUM(PhotoCount), 0) as photos, MAX(UpdatedAt) as updated_at
+                FROM DuplicateCache
+                WHERE Project = %s
+            ''', (self.project_key,))
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        return row if row and row['groups'] else None
     
     # ==================== DOĞRULAMA ====================
     
+    VERIFICATION_STATUSES = ('approved', 'rejected', 'suspicious')
+    
     def verify_photo(self, photo_id: int, photo_type: str, status: str, note: str = None, visit_id: int = None, verified_by: int = None) -> bool:
         """Fotoğraf doğrulama sonucunu kaydeder."""
+        result = self.verify_photos_bulk([{
+            'photo_id': photo_id,
+            'photo_type': photo_type,
+            'status': status,
+            'note': note,
+            'visit_id': visit_id,
+        }], verified_by=verified_by)
+        
+        if not result[0]['success']:
+            print(f"DEBUG verify_photo error: {result[0].get('error')}")
+        return result[0]['success']
+    
+    def verify_photos_bulk(self, items: List[Dict], verified_by: int = None, chunk_size: int = 300) -> List[Dict]:
+        """
+        Birden fazla doğrulamayı tek transaction içinde MERGE ile kaydeder (SELECT + UPDATE/INSERT yerine).
+        items: [{'photo_id', 'photo_type', 'status', 'note', 'visit_id'}, ...]
+        Dönüş: her öğe için sırasıyla {'photo_id', 'photo_type', 'success', 'action' veya 'error'}
+        """
+        results = []
+        valid = {}  # (photo_type, photo_id) -> öğe sırası; aynı fotoğraf tekrar gelirse son karar geçerli
+        
+        for i, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            photo_type = item.get('photo_type')
+            status = item.get('status')
+            result = {'photo_id': item.get('photo_id'), 'photo_type': photo_type, 'success': False}
+            results.append(result)
+            
+            try:
+                photo_id = int(item.get('photo_id'))
+            except (TypeError, ValueError):
+                result['error'] = 'Geçersiz fotoğraf ID'
+                continue
+            if photo_type not in self.config.get('photo_tables', []):
+                result['error'] = f'Geçersiz fotoğraf türü: {photo_type}'
+                continue
+            if status not in self.VERIFICATION_STATUSES:
+                result['error'] = f'Geçersiz durum: {status}'
+                continue
+            
+            result['photo_id'] = photo_id
+            previous = valid.get((photo_type, photo_id))
+            if previous is not None:
+                results[previous].update({'success': True, 'action': 'superseded'})
+            valid[(photo_type, photo_id)] = i
+        
+        if not valid:
+            return results
+        
+        rows = []
+        for (photo_type, photo_id), i in valid.items():
+            item = items[i]
+            rows.append((photo_type, photo_id, item.get('visit_id'), item['status'], item.get('note')))
+        
         try:
             conn = self._get_pv_connection()
             cursor = conn.cursor()
+            actions = {}
             
-            # Önce var mı kontrol et
-            cursor.execute('''
-                SELECT Id FROM Verifications 
-                WHERE Project = %s AND PhotoType = %s AND PhotoId = %s
-            ''', (self.project_key, photo_type, photo_id))
-            
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.execute('''
-                    UPDATE Verifications 
-                    SET Status = %s, Note = %s, VerifiedAt = GETDATE(), VerifiedBy = %s
-                    WHERE Project = %s AND PhotoType = %s AND PhotoId = %s
-                ''', (status, note, verified_by, self.project_key, photo_type, photo_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO Verifications (Project, PhotoType, PhotoId, VisitId, Status, Note, VerifiedBy)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ''', (self.project_key, photo_type, photo_id, visit_id, status, note, verified_by))
+            # SQL Server parametre limiti (2100) için parçalı, tek transaction
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                values = ','.join(['(%s, %s, %s, %s, %s)'] * len(chunk))
+                params = [value for row in chunk for value in row]
+                
+                cursor.execute(f'''
+                    MERGE Verifications WITH (HOLDLOCK) AS t
+                    USING (VALUES {values}) AS s (PhotoType, PhotoId, VisitId, Status, Note)
+                    ON t.Project = %s AND t.PhotoType = s.PhotoType AND t.PhotoId = s.PhotoId
+                    WHEN MATCHED THEN
+                        UPDATE SET Status = s.Status, Note = s.Note, VerifiedAt = GETDATE(), VerifiedBy = %s
+                    WHEN NOT MATCHED THEN
+                        INSERT (Project, PhotoType, PhotoId, VisitId, Status, Note, VerifiedBy)
+                        VALUES (%s, s.PhotoType, s.PhotoId, s.VisitId, s.Status, s.Note, %s)
+                    OUTPUT $action, inserted.PhotoType, inserted.PhotoId;
+                ''', (*params, self.project_key, verified_by, self.project_key, verified_by))
+                
+                for action, photo_type, photo_id in cursor.fetchall():
+                    actions[(photo_type, photo_id)] = action.lower()
+                
+                # Doğrulanan fotoğraflar inceleme kuyruğundan çıkar
+                keys = ','.join(['(%s, %s)'] * len(chunk))
+                cursor.execute(f'''
+                    DELETE q FROM ReviewQueue q
+                    INNER JOIN (VALUES {keys}) AS s (PhotoType, PhotoId)
+                        ON q.Project = %s AND q.PhotoType = s.PhotoType AND q.PhotoId = s.PhotoId
+                ''', (*[value for row in chunk for value in row[:2]], self.project_key))
             
             conn.commit()
             conn.close()
-            return True
         except Exception as e:
-            print(f"DEBUG verify_photo error: {e}")
-            return False
+            print(f"DEBUG verify_photos_bulk error: {e}")
+            for result in results:
+                if 'error' not in result:
+                    result.update({'success': False, 'error': str(e)})
+                    result.pop('action', None)
+            return results
+        
+        for (photo_type, photo_id), i in valid.items():
+            results[i].update({'success': True, 'action': actions.get((photo_type, photo_id), 'update')})
+            self.verification_index.apply(photo_type, photo_id, items[i]['status'], items[i].get('note'))
+        
+        return results
     
     def get_verification_status(self, photo_id: int, photo_type: str) -> Optional[Dict]:
         """Fotoğrafın doğrulama durumunu getirir."""
+        indexed = self.verification_index.lookup(photo_type, [photo_id])
+        if indexed is not None:
+            return indexed.get(photo_id)
+        
         try:
             conn = self._get_pv_connection()
             cursor = conn.cursor(as_dict=True)
@@ -586,6 +979,115 @@ class BaseSource:
             print(f"DEBUG get_verification_status error: {e}")
             return None
     
+    # ==================== İNCELEME KUYRUĞU ====================
+    
+    # Kuyruğa tek INSERT'te yazılan fotoğraf (7 kolon x 250 = 1750 parametre < 2100)
+    REVIEW_ENQUEUE_ROWS = 250
+    
+    # claim'in döndürdüğü kolonlar
+    _REVIEW_OUTPUT = '''inserted.Id, inserted.PhotoType, inserted.PhotoId, inserted.VisitId, inserted.ImageUrl,
+                        inserted.PhotoDate, inserted.Personnel, inserted.CustomerName, inserted.CustomerCode,
+                        inserted.LeaseUntil'''
+    
+    def enqueue_for_review(self, cursor, photo_type: str, photos: List[Dict]) -> int:
+        """
+        Doğrulanmamış fotoğrafları inceleme kuyruğuna ekler (verilen PhotoVerifier cursor'ı
+        ile; commit çağırana ait). Kuyrukta olan veya doğrulanmış fotoğraflar atlanır.
+        """
+        added = 0
+        for i in range(0, len(photos), self.REVIEW_ENQUEUE_ROWS):
+            chunk = photos[i:i + self.REVIEW_ENQUEUE_ROWS]
+            values = ','.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+            params = []
+            for photo in chunk:
+                params += [
+                    photo['PhotoId'], photo.get('VisitId'), photo.get('ImageUrl'),
+                    photo.get('PhotoDate') or photo.get('VisitStartDate') or photo.get('StartDate'),
+                    photo.get('Personnel'), photo.get('CustomerName'), photo.get('CustomerCode'),
+                ]
+            cursor.execute(f'''
+                INSERT INTO ReviewQueue (Project, PhotoType, PhotoId, VisitId, ImageUrl, PhotoDate,
+                                         Personnel, CustomerName, CustomerCode)
+                SELECT %s, %s, s.PhotoId, s.VisitId, s.ImageUrl, s.PhotoDate, s.Personnel, s.CustomerName, s.CustomerCode
+                FROM (VALUES {values}) AS s (PhotoId, VisitId, ImageUrl, PhotoDate, Personnel, CustomerName, CustomerCode)
+                WHERE NOT EXISTS (SELECT 1 FROM ReviewQueue q
+                                  WHERE q.Project = %s AND q.PhotoType = %s AND q.PhotoId = s.PhotoId)
+                  AND NOT EXISTS (SELECT 1 FROM Verifications v
+                                  WHERE v.Project = %s AND v.PhotoType = %s AND v.PhotoId = s.PhotoId)
+            ''', (self.project_key, photo_type, *params, self.project_key, photo_type, self.project_key, photo_type))
+            added += max(cursor.rowcount, 0)
+        return added
+    
+    def claim_review_batch(self, photo_type: str, user_id: int, size: int = None, resume: bool = False) -> List[Dict]:
+        """
+        Sıradaki en fazla `size` fotoğrafı kullanıcıya lease_seconds süreyle kiralar.
+        UPDLOCK + READPAST: aynı anda claim eden iki inceleyici aynı satırı alamaz,
+        biri diğerinin kilitli satırlarını beklemeden atlar.
+        resume=True: kullanıcının kirası süren fotoğrafları önce (kira yenilenerek) döner.
+        """
+        size = max(1, min(size or REVIEW_QUEUE.get('batch_size', 20), REVIEW_QUEUE.get('max_batch_size', 100)))
+        lease_seconds = REVIEW_QUEUE.get('lease_seconds', 600)
+        items = []
+        
+        conn = self._get_pv_connection()
+        try:
+            cursor = conn.cursor(as_dict=True)
+            if resume:
+                cursor.execute(f'''
+                    UPDATE TOP ({size}) ReviewQueue
+                    SET LeaseUntil = DATEADD(second, %s, GETDATE())
+                    OUTPUT {self._REVIEW_OUTPUT}
+                    WHERE LeasedBy = %s AND Project = %s AND PhotoType = %s AND LeaseUntil >= GETDATE()
+                ''', (lease_seconds, user_id, self.project_key, photo_type))
+                items = cursor.fetchall()
+            
+            remaining = size - len(items)
+            if remaining > 0:
+                cursor.execute(f'''
+                    WITH next AS (
+                        SELECT TOP ({remaining}) *
+                        FROM ReviewQueue WITH (UPDLOCK, READPAST, ROWLOCK)
+                        WHERE Project = %s AND PhotoType = %s
+                          AND (LeaseUntil IS NULL OR LeaseUntil < GETDATE())
+                        ORDER BY PhotoDate DESC, Id
+                    )
+                    UPDATE next
+                    SET LeasedBy = %s, LeaseUntil = DATEADD(second, %s, GETDATE())
+                    OUTPUT {self._REVIEW_OUTPUT}
+                ''', (self.project_key, photo_type, user_id, lease_seconds))
+                items += cursor.fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+        
+        # OUTPUT sırası garanti değil: kuyruk sırasına getir
+        items.sort(key=lambda item: (item['PhotoDate'] is not None, item['PhotoDate'] or 0, -item['Id']), reverse=True)
+        for item in items:
+            item['ImageUrl'] = f"/image/{self.project_key}/{item['ImageUrl']}" if item['ImageUrl'] else None
+        return items
+    
+    def release_review_lease(self, photo_type: str, user_id: int, photo_ids: List[int] = None) -> int:
+        """Kullanıcının kiraladığı fotoğrafları (verilmezse hepsini) kuyruğa geri bırakır."""
+        where, params = '', ()
+        if photo_ids:
+            photo_ids = [int(photo_id) for photo_id in photo_ids][:REVIEW_QUEUE.get('max_batch_size', 100) * 2]
+            where = f" AND PhotoId IN ({','.join(['%s'] * len(photo_ids))})"
+            params = tuple(photo_ids)
+        
+        conn = self._get_pv_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE ReviewQueue
+                SET LeasedBy = NULL, LeaseUntil = NULL
+                WHERE LeasedBy = %s AND Project = %s AND PhotoType = %s{where}
+            ''', (user_id, self.project_key, photo_type, *params))
+            released = max(cursor.rowcount, 0)
+            conn.commit()
+        finally:
+            conn.close()
+        return released
+    
     # ==================== DUPLICATE DETECTION ====================
     
     def find_duplicates(self) -> List[Dict]:
@@ -594,68 +1096,62 @@ class BaseSource:
             conn = self._get_pv_connection()
             cursor = conn.cursor()
             
-            # Aynı hash'e sahip grupları bul
+            # Duplicate gruplarındaki tüm fotoğraflar tek sorguda
             cursor.execute('''
-                SELECT Md5Hash, COUNT(*) as count
-                FROM PhotoHashes
-                WHERE Project = %s AND Md5Hash IS NOT NULL
-                GROUP BY Md5Hash
-                HAVING COUNT(*) > 1
-            ''', (self.project_key,))
+                SELECT h.Md5Hash, h.PhotoId, h.PhotoType, h.VisitId, h.ImagePath
+                FROM PhotoHashes h
+                INNER JOIN (
+                    SELECT Md5Hash
+                    FROM PhotoHashes
+                    WHERE Project = %s AND Md5Hash IS NOT NULL
+                    GROUP BY Md5Hash
+                    HAVING COUNT(*) > 1
+                ) d ON d.Md5Hash = h.Md5Hash
+                WHERE h.Project = %s
+                ORDER BY h.Md5Hash
+            ''', (self.project_key, self.project_key))
+            rows = cursor.fetchall()
             
-            duplicate_hashes = cursor.fetchall()
-            duplicates = []
+            # Ana DB'den personel ve müşteri bilgileri (toplu)
+            details = self.get_photo_details_bulk([(row[1], row[2], row[3]) for row in rows])
             
-            for md5_hash, count in duplicate_hashes:
-                cursor.execute('''
-                    SELECT PhotoId, PhotoType, VisitId, ImagePath
-                    FROM PhotoHashes
-                    WHERE Project = %s AND Md5Hash = %s
-                ''', (self.project_key, md5_hash))
+            groups = {}
+            for md5_hash, photo_id, photo_type, visit_id, image_path in rows:
+                detail = details.get((photo_id, photo_type), {})
                 
-                files = []
-                for row in cursor.fetchall():
-                    photo_id = row[0]
-                    photo_type = row[1]
-                    visit_id = row[2]
-                    image_path = row[3]
-                    
-                    # Ana DB'den personel ve müşteri bilgisi al
-                    detail = self._get_photo_detail(photo_id, photo_type, visit_id)
-                    
-                    # Mesafe hesapla (km)
-                    distance = None
-                    visit_lat = detail.get('visit_lat')
-                    visit_lon = detail.get('visit_lon')
-                    customer_lat = detail.get('customer_lat')
-                    customer_lon = detail.get('customer_lon')
-                    
-                    if all([visit_lat, visit_lon, customer_lat, customer_lon]):
-                        distance = self._calculate_distance(visit_lat, visit_lon, customer_lat, customer_lon)
-                    
-                    files.append({
-                        'photo_id': photo_id,
-                        'photo_type': photo_type,
-                        'visit_id': visit_id,
-                        'image_path': image_path,
-                        'image_url': self._convert_image_path(image_path),
-                        'personnel': detail.get('personnel', ''),
-                        'customer_name': detail.get('customer_name', ''),
-                        'customer_code': detail.get('customer_code', ''),
-                        'photo_date': detail.get('photo_date', ''),
-                        'visit_lat': visit_lat,
-                        'visit_lon': visit_lon,
-                        'customer_lat': customer_lat,
-                        'customer_lon': customer_lon,
-                        'distance_km': distance,
-                    })
+                # Mesafe hesapla (km)
+                distance = None
+                visit_lat = detail.get('visit_lat')
+                visit_lon = detail.get('visit_lon')
+                customer_lat = detail.get('customer_lat')
+                customer_lon = detail.get('customer_lon')
                 
-                duplicates.append({
-                    'hash': md5_hash,
-                    'count': count,
-                    'files': files
+                if all([visit_lat, visit_lon, customer_lat, customer_lon]):
+                    distance = self._calculate_distance(visit_lat, visit_lon, customer_lat, customer_lon)
+                
+                groups.setdefault(md5_hash, []).append({
+                    'photo_id': photo_id,
+                    'photo_type': photo_type,
+                    'visit_id': visit_id,
+                    'image_path': image_path,
+                    'image_url': self._convert_image_path(image_path),
+                    'user_id': detail.get('user_id'),
+                    'personnel': detail.get('personnel', ''),
+                    'customer_name': detail.get('customer_name', ''),
+                    'customer_code': detail.get('customer_code', ''),
+                    'photo_date': detail.get('photo_date', ''),
+                    'visit_lat': visit_lat,
+                    'visit_lon': visit_lon,
+                    'customer_lat': customer_lat,
+                    'customer_lon': customer_lon,
+                    'distance_km': distance,
                 })
             
+            duplicates = [
+                {'hash': md5_hash, 'count': len(files), 'files': files}
+                for md5_hash, files in groups.items()
+            ]
+            
             conn.close()
             return duplicates
         except Exception as e:
@@ -696,48 +1192,51 @@ class BaseSource:
             print(f"DEBUG get_duplicates_from_cache error: {e}")
             return []
 
-    def get_photos_from_cache(self, photo_type: str, start_date: str, end_date: str) -> List[Dict]:
-        """Önbellekten fotoğrafları getirir."""
-        try:
-            import json
-            conn = self._get_pv_connection()
-            cursor = conn.cursor(as_dict=True)
-            
-            cursor.execute('''
-                SELECT Details
-                FROM PhotoListCache
-                WHERE Project = %s AND PhotoType = %s 
-                AND CacheDate BETWEEN %s AND %s
-                ORDER BY CacheDate DESC
-            ''', (self.project_key, photo_type, start_date, end_date))
-            
-            results = cursor.fetchall()
-            conn.close()
-            
-            photos = []
-            for row in results:
-                if row['Details']:
-                    day_photos = json.loads(row['Details'])
-                    photos.extend(day_photos)
-            
-            return photos
-        except Exception as e:
-            print(f"DEBUG get_photos_from_cache error: {e}")
-            return []
+    def _decode_cache_day(self, payload, user_id: int = None, customer_code: str = None) -> List[Dict]:
+        """
+        Bir günlük cache içeriğinden filtreye uyan ziyaretleri (sıralı) döndürür.
+        Güncel format: {'visits': [...], 'by_user': {...}, 'by_customer': {...}} - indeksler ziyaret sırasıdır.
+        Eski formatlar (düz liste veya {'photos': [...]}) okunurken gruplanır.
+        """
+        if isinstance(payload, list) or 'visits' not in payload:
+            photos = payload if isinstance(payload, list) else payload.get('photos', [])
+            photos = [
+                p for p in photos
+                if (not user_id or str(p.get('UserId')) == str(user_id))
+                and (not customer_code or str(p.get('CustomerCode')) == str(customer_code))
+            ]
+            return self._group_into_visits(photos)
+        
+        visits = payload['visits']
+        if not user_id and not customer_code:
+            return visits
+        
+        indexes = None
+        if user_id:
+            indexes = set(payload.get('by_user', {}).get(str(user_id), []))
+        if customer_code:
+            customer_indexes = set(payload.get('by_customer', {}).get(str(customer_code), []))
+            indexes = customer_indexes if indexes is None else indexes & customer_indexes
+        
+        return [visits[i] for i in sorted(indexes)]
 
     def has_photo_cache(self, photo_type: str, start_date: str, end_date: str) -> bool:
-        """Cache var mı kontrol eder."""
+        """Cache tarih aralığındaki her günü kapsıyor mu kontrol eder."""
         try:
+            expected_days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+            if expected_days <= 0:
+                return False
+            
             conn = self._get_pv_connection()
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT COUNT(*) FROM PhotoListCache 
+                SELECT COUNT(DISTINCT CacheDate) FROM PhotoListCache 
                 WHERE Project = %s AND PhotoType = %s
                 AND CacheDate BETWEEN %s AND %s
             ''', (self.project_key, photo_type, start_date, end_date))
             count = cursor.fetchone()[0]
             conn.close()
-            return count > 0
+            return count >= expected_days
         except:
             return False        
 
@@ -753,81 +1252,87 @@ class BaseSource:
         except:
             return False        
 
-    def _get_photo_detail(self, photo_id: int, photo_type: str, visit_id: int) -> Dict:
-        """Fotoğraf detaylarını ana DB'den alır."""
+    # Fotoğraf türüne göre detay sorgusunun kaynak tablosu ve tarih kolonu
+    _PHOTO_DETAIL_SOURCES = {
+        'exhibition': ('p.CreatedDate', 'FROM TeammateVisitExhibition p INNER JOIN TeammateVisit v ON p.TeammateVisitId = v.Id'),
+        'planogram': ('p.CreatedDate', 'FROM TeammateVisitPlanogram p INNER JOIN TeammateVisit v ON p.TeammateVisitId = v.Id'),
+        'visit': ('v.StartDate', 'FROM TeammateVisit v'),
+    }
+
+    def get_photo_details_bulk(self, items: List[tuple], chunk_size: int = 1000,
+                               user_id: int = None, customer_code: str = None) -> Dict[tuple, Dict]:
+        """
+        Fotoğraf detaylarını (personel, mağaza, koordinatlar) toplu getirir.
+        items: (PhotoId, PhotoType, VisitId) listesi. Her tür için tek bağlantıda,
+        chunk_size'lık IN listeleriyle set tabanlı join yapılır.
+        user_id / customer_code verilirse sadece o personel / mağazanın fotoğrafları döner.
+        Dönüş: {(PhotoId, PhotoType): detay} - bulunamayanlar sözlükte yer almaz.
+        """
+        by_type = {}
+        for photo_id, photo_type, _ in items:
+            if photo_type in self._PHOTO_DETAIL_SOURCES:
+                by_type.setdefault(photo_type, {})[photo_id] = None
+        
+        results = {}
+        if not by_type:
+            return results
+        
+        extra_filter = ''
+        extra_params = ()
+        if user_id:
+            extra_filter += 'AND v.UserId = %s '
+            extra_params += (user_id,)
+        if customer_code:
+            extra_filter += 'AND c.CustomerCode = %s '
+            extra_params += (customer_code,)
+        
         try:
             conn = self._get_connection()
             cursor = conn.cursor(as_dict=True)
             
-            if photo_type == 'exhibition':
-                cursor.execute('''
-                    SELECT 
-                        e.CreatedDate as photo_date,
-                        u.Name + ' ' + u.Surname as personnel,
-                        c.CustomerName as customer_name,
-                        c.CustomerCode as customer_code,
-                        v.Latitude as visit_lat,
-                        v.Longitude as visit_lon,
-                        c.Latitude as customer_lat,
-                        c.Longitude as customer_lon
-                    FROM TeammateVisitExhibition e
-                    INNER JOIN TeammateVisit v ON e.TeammateVisitId = v.Id
-                    INNER JOIN TeammateRoute r ON v.TeammateRouteId = r.Id
-                    INNER JOIN Customers c ON r.CustomerId = c.CustomerCode
-                    INNER JOIN Users u ON v.UserId = u.Id
-                    WHERE e.Id = %s
-                ''', (photo_id,))
-            elif photo_type == 'planogram':
-                cursor.execute('''
-                    SELECT 
-                        p.CreatedDate as photo_date,
-                        u.Name + ' ' + u.Surname as personnel,
-                        c.CustomerName as customer_name,
-                        c.CustomerCode as customer_code,
-                        v.Latitude as visit_lat,
-                        v.Longitude as visit_lon,
-                        c.Latitude as customer_lat,
-                        c.Longitude as customer_lon
-                    FROM TeammateVisitPlanogram p
-                    INNER JOIN TeammateVisit v ON p.TeammateVisitId = v.Id
-                    INNER JOIN TeammateRoute r ON v.TeammateRouteId = r.Id
-                    INNER JOIN Customers c ON r.CustomerId = c.CustomerCode
-                    INNER JOIN Users u ON v.UserId = u.Id
-                    WHERE p.Id = %s
-                ''', (photo_id,))
-            elif photo_type == 'visit':
-                cursor.execute('''
-                    SELECT 
-                        v.StartDate as photo_date,
-                        u.Name + ' ' + u.Surname as personnel,
-                        c.CustomerName as customer_name,
-                        c.CustomerCode as customer_code,
-                        v.Latitude as visit_lat,
-                        v.Longitude as visit_lon,
-                        c.Latitude as customer_lat,
-                        c.Longitude as customer_lon
-                    FROM TeammateVisit v
-                    INNER JOIN TeammateRoute r ON v.TeammateRouteId = r.Id
-                    INNER JOIN Customers c ON r.CustomerId = c.CustomerCode
-                    INNER JOIN Users u ON v.UserId = u.Id
-                    WHERE v.Id = %s
-                ''', (photo_id,))
-            else:
-                conn.close()
-                return {}
+            for photo_type, ids in by_type.items():
+                date_column, from_clause = self._PHOTO_DETAIL_SOURCES[photo_type]
+                key_column = 'v.Id' if photo_type == 'visit' else 'p.Id'
+                photo_ids = list(ids)
+                
+                for i in range(0, len(photo_ids), chunk_size):
+                    chunk = photo_ids[i:i + chunk_size]
+                    placeholders = ','.join(['%s'] * len(chunk))
+                    cursor.execute(f'''
+                        SELECT 
+                            {key_column} as photo_id,
+                            {date_column} as photo_date,
+                            v.UserId as user_id,
+                            u.Name + ' ' + u.Surname as personnel,
+                            c.CustomerName as customer_name,
+                            c.CustomerCode as customer_code,
+                            v.Latitude as visit_lat,
+                            v.Longitude as visit_lon,
+                            c.Latitude as customer_lat,
+                            c.Longitude as customer_lon
+                        {from_clause}
+                        INNER JOIN TeammateRoute r ON v.TeammateRouteId = r.Id
+                        INNER JOIN Customers c ON r.CustomerId = c.CustomerCode
+                        INNER JOIN Users u ON v.UserId = u.Id
+                        WHERE {key_column} IN ({placeholders}) {extra_filter}
+                    ''', (*chunk, *extra_params))
+                    
+                    for row in cursor.fetchall():
+                        photo_id = row.pop('photo_id')
+                        # Türkçe karakter düzeltmesi
+                        if row.get('personnel'):
+                            row['personnel'] = self._fix_turkish_chars(row['personnel'])
+                        results[(photo_id, photo_type)] = row
             
-            result = cursor.fetchone()
             conn.close()
-            
-            if result:
-                # Türkçe karakter düzeltmesi
-                if result.get('personnel'):
-                    result['personnel'] = self._fix_turkish_chars(result['personnel'])
-                return result
-            return {}
         except Exception as e:
-            print(f"DEBUG _get_photo_detail error: {e}")
-            return {}
+            print(f"DEBUG get_photo_details_bulk error: {e}")
+        
+        return results
+
+    def _get_photo_detail(self, photo_id: int, photo_type: str, visit_id: int) -> Dict:
+        """Fotoğraf detaylarını ana DB'den alır."""
+        return self.get_photo_details_bulk([(photo_id, photo_type, visit_id)]).get((photo_id, photo_type), {})
 
     def get_personnel_list(self, start_date: str = None, end_date: str = None) -> List[Dict]:
         """Aktif personel listesini getirir."""
@@ -0,0 +1,201 @@
+"""
+Async Batch Writer - Arka Plan Toplu Yazıcı
+============================================
+İstek thread'inde veritabanına yazmak yerine satırları sınırlı bir kuyruğa alır,
+arka plan thread'i bunları boyut veya süre dolduğunda çok satırlı INSERT ile yazar.
+Uygulama kapanırken kuyruktaki satırlar yazılır.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Sequence
+
+
+class AsyncBatchWriter:
+    """Sınırlı kuyruk + toplu yazan arka plan thread'i."""
+
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+    def __init__(self, table: str, columns: Sequence[str], connect: Callable,
+                 max_queue: int = 10000, batch_size: int = 200, flush_interval: float = 2.0,
+                 overflow: str = 'drop_oldest', block_timeout: float = 1.0, max_retries: int = 2):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Geçersiz overflow politikası: {overflow}")
+
+        self.table = table
+        self.columns = tuple(columns)
+        self.connect = connect
+        self.max_queue = max_queue
+        # SQL Server: tek INSERT'te en fazla 1000 satır ve 2100 parametre
+        self.batch_size = max(1, min(batch_size, 1000, 2000 // len(self.columns)))
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+
+        self._counters = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped_overflow': 0,
+            'dropped_error': 0,
+            'write_errors': 0,
+        }
+        self._last_error = None
+        self._last_flush_at = None
+
+    # ==================== KUYRUK ====================
+
+    def put(self, row: tuple):
+        """Satırı kuyruğa ekler; istek thread'ini veritabanı için bekletmez."""
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(row)
+            self._count('enqueued', 1)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == 'drop_newest':
+            self._count('dropped_overflow', 1)
+            return
+
+        if self.overflow == 'block':
+            try:
+                self._queue.put(row, timeout=self.block_timeout)
+                self._count('enqueued', 1)
+            except queue.Full:
+                self._count('dropped_overflow', 1)
+            return
+
+        # drop_oldest: en eski satırı at, yenisini ekle
+        try:
+            self._queue.get_nowait()
+            self._count('dropped_overflow', 1)
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(row)
+            self._count('enqueued', 1)
+        except queue.Full:
+            self._count('dropped_overflow', 1)
+
+    def _ensure_started(self):
+        """Yazıcı thread'ini ilk kullanımda başlatır."""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"{self.table}Writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    # ==================== YAZMA ====================
+
+    def _run(self):
+        """Boyut veya süre dolduğunda toplu yazar."""
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+
+    def _collect_batch(self) -> list:
+        """Kuyruktan en fazla batch_size satır toplar, en fazla flush_interval bekler."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list):
+        """Satırları çok satırlı INSERT ile yazar, hata olursa birkaç kez dener."""
+        placeholders = '(' + ', '.join(['%s'] * len(self.columns)) + ')'
+        query = f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES " + ','.join([placeholders] * len(batch))
+        params = tuple(value for row in batch for value in row)
+
+        with self._write_lock:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    conn = self.connect()
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute(query, params)
+                        conn.commit()
+                    finally:
+                        conn.close()
+
+                    self._count('written', len(batch))
+                    self._count('batches', 1)
+                    self._last_flush_at = datetime.now()
+                    return
+                except Exception as e:
+                    self._count('write_errors', 1)
+                    self._last_error = f"{datetime.now():%Y-%m-%d %H:%M:%S} {e}"
+                    print(f"{self.table} yazma hatası (deneme {attempt + 1}): {e}")
+                    if attempt < self.max_retries and not self._stop.is_set():
+                        time.sleep(min(2 ** attempt, 5))
+
+        self._count('dropped_error', len(batch))
+
+    def flush(self):
+        """Kuyruktaki tüm satırları çağıran thread'de yazar."""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout: float = 10.0):
+        """Thread'i durdurur ve kalan satırları yazar (kapanışta çağrılır)."""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+    # ==================== DURUM ====================
+
+    def _count(self, key: str, amount: int):
+        with self._counter_lock:
+            self._counters[key] += amount
+
+    def stats(self) -> Dict:
+        """Yöneticiler için sayaçlar ve kuyruk durumu."""
+        return {
+            'table': self.table,
+            **self._counters,
+            'queue_size': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'overflow': self.overflow,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'last_flush_at': self._last_flush_at,
+            'last_error': self._last_error,
+        }
@@ -0,0 +1,288 @@
+"""
+DB - Ölçümlü Veritabanı Bağlantıları
+====================================
+pymssql bağlantısını sarar; her execute ve fetch süresi metrics modülüne
+(istek bazlı ve veritabanı bazlı) kaydedilir. Eşiği aşan sorgular
+slow_query_log'a gider. pooled=True ile açılan bağlantılar close() edildiğinde
+kapanmaz, havuza döner ve aynı veritabanı için tekrar kullanılır. run_parallel
+worker'larında alınan havuz bağlantıları fan-out süre sınırını sorgu zaman aşımı
+(pymssql timeout) olarak taşır; havuzda zaman aşımına göre ayrı tutulurlar.
+"""
+
+import threading
+import time
+
+import pymssql
+
+import metrics
+from config import DB_POOL
+from . import slow_query_log
+from .parallel import query_timeout
+
+
+def _open(db_config: dict, timeout: int = 0):
+    return pymssql.connect(
+        server=db_config['host'],
+        port=db_config.get('port', 1433),
+        user=db_config['username'],
+        password=db_config['password'],
+        database=db_config['database'],
+        timeout=timeout
+    )
+
+
+def connect(db_config: dict, instrumented: bool = True, pooled: bool = False):
+    """
+    SQL Server bağlantısı oluşturur (varsayılan: ölçümlü).
+    pooled: bağlantı havuzdan alınır, close() ile havuza döner (sadece ölçümlü bağlantılar).
+    """
+    if not instrumented:
+        return _open(db_config)
+    timeout = query_timeout()
+    if pooled and DB_POOL.get('enabled', True):
+        conn, created = _pool.acquire(db_config, timeout)
+        return InstrumentedConnection(conn, db_config['database'],
+                                      release=lambda raw: _pool.release(db_config, raw, created, timeout))
+    return InstrumentedConnection(_open(db_config, timeout), db_config['database'])
+
+
+# ==================== BAĞLANTI HAVUZU ====================
+
+class ConnectionPool:
+    """Veritabanı başına boşta bekleyen pymssql bağlantıları."""
+
+    def __init__(self, max_idle: int, max_age_seconds: float):
+        self.max_idle = max_idle
+        self.max_age = max_age_seconds
+        self._idle = {}         # (host, port, database, username, timeout) -> [(bağlantı, açılış zamanı)]
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    @staticmethod
+    def _key(db_config: dict, timeout: int) -> tuple:
+        return (db_config['host'], db_config.get('port', 1433), db_config['database'], db_config['username'],
+                timeout)
+
+    def acquire(self, db_config: dict, timeout: int = 0):
+        """
+        (bağlantı, açılış zamanı) döndürür; boşta uygun bağlantı yoksa yenisini açar.
+        timeout: sorgu zaman aşımı (saniye, 0 = sınırsız); bağlantı açılırken verilir.
+        """
+        key = self._key(db_config, timeout)
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                candidate, created = idle.pop()
+                if now - created < self.max_age:
+                    conn = candidate
+                    self.reused += 1
+                    break
+                expired.append(candidate)
+            self.discarded += len(expired)
+        for old in expired:
+            self._close(old)
+        if conn is not None:
+            return conn, created
+        conn = _open(db_config, timeout)
+        with self._lock:
+            self.created += 1
+        return conn, now
+
+    def release(self, db_config: dict, conn, created: float, timeout: int = 0):
+        """
+        Bağlantıyı havuza geri koyar. Commit edilmemiş işlem geri alınır (close ile
+        aynı davranış); bekleyen sonuç yüzünden rollback hata verirse bağlantı kapatılır.
+        """
+        try:
+            conn.rollback()
+        except Exception:
+            self._close(conn)
+            with self._lock:
+                self.discarded += 1
+            return
+        key = self._key(db_config, timeout)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle and time.monotonic() - created < self.max_age:
+                idle.append((conn, created))
+                return
+            self.discarded += 1
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception as e:
+            print(f"DEBUG pool close error: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'idle': sum(len(idle) for idle in self._idle.values()),
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+            }
+
+
+_pool = ConnectionPool(DB_POOL.get('max_idle', 8), DB_POOL.get('max_age_seconds', 300))
+
+
+def pool_stats() -> dict:
+    return _pool.stats()
+
+
+class InstrumentedConnection:
+    """pymssql bağlantısı; cursor'ları ölçümlü döndürür."""
+
+    def __init__(self, conn, db_name: str, release=None):
+        self._conn = conn
+        self.db_name = db_name
+        self._cursors = []
+        self._release = release
+        self._closed = False
+
+    def cursor(self, *args, **kwargs):
+        cursor = InstrumentedCursor(self._conn.cursor(*args, **kwargs), self.db_name)
+        self._cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        if self._closed:
+            return None
+        self._closed = True
+        # fetch edilmeden bırakılan son sorgular da yavaş sorgu kontrolünden geçsin
+        for cursor in self._cursors:
+            cursor._finish_statement()
+        self._cursors = []
+        if self._release is not None:
+            return self._release(self._conn)
+        return self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class InstrumentedCursor:
+    """pymssql cursor'ı; execute sayısı ve execute + fetch süresini kaydeder.
+
+    Her sorgu; sonuç seti tükenene, sonraki execute'a ya da cursor/bağlantı
+    kapanana kadar "açık" sayılır ve toplam süresi yavaş sorgu eşiğiyle
+    karşılaştırılır.
+    """
+
+    def __init__(self, cursor, db_name: str):
+        self._cursor = cursor
+        self.db_name = db_name
+        self._statement = None
+
+    def execute(self, query, *args):
+        return self._timed_execute(self._cursor.execute, query, args)
+
+    def executemany(self, query, *args):
+        return self._timed_execute(self._cursor.executemany, query, args)
+
+    def _timed_execute(self, execute, query, args):
+        self._finish_statement()
+        self._statement = {
+            'query': query,
+            'params': args[0] if args else None,
+            'execute_seconds': 0.0,
+            'fetch_seconds': 0.0,
+            'rows': 0,
+            'failed': False,
+        }
+        started = time.perf_counter()
+        try:
+            return execute(query, *args)
+        except Exception:
+            self._statement['failed'] = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.record_query(self.db_name, elapsed)
+            self._statement['execute_seconds'] = elapsed
+            # Sonuç seti olmayan (INSERT/UPDATE/DELETE) veya hatalı sorgu burada biter
+            if self._statement['failed'] or self._cursor.description is None:
+                if not self._statement['failed']:
+                    self._statement['rows'] = max(self._cursor.rowcount, 0)
+                self._finish_statement()
+
+    def fetchone(self):
+        row = self._timed_fetch(self._cursor.fetchone)
+        if row is None:
+            self._finish_statement()
+        else:
+            self._add_rows(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed_fetch(self._cursor.fetchmany, *args)
+        if rows:
+            self._add_rows(len(rows))
+        else:
+            self._finish_statement()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        self._add_rows(len(rows))
+        self._finish_statement()
+        return rows
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.record_query(self.db_name, elapsed, count=0)
+            if self._statement is not None:
+                self._statement['fetch_seconds'] += elapsed
+
+    def _add_rows(self, count: int):
+        if self._statement is not None:
+            self._statement['rows'] += count
+
+    def _finish_statement(self):
+        """Açık sorguyu kapatır ve yavaş sorgu kontrolüne gönderir."""
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            slow_query_log.record(self.db_name, statement['query'], statement['params'],
+                                  statement['execute_seconds'], statement['fetch_seconds'],
+                                  statement['rows'], statement['failed'])
+
+    def close(self):
+        self._finish_statement()
+        return self._cursor.close()
+
+    def __iter__(self):
+        elapsed = 0.0
+        rows = 0
+        iterator = iter(self._cursor)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    row = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - started
+                rows += 1
+                yield row
+        finally:
+            metrics.record_query(self.db_name, elapsed, count=0)
+            if self._statement is not None:
+                self._statement['fetch_seconds'] += elapsed
+            self._add_rows(rows)
+            self._finish_statement()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
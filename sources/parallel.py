@@ -0,0 +1,105 @@
+"""
+Parallel - İstek İçi Paralel Sorgular
+=====================================
+Bir isteğin birbirinden bağımsız veritabanı çağrılarını (sayımlar, filtre
+listeleri, fotoğraf listesi) paylaşılan küçük bir thread havuzunda aynı anda
+çalıştırır; sayfa süresi sorguların toplamına değil en yavaşına yaklaşır.
+Her çağrı kendi havuz bağlantısını kullanır (db.connect(pooled=True)).
+
+Çağrılar isteğin context'inin kopyasıyla çalışır: istek metrikleri ve yavaş
+sorgu kaydındaki route bilgisi worker thread'lerde de doğru isteğe yazılır.
+Worker içinden tekrar run_parallel çağrılırsa çağrılar sırayla çalışır (havuz
+kendi kendini beklemesin).
+
+Süre sınırı bilinçli olarak uzun süren işler için (cache'siz canlı duplicate
+taraması gibi) timeout=NO_DEADLINE verilir: çağrılar paralel çalışır ama
+hiçbiri süre aşımına düşmez.
+
+Süre sınırı sadece beklemeyi kesmez: worker'larda açılan havuz bağlantıları
+aynı süreyi sorgu zaman aşımı olarak alır (db.connect, query_timeout()). Süresi
+dolup bırakılan çağrının sorgusu da biter; thread ve bağlantı havuza döner.
+"""
+
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+
+from config import DB_FANOUT
+
+_executor = ThreadPoolExecutor(max_workers=DB_FANOUT.get('workers', 16), thread_name_prefix='db-fanout')
+_in_worker: contextvars.ContextVar[bool] = contextvars.ContextVar('db_fanout_worker', default=False)
+_query_timeout: contextvars.ContextVar[int] = contextvars.ContextVar('db_fanout_query_timeout', default=0)
+
+# defaults verilmeyen çağrılar hata / süre aşımında exception fırlatır
+_RAISE = object()
+
+# Süre sınırı yok (çağrılar bitene kadar beklenir)
+NO_DEADLINE = math.inf
+
+
+class FanoutTimeout(Exception):
+    """Çağrı süre sınırı içinde bitmedi."""
+
+
+def _run_in_worker(fn: Callable, query_timeout: int) -> Any:
+    _in_worker.set(True)
+    _query_timeout.set(query_timeout)
+    return fn()
+
+
+def query_timeout() -> int:
+    """Bu thread'de açılacak bağlantıların sorgu zaman aşımı (saniye, 0 = sınırsız)."""
+    return _query_timeout.get()
+
+
+def run_parallel(calls: Dict[str, Callable[[], Any]], timeout: float = None,
+                 defaults: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    calls: {isim: argümansız fonksiyon} - birbirine bağımlı olmamalı.
+    timeout: tüm çağrılar için ortak süre sınırı (saniye, varsayılan DB_FANOUT;
+             NO_DEADLINE = sınır yok).
+    defaults: {isim: değer} - hata veren veya süresi dolan çağrının yerine geçer;
+              default'u olmayan çağrının hatası çağırana fırlatılır.
+    Dönüş: {isim: sonuç}
+    """
+    defaults = defaults or {}
+    timeout = DB_FANOUT.get('timeout_seconds', 30) if timeout is None else timeout
+    results = {}
+
+    if len(calls) < 2 or _in_worker.get():
+        for name, fn in calls.items():
+            try:
+                results[name] = fn()
+            except Exception as e:
+                results[name] = _fallback(name, e, defaults)
+        return results
+
+    deadline = time.monotonic() + timeout
+    worker_query_timeout = 0 if timeout == NO_DEADLINE else max(1, math.ceil(timeout))
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, _run_in_worker, fn, worker_query_timeout)
+        for name, fn in calls.items()
+    }
+    wait(futures.values(), timeout=None if timeout == NO_DEADLINE else max(deadline - time.monotonic(), 0))
+
+    for name, future in futures.items():
+        if not future.done():
+            # Başlamamışsa hiç çalışmaz; çalışıyorsa sonucu beklenmez (bağlantısı bitince havuza döner)
+            future.cancel()
+            results[name] = _fallback(name, FanoutTimeout(f"{name}: {timeout} sn içinde bitmedi"), defaults)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = _fallback(name, e, defaults)
+    return results
+
+
+def _fallback(name: str, error: Exception, defaults: Dict[str, Any]) -> Any:
+    value = defaults.get(name, _RAISE)
+    if value is _RAISE:
+        raise error
+    print(f"DEBUG run_parallel {name} error: {error}")
+    return value
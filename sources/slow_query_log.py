@@ -0,0 +1,171 @@
+"""
+Slow Query Log - Yavaş Sorgu Kaydı
+===================================
+Eşik süresini aşan sorguları normalize edilmiş SQL, parametreler, satır sayısı,
+execute / fetch süreleri ve çağıran route ile birlikte kaydeder.
+Kayıtlar dönen (rotating) bir dosyaya ve PhotoVerifier'daki SlowQueryLog
+tablosuna (arka plan toplu yazıcı ile) gider.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+import metrics
+from config import SLOW_QUERY_LOG, PHOTOVERIFIER_DB
+from .batch_writer import AsyncBatchWriter
+
+COLUMNS = ('LoggedAt', 'DatabaseName', 'Route', 'QueryHash', 'NormalizedSql', 'SqlText',
+           'Params', 'ExecuteMs', 'FetchMs', 'TotalMs', 'RowsReturned', 'Failed')
+
+_LINE_COMMENT = re.compile(r'--[^\n]*')
+_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_STRING_LITERAL = re.compile(r"N?'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|%d')
+_NUMBER = re.compile(r'(?<![\w@#.])-?\d+(?:\.\d+)?\b')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_VALUE_ROWS = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+_WHITESPACE = re.compile(r'\s+')
+# Parametreleri hiçbir durumda yazılmayan ifadeler (parola hash'i, kullanıcı tablosu)
+_SENSITIVE = re.compile(r'\bPasswordHash\b|\bUsers\b', re.I)
+
+_logger = None
+_writer = None
+_init_lock = threading.Lock()
+
+
+# ==================== NORMALİZASYON ====================
+
+def normalize_sql(query: str) -> str:
+    """Sabitleri ve parametreleri ? ile değiştirir, boşlukları sadeleştirir.
+
+    f-string ile gömülen tarihler/ID'ler ve uzunluğu değişen IN listeleri
+    aynı sorgu şablonunda toplansın diye.
+    """
+    text = _BLOCK_COMMENT.sub(' ', query)
+    text = _LINE_COMMENT.sub(' ', text)
+    text = _STRING_LITERAL.sub('?', text)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _VALUE_LIST.sub('(?)', text)
+    text = _VALUE_ROWS.sub('(?), ...', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def query_hash(normalized_sql: str) -> str:
+    """Normalize edilmiş SQL için kısa sabit anahtar."""
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:16]
+
+
+def _format_params(sql_text: str, params, max_length: int) -> Optional[str]:
+    """
+    Parametrelerin kayıt metni. log_params kapalıysa (varsayılan) veya ifade hassas
+    kolon / tablolara dokunuyorsa değerler yazılmaz, sadece sayısı yazılır.
+    """
+    if params is None:
+        return None
+    if not SLOW_QUERY_LOG.get('log_params', False) or _SENSITIVE.search(sql_text):
+        count = len(params) if isinstance(params, (tuple, list, dict)) else 1
+        return f'<gizlendi: {count} parametre>'
+    text = repr(params)
+    if len(text) > max_length:
+        text = text[:max_length] + f'... ({len(text)} karakter)'
+    return text
+
+
+# ==================== KAYIT ====================
+
+def record(db_name: str, query, params, execute_seconds: float, fetch_seconds: float,
+           rows: int, failed: bool = False):
+    """Sorgu eşik süresini aştıysa dosyaya ve tabloya kaydeder."""
+    if not SLOW_QUERY_LOG.get('enabled', True):
+        return
+    total_ms = (execute_seconds + fetch_seconds) * 1000
+    if total_ms < SLOW_QUERY_LOG.get('threshold_ms', 500):
+        return
+
+    try:
+        sql_text = query if isinstance(query, str) else str(query)
+        normalized = normalize_sql(sql_text)
+        request_metrics = metrics.current_request()
+        route = f"{request_metrics.method} {request_metrics.endpoint}" if request_metrics else None
+
+        entry = {
+            'logged_at': datetime.now(),
+            'db': db_name,
+            'route': route,
+            'hash': query_hash(normalized),
+            'normalized_sql': normalized,
+            'sql': sql_text[:SLOW_QUERY_LOG.get('max_sql_length', 8000)],
+            'params': _format_params(sql_text, params, SLOW_QUERY_LOG.get('max_params_length', 2000)),
+            'execute_ms': round(execute_seconds * 1000),
+            'fetch_ms': round(fetch_seconds * 1000),
+            'total_ms': round(total_ms),
+            'rows': rows,
+            'failed': failed,
+        }
+
+        _get_logger().warning(json.dumps(entry, default=str, ensure_ascii=False))
+
+        if SLOW_QUERY_LOG.get('write_to_db', True):
+            _get_writer().put((
+                entry['logged_at'], db_name, route, entry['hash'], normalized, entry['sql'],
+                entry['params'], entry['execute_ms'], entry['fetch_ms'], entry['total_ms'],
+                rows, 1 if failed else 0,
+            ))
+    except Exception as e:
+        print(f"DEBUG slow query log error: {e}")
+
+
+def _get_logger() -> logging.Logger:
+    """Dönen dosyaya JSON satırı yazan logger (ilk kullanımda kurulur)."""
+    global _logger
+    if _logger is not None:
+        return _logger
+    with _init_lock:
+        if _logger is None:
+            log_dir = SLOW_QUERY_LOG.get('log_dir', 'logs')
+            if not os.path.isabs(log_dir):
+                log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), log_dir)
+            os.makedirs(log_dir, exist_ok=True)
+            handler = RotatingFileHandler(
+                os.path.join(log_dir, 'slow_queries.log'),
+                maxBytes=SLOW_QUERY_LOG.get('max_bytes', 10 * 1024 * 1024),
+                backupCount=SLOW_QUERY_LOG.get('backup_count', 5),
+                encoding='utf-8',
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('photoverifier.slow_query')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+    return _logger
+
+
+def _connect():
+    """Ölçümsüz bağlantı; kayıt yazımı kendini tekrar kaydetmesin."""
+    from . import db
+    return db.connect(PHOTOVERIFIER_DB, instrumented=False)
+
+
+def _get_writer() -> AsyncBatchWriter:
+    global _writer
+    if _writer is not None:
+        return _writer
+    with _init_lock:
+        if _writer is None:
+            _writer = AsyncBatchWriter('SlowQueryLog', COLUMNS, _connect,
+                                       max_queue=1000, overflow='drop_newest')
+    return _writer
+
+
+def writer_stats() -> Optional[Dict]:
+    """SlowQueryLog yazıcısının sayaçları (henüz kayıt yoksa None)."""
+    return _writer.stats() if _writer is not None else None
@@ -0,0 +1,117 @@
+"""
+Verification Index - Bellek İçi Doğrulama İndeksi
+==================================================
+Bir projenin doğrulama durumlarını (PhotoType, PhotoId) anahtarıyla bellekte tutar.
+İlk kullanımda tek sorguyla yüklenir, verify_photo yazımlarıyla güncel kalır ve
+Verifications.RowVer (rowversion) üzerinden diğer süreçlerin yazdıkları poll edilir.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class VerificationIndex:
+    """Proje bazlı bellek içi doğrulama indeksi."""
+
+    def __init__(self, source, poll_seconds: float = 5, enabled: bool = True):
+        self.source = source
+        self.poll_seconds = poll_seconds
+        self.enabled = enabled
+
+        self._statuses = {}      # (photo_type, photo_id) -> {'PhotoId', 'status', 'note', 'verified_at'}
+        self._marker = None      # Bu değerden küçük RowVer'lar okundu
+        self._loaded = False
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Gerekirse ilk yüklemeyi yapar veya değişiklikleri poll eder."""
+        if self._loaded and time.monotonic() - self._last_poll < self.poll_seconds:
+            return
+
+        # Başka bir thread poll ediyorsa beklemeden mevcut veriyle devam et
+        if not self._lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if self._loaded and time.monotonic() - self._last_poll < self.poll_seconds:
+                return
+
+            conn = self.source._get_pv_connection()
+            try:
+                cursor = conn.cursor(as_dict=True)
+
+                # Açık transaction'ların henüz commit edilmemiş satırlarını atlamamak için üst sınır
+                cursor.execute('SELECT MIN_ACTIVE_ROWVERSION() AS Upper')
+                upper = cursor.fetchone()['Upper']
+
+                if self._marker is None:
+                    cursor.execute('''
+                        SELECT PhotoType, PhotoId, Status, Note, VerifiedAt
+                        FROM Verifications
+                        WHERE Project = %s AND RowVer < %s
+                    ''', (self.source.project_key, upper))
+                else:
+                    cursor.execute('''
+                        SELECT PhotoType, PhotoId, Status, Note, VerifiedAt
+                        FROM Verifications
+                        WHERE Project = %s AND RowVer >= %s AND RowVer < %s
+                    ''', (self.source.project_key, self._marker, upper))
+
+                for row in cursor.fetchall():
+                    self._statuses[(row['PhotoType'], row['PhotoId'])] = {
+                        'PhotoId': row['PhotoId'],
+                        'status': row['Status'],
+                        'note': row['Note'],
+                        'verified_at': row['VerifiedAt'],
+                    }
+            finally:
+                conn.close()
+
+            self._marker = upper
+            self._loaded = True
+            self._last_poll = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def lookup(self, photo_type: str, photo_ids: List[int]) -> Optional[Dict[int, Dict]]:
+        """
+        Fotoğrafların doğrulama durumlarını döndürür.
+        İndeks kullanılamıyorsa None döner (çağıran veritabanına düşer).
+        """
+        if not self.enabled:
+            return None
+        try:
+            self._refresh()
+        except Exception as e:
+            print(f"DEBUG VerificationIndex refresh error: {e}")
+            if not self._loaded:
+                return None
+
+        results = {}
+        for photo_id in photo_ids:
+            entry = self._statuses.get((photo_type, photo_id))
+            if entry:
+                results[photo_id] = dict(entry)
+        return results
+
+    def apply(self, photo_type: str, photo_id: int, status: str, note: str = None):
+        """Bu süreçte yapılan doğrulamayı indekse hemen yansıtır."""
+        if not self._loaded:
+            return
+        self._statuses[(photo_type, photo_id)] = {
+            'PhotoId': photo_id,
+            'status': status,
+            'note': note,
+            'verified_at': datetime.now(),
+        }
+
+    def stats(self) -> Dict:
+        """İndeks durum bilgisi."""
+        return {
+            'enabled': self.enabled,
+            'loaded': self._loaded,
+            'entries': len(self._statuses),
+            'seconds_since_poll': round(time.monotonic() - self._last_poll, 1) if self._loaded else None,
+        }
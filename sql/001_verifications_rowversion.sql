@@ -0,0 +1,10 @@
+-- Doğrulama indeksi için değişiklik işaretçisi
+-- Her INSERT/UPDATE'te artan rowversion; uygulama RowVer > son görülen değer ile poll eder.
+
+ALTER TABLE Verifications ADD RowVer rowversion;
+GO
+
+CREATE INDEX IX_Verifications_Project_RowVer
+    ON Verifications (Project, RowVer)
+    INCLUDE (PhotoType, PhotoId, Status, Note, VerifiedAt);
+GO
@@ -0,0 +1,24 @@
+-- Yavaş sorgu kaydı (sources/slow_query_log.py yazar, /admin/slow-queries okur)
+-- QueryHash: normalize edilmiş SQL'in (sabitler ? ile değiştirilmiş) kısa özeti
+
+CREATE TABLE SlowQueryLog (
+    Id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    LoggedAt DATETIME NOT NULL,
+    DatabaseName NVARCHAR(128) NOT NULL,
+    Route NVARCHAR(200) NULL,
+    QueryHash CHAR(16) NOT NULL,
+    NormalizedSql NVARCHAR(MAX) NOT NULL,
+    SqlText NVARCHAR(MAX) NOT NULL,
+    Params NVARCHAR(MAX) NULL,
+    ExecuteMs INT NOT NULL,
+    FetchMs INT NOT NULL,
+    TotalMs INT NOT NULL,
+    RowsReturned INT NOT NULL,
+    Failed BIT NOT NULL DEFAULT 0
+);
+GO
+
+CREATE INDEX IX_SlowQueryLog_LoggedAt
+    ON SlowQueryLog (LoggedAt)
+    INCLUDE (QueryHash, TotalMs, ExecuteMs, FetchMs, RowsReturned, Failed);
+GO
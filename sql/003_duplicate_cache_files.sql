@@ -0,0 +1,40 @@
+-- Duplicate cache'in fotoğraf başına satırları (duplicate_cache_builder.py yazar)
+-- Duplicate / mesafe raporları filtreleri (tarih, tür, personel, mağaza, mesafe) bu tabloda SQL'de uygular;
+-- DuplicateCache.Details JSON'u sayfa gösterimi için aynen kalır.
+
+CREATE TABLE DuplicateCacheFiles (
+    Id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    Project NVARCHAR(50) NOT NULL,
+    Md5Hash CHAR(32) NOT NULL,
+    PhotoCount INT NOT NULL,
+    PhotoType NVARCHAR(20) NOT NULL,
+    PhotoId INT NOT NULL,
+    VisitId INT NULL,
+    UserId INT NULL,
+    Personnel NVARCHAR(200) NULL,
+    CustomerCode NVARCHAR(50) NULL,
+    CustomerName NVARCHAR(300) NULL,
+    PhotoDate DATETIME NULL,
+    DistanceKm FLOAT NULL,
+    UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+);
+GO
+
+-- Duplicate raporu: proje + tarih aralığı, sıralama PhotoCount / Md5Hash
+CREATE INDEX IX_DuplicateCacheFiles_Project_PhotoDate
+    ON DuplicateCacheFiles (Project, PhotoDate)
+    INCLUDE (Md5Hash, PhotoCount, PhotoType, PhotoId, VisitId, UserId, CustomerCode, DistanceKm);
+GO
+
+-- Mesafe uyarı raporu: sadece 1 km üstü satırlar
+CREATE INDEX IX_DuplicateCacheFiles_Project_Far
+    ON DuplicateCacheFiles (Project, PhotoDate)
+    INCLUDE (PhotoType, PhotoId, VisitId, UserId, Personnel, CustomerCode, CustomerName, DistanceKm)
+    WHERE DistanceKm > 1;
+GO
+
+-- Doğrulama raporu: proje + doğrulama tarihi aralığı
+CREATE INDEX IX_Verifications_Project_VerifiedAt
+    ON Verifications (Project, VerifiedAt)
+    INCLUDE (PhotoType, PhotoId, VisitId, Status, Note, VerifiedBy);
+GO
@@ -0,0 +1,17 @@
+-- Haftalık rapor (weekly_report.py) tek batch'te GROUP BY Project ile okur;
+-- her sorgu son 7 günlük aralığı tarih indeksinden tarar, tablonun tamamını değil.
+
+CREATE INDEX IX_Verifications_VerifiedAt
+    ON Verifications (VerifiedAt)
+    INCLUDE (Project, Status, VerifiedBy);
+GO
+
+CREATE INDEX IX_PhotoHashes_CreatedAt
+    ON PhotoHashes (CreatedAt)
+    INCLUDE (Project);
+GO
+
+CREATE INDEX IX_EventLogs_CreatedAt
+    ON EventLogs (CreatedAt)
+    INCLUDE (Action, UserId);
+GO
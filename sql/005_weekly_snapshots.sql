@@ -0,0 +1,32 @@
+-- Haftalık rapor özetleri (weekly_report.py her çalıştığında yazar; aynı hafta tekrar çalışırsa üzerine yazar)
+-- Trendler ham tablolardan değil bu tablolardan okunur: proje + hafta aralığı birkaç satırlık indeks okuması.
+-- WeekStart: raporun kapsadığı 7 günün ilk günü
+
+CREATE TABLE WeeklyProjectSnapshots (
+    Project NVARCHAR(50) NOT NULL,
+    WeekStart DATE NOT NULL,
+    TotalPhotos INT NOT NULL,
+    VerifiedPhotos INT NOT NULL,
+    Approved INT NOT NULL,
+    Rejected INT NOT NULL,
+    Suspicious INT NOT NULL,
+    DuplicateGroups INT NOT NULL,
+    UniqueLogins INT NOT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_WeeklyProjectSnapshots PRIMARY KEY (Project, WeekStart)
+);
+GO
+
+CREATE TABLE WeeklyUserSnapshots (
+    Project NVARCHAR(50) NOT NULL,
+    WeekStart DATE NOT NULL,
+    Username NVARCHAR(100) NOT NULL,
+    DisplayName NVARCHAR(200) NULL,
+    Total INT NOT NULL,
+    Approved INT NOT NULL,
+    Rejected INT NOT NULL,
+    Suspicious INT NOT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_WeeklyUserSnapshots PRIMARY KEY (Project, WeekStart, Username)
+);
+GO
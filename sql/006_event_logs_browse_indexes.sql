@@ -0,0 +1,15 @@
+-- /admin/logs anahtarlı sayfalama (CreatedAt DESC, Id DESC) ve filtreleri
+-- Filtresiz sayfalar 004'teki IX_EventLogs_CreatedAt'i kullanır (Id clustered anahtar olarak indekste).
+-- Her filtre (Kolon, CreatedAt) indeksinden sadece istenen sayfayı okur; tarih aralığı CreatedAt üzerinde.
+
+CREATE INDEX IX_EventLogs_Username_CreatedAt
+    ON EventLogs (Username, CreatedAt);
+GO
+
+CREATE INDEX IX_EventLogs_Action_CreatedAt
+    ON EventLogs (Action, CreatedAt);
+GO
+
+CREATE INDEX IX_EventLogs_Project_CreatedAt
+    ON EventLogs (Project, CreatedAt);
+GO
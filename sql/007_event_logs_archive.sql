@@ -0,0 +1,38 @@
+-- EventLogs saklama: hot_days'den eski satırlar event_log_archiver.py ile bu tabloya taşınır
+-- Arşiv PAGE sıkıştırmalı ve (CreatedAt, Id) ile kümelenmiş: aylık aralık okumaları ve eski
+-- ayların silinmesi sıralı okuma; Id EventLogs'taki değerle aynen saklanır (IDENTITY değil).
+
+CREATE TABLE EventLogsArchive (
+    Id BIGINT NOT NULL,
+    UserId INT NULL,
+    Username NVARCHAR(100) NULL,
+    Action NVARCHAR(50) NOT NULL,
+    Project NVARCHAR(50) NULL,
+    Details NVARCHAR(1000) NULL,
+    IpAddress NVARCHAR(50) NULL,
+    CreatedAt DATETIME NOT NULL,
+    ArchivedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_EventLogsArchive PRIMARY KEY CLUSTERED (CreatedAt, Id)
+        WITH (DATA_COMPRESSION = PAGE)
+);
+GO
+
+-- /admin/logs filtreleri (006'daki hot tablo indeksleriyle aynı şekil)
+CREATE INDEX IX_EventLogsArchive_Username_CreatedAt
+    ON EventLogsArchive (Username, CreatedAt) WITH (DATA_COMPRESSION = PAGE);
+GO
+
+CREATE INDEX IX_EventLogsArchive_Action_CreatedAt
+    ON EventLogsArchive (Action, CreatedAt) WITH (DATA_COMPRESSION = PAGE);
+GO
+
+CREATE INDEX IX_EventLogsArchive_Project_CreatedAt
+    ON EventLogsArchive (Project, CreatedAt) WITH (DATA_COMPRESSION = PAGE);
+GO
+
+-- Hot + arşiv birlikte okunurken (include_archive) kullanılır; koşullar iki tabloya da iner
+CREATE VIEW EventLogsAll AS
+    SELECT Id, UserId, Username, Action, Project, Details, IpAddress, CreatedAt FROM EventLogs
+    UNION ALL
+    SELECT Id, UserId, Username, Action, Project, Details, IpAddress, CreatedAt FROM EventLogsArchive;
+GO
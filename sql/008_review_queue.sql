@@ -0,0 +1,34 @@
+-- İnceleme kuyruğu: doğrulanmamış fotoğraflar (photo_cache_builder.py doldurur, doğrulanınca silinir)
+-- İnceleyici N fotoğrafı süreli kiralar (LeasedBy / LeaseUntil); kirası geçerli satırlar başkasına verilmez.
+-- Fotoğraf adresi ve ziyaret bilgisi burada tutulur: kuyruk sayfası proje DB'sine gitmez.
+
+CREATE TABLE ReviewQueue (
+    Id BIGINT IDENTITY(1,1) PRIMARY KEY,
+    Project NVARCHAR(50) NOT NULL,
+    PhotoType NVARCHAR(20) NOT NULL,
+    PhotoId INT NOT NULL,
+    VisitId INT NULL,
+    ImageUrl NVARCHAR(500) NULL,
+    PhotoDate DATETIME NULL,
+    Personnel NVARCHAR(200) NULL,
+    CustomerName NVARCHAR(300) NULL,
+    CustomerCode NVARCHAR(50) NULL,
+    LeasedBy INT NULL,
+    LeaseUntil DATETIME NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT UQ_ReviewQueue_Photo UNIQUE (Project, PhotoType, PhotoId)
+);
+GO
+
+-- Sıradaki batch: proje + tür içinde en yeni fotoğraflar; TOP (N) bu indeksten N satır (+ kiralı olanlar) okur
+CREATE INDEX IX_ReviewQueue_Next
+    ON ReviewQueue (Project, PhotoType, PhotoDate DESC, Id)
+    INCLUDE (LeasedBy, LeaseUntil);
+GO
+
+-- Kullanıcının kiraladıkları (devam etme / bırakma); sadece kiralı satırlar indekste
+CREATE INDEX IX_ReviewQueue_LeasedBy
+    ON ReviewQueue (LeasedBy, Project, PhotoType)
+    INCLUDE (LeaseUntil)
+    WHERE LeasedBy IS NOT NULL;
+GO
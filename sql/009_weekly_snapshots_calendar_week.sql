@@ -0,0 +1,14 @@
+-- Haftalık snapshot'lar takvim haftasına bağlandı: WeekStart artık raporlanan haftanın Pazartesi'si
+-- (weekly_report.report_week). Hafta içinde tekrar çalışan rapor aynı satırların üzerine yazar.
+
+-- Eski kayan 7 günlük pencerelerden kalan, Pazartesi'ye denk gelmeyen haftalar örtüşür: silinir
+-- (1900-01-01 Pazartesi; DATEFIRST ayarından bağımsız)
+DELETE FROM WeeklyProjectSnapshots WHERE DATEDIFF(day, '19000101', WeekStart) % 7 <> 0;
+GO
+
+DELETE FROM WeeklyUserSnapshots WHERE DATEDIFF(day, '19000101', WeekStart) % 7 <> 0;
+GO
+
+-- UniqueLogins proje bazlı değildi (Login olaylarında Project yok; her projeye genel sayı yazılıyordu)
+ALTER TABLE WeeklyProjectSnapshots DROP COLUMN UniqueLogins;
+GO
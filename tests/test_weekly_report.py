@@ -0,0 +1,26 @@
+"""weekly_report: raporlanan hafta ve trend penceresi."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip('pymssql')
+import weekly_report  # noqa: E402
+
+WEEK_DAYS = [date(2026, 10, 19) + timedelta(days=i) for i in range(7)]   # Pazartesi - Pazar
+
+
+@pytest.mark.parametrize('today', WEEK_DAYS)
+def test_report_week_is_previous_calendar_week(today):
+    start, end = weekly_report.report_week(today)
+    assert start == datetime(2026, 10, 12)
+    assert end == datetime(2026, 10, 19)
+
+
+@pytest.mark.parametrize('today', WEEK_DAYS)
+@pytest.mark.parametrize('weeks', [1, 8])
+def test_trend_window_contains_exactly_weeks_snapshots(today, weeks):
+    since = weekly_report.trend_since(weeks, today)
+    newest = weekly_report.report_week(today)[0].date()
+    snapshot_weeks = [newest - timedelta(weeks=i) for i in range(weeks + 2)]
+    assert len([week for week in snapshot_weeks if week >= since]) == weeks
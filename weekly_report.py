@@ -8,7 +8,7 @@ import pymssql
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 
 from config import PROJECTS, PHOTOVERIFIER_DB, EMAIL_CONFIG
 
@@ -24,57 +24,124 @@ def get_pv_connection():
     )
 
 
+# Haftalık istatistikler tek batch'te; her SELECT ayrı sonuç seti (nextset ile okunur)
+WEEKLY_STATS_BATCH = '''
+    -- 1. Proje + durum bazlı doğrulamalar
+    SELECT Project, Status, COUNT(*) as count
+    FROM Verifications
+    WHERE VerifiedAt >= %(start)s AND VerifiedAt < %(end)s
+    GROUP BY Project, Status;
+
+    -- 2. Proje bazlı duplicate grup sayısı
+    SELECT Project, COUNT(*) as count
+    FROM DuplicateCache
+    GROUP BY Project;
+
+    -- 3. Proje bazlı taranan fotoğraf sayısı
+    SELECT Project, COUNT(*) as count
+    FROM PhotoHashes
+    WHERE CreatedAt >= %(start)s AND CreatedAt < %(end)s
+    GROUP BY Project;
+
+    -- 4. Kullanıcı bazlı aksiyonlar
+    SELECT 
+        u.DisplayName,
+        u.Username,
+        COUNT(*) as action_count,
+        SUM(CASE WHEN v.Status = 'approved' THEN 1 ELSE 0 END) as approved,
+        SUM(CASE WHEN v.Status = 'rejected' THEN 1 ELSE 0 END) as rejected,
+        SUM(CASE WHEN v.Status = 'suspicious' THEN 1 ELSE 0 END) as suspicious
+    FROM Verifications v
+    JOIN Users u ON v.VerifiedBy = u.Id
+    WHERE v.VerifiedAt >= %(start)s AND v.VerifiedAt < %(end)s
+    GROUP BY u.DisplayName, u.Username
+    ORDER BY action_count DESC;
+
+    -- 5. Event log özeti
+    SELECT Action, COUNT(*) as count
+    FROM EventLogs
+    WHERE CreatedAt >= %(start)s AND CreatedAt < %(end)s
+    GROUP BY Action
+    ORDER BY count DESC;
+
+    -- 6. Giriş yapan farklı kullanıcı sayısı
+    SELECT COUNT(DISTINCT UserId) as unique_users
+    FROM EventLogs
+    WHERE Action = 'Login' AND CreatedAt >= %(start)s AND CreatedAt < %(end)s;
+
+    -- 7. Proje + kullanıcı bazlı aksiyonlar (haftalık özet için)
+    SELECT 
+        v.Project,
+        u.Username,
+        u.DisplayName,
+        COUNT(*) as action_count,
+        SUM(CASE WHEN v.Status = 'approved' THEN 1 ELSE 0 END) as approved,
+        SUM(CASE WHEN v.Status = 'rejected' THEN 1 ELSE 0 END) as rejected,
+        SUM(CASE WHEN v.Status = 'suspicious' THEN 1 ELSE 0 END) as suspicious
+    FROM Verifications v
+    JOIN Users u ON v.VerifiedBy = u.Id
+    WHERE v.VerifiedAt >= %(start)s AND v.VerifiedAt < %(end)s
+    GROUP BY v.Project, u.Username, u.DisplayName;
+'''
+
+
+def _read_result_sets(cursor, count: int) -> list:
+    """Batch'in sonuç setlerini sırayla okur."""
+    result_sets = [cursor.fetchall()]
+    for _ in range(count - 1):
+        if not cursor.nextset():
+            raise RuntimeError('Haftalık istatistik batch\'i beklenenden az sonuç seti döndürdü')
+        result_sets.append(cursor.fetchall())
+    return result_sets
+
+
+def report_week(today: date = None) -> tuple:
+    """
+    Raporlanan hafta: bugünden önceki son tam takvim haftası (Pazartesi 00:00 - Pazartesi 00:00).
+    Hafta içinde hangi gün çalışırsa çalışsın aynı haftayı verir; snapshot'lar üzerine yazılır.
+    """
+    today = today or date.today()
+    this_monday = today - timedelta(days=today.weekday())
+    start = datetime.combine(this_monday - timedelta(days=7), time.min)
+    return start, start + timedelta(days=7)
+
+
 def get_weekly_stats():
-    """Haftalık istatistikleri toplar."""
+    """Haftalık istatistikleri tüm projeler için tek sorgu batch'inde toplar."""
     conn = get_pv_connection()
     cursor = conn.cursor(as_dict=True)
     
-    # Son 7 gün
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=7)
+    # Geçen takvim haftası (Pazartesi - Pazar)
+    start_date, end_date = report_week()
     
     report = {
-        'period': f"{start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')}",
+        'period': f"{start_date.strftime('%d.%m.%Y')} - {(end_date - timedelta(days=1)).strftime('%d.%m.%Y')}",
+        'week_start': start_date.date(),
         'projects': {},
         'users': {},
         'event_summary': {},
     }
     
+    cursor.execute(WEEKLY_STATS_BATCH, {'start': start_date, 'end': end_date})
+    (verification_rows, duplicate_rows, hash_rows, user_rows, event_rows, login_rows,
+     project_user_rows) = _read_result_sets(cursor, 7)
+    conn.close()
+    
+    verifications = {}
+    for row in verification_rows:
+        verifications.setdefault(row['Project'], {})[row['Status']] = row['count']
+    duplicate_counts = {row['Project']: row['count'] for row in duplicate_rows}
+    photo_counts = {row['Project']: row['count'] for row in hash_rows}
+    
     # 1. Proje bazlı doğrulama istatistikleri
     for project_key in PROJECTS:
-        cursor.execute('''
-            SELECT 
-                Status,
-                COUNT(*) as count
-            FROM Verifications
-            WHERE Project = %s AND VerifiedAt >= %s
-            GROUP BY Status
-        ''', (project_key, start_date))
-        
         stats = {'approved': 0, 'rejected': 0, 'suspicious': 0, 'total': 0}
-        for row in cursor.fetchall():
-            stats[row['Status']] = row['count']
-            stats['total'] += row['count']
-        
-        # Toplam duplicate sayısı
-        cursor.execute('''
-            SELECT COUNT(*) as count FROM DuplicateCache WHERE Project = %s
-        ''', (project_key,))
-        duplicate_count = cursor.fetchone()['count']
-        
-        # Toplam fotoğraf sayısı (PhotoHashes tablosundan, son 7 gün)
-        cursor.execute('''
-            SELECT COUNT(*) as count FROM PhotoHashes 
-            WHERE Project = %s AND CreatedAt >= %s
-        ''', (project_key, start_date))
-        total_photos = cursor.fetchone()['count']
+        for status, count in verifications.get(project_key, {}).items():
+            stats[status] = count
+            stats['total'] += count
         
-        # Değerlendirilen fotoğraf sayısı (son 7 gün)
-        cursor.execute('''
-            SELECT COUNT(*) as count FROM Verifications 
-            WHERE Project = %s AND VerifiedAt >= %s
-        ''', (project_key, start_date))
-        verified_photos = cursor.fetchone()['count']
+        total_photos = photo_counts.get(project_key, 0)
+        verified_photos = stats['total']
         
         # İncelenmemiş fotoğraf sayısı
         unverified_photos = total_photos - verified_photos if total_photos > verified_photos else 0
@@ -85,7 +152,7 @@ def get_weekly_stats():
         report['projects'][project_key] = {
             'name': PROJECTS[project_key]['name'],
             'verifications': stats,
-            'duplicate_groups': duplicate_count,
+            'duplicate_groups': duplicate_counts.get(project_key, 0),
             'total_photos': total_photos,
             'verified_photos': verified_photos,
             'unverified_photos': unverified_photos,
@@ -93,22 +160,7 @@ def get_weekly_stats():
         }
     
     # 2. Kullanıcı bazlı aksiyonlar
-    cursor.execute('''
-        SELECT 
-            u.DisplayName,
-            u.Username,
-            COUNT(*) as action_count,
-            SUM(CASE WHEN v.Status = 'approved' THEN 1 ELSE 0 END) as approved,
-            SUM(CASE WHEN v.Status = 'rejected' THEN 1 ELSE 0 END) as rejected,
-            SUM(CASE WHEN v.Status = 'suspicious' THEN 1 ELSE 0 END) as suspicious
-        FROM Verifications v
-        JOIN Users u ON v.VerifiedBy = u.Id
-        WHERE v.VerifiedAt >= %s
-        GROUP BY u.DisplayName, u.Username
-        ORDER BY action_count DESC
-    ''', (start_date,))
-    
-    for row in cursor.fetchall():
+    for row in user_rows:
         report['users'][row['DisplayName'] or row['Username']] = {
             'total': row['action_count'],
             'approved': row['approved'],
@@ -117,33 +169,111 @@ def get_weekly_stats():
         }
     
     # 3. Event log özeti
-    cursor.execute('''
-        SELECT 
-            Action,
-            COUNT(*) as count
-        FROM EventLogs
-        WHERE CreatedAt >= %s
-        GROUP BY Action
-        ORDER BY count DESC
-    ''', (start_date,))
-    
-    for row in cursor.fetchall():
+    for row in event_rows:
         report['event_summary'][row['Action']] = row['count']
     
     # 4. Toplam login sayısı
-    cursor.execute('''
-        SELECT COUNT(DISTINCT UserId) as unique_users
-        FROM EventLogs
-        WHERE Action = 'Login' AND CreatedAt >= %s
-    ''', (start_date,))
-    report['unique_logins'] = cursor.fetchone()['unique_users']
+    report['unique_logins'] = login_rows[0]['unique_users'] if login_rows else 0
+    
+    # 5. Proje bazlı kullanıcı aksiyonları (sadece snapshot'a yazılır)
+    report['project_users'] = project_user_rows
     
-    conn.close()
     return report
 
 
-def generate_html_report(report):
-    """HTML formatında rapor oluşturur."""
+# ==================== HAFTALIK SNAPSHOT / TREND ====================
+
+# E-postada ve trend sayfasında gösterilen hafta sayısı
+TREND_WEEKS = 8
+
+
+def save_snapshots(report):
+    """Haftanın proje ve kullanıcı özetlerini yazar (aynı hafta tekrar çalışırsa üzerine yazar)."""
+    week_start = report['week_start']
+    conn = get_pv_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('DELETE FROM WeeklyProjectSnapshots WHERE WeekStart = %s', (week_start,))
+    cursor.execute('DELETE FROM WeeklyUserSnapshots WHERE WeekStart = %s', (week_start,))
+    
+    project_rows = [
+        (project_key, week_start, data['total_photos'], data['verified_photos'],
+         data['verifications']['approved'], data['verifications']['rejected'], data['verifications']['suspicious'],
+         data['duplicate_groups'])
+        for project_key, data in report['projects'].items()
+    ]
+    if project_rows:
+        cursor.executemany('''
+            INSERT INTO WeeklyProjectSnapshots (Project, WeekStart, TotalPhotos, VerifiedPhotos,
+                                                Approved, Rejected, Suspicious, DuplicateGroups)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', project_rows)
+    
+    user_rows = [
+        (row['Project'], week_start, row['Username'], row['DisplayName'], row['action_count'],
+         row['approved'], row['rejected'], row['suspicious'])
+        for row in report['project_users']
+    ]
+    if user_rows:
+        cursor.executemany('''
+            INSERT INTO WeeklyUserSnapshots (Project, WeekStart, Username, DisplayName,
+                                             Total, Approved, Rejected, Suspicious)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', user_rows)
+    
+    conn.commit()
+    conn.close()
+    print(f"  💾 Snapshot: {len(project_rows)} proje, {len(user_rows)} kullanıcı satırı ({week_start})")
+
+
+def trend_since(weeks: int = TREND_WEEKS, today: date = None) -> date:
+    """Trend penceresinin ilk haftası (WeekStart >= bu tarih): son raporlanan hafta dahil `weeks` hafta."""
+    return report_week(today)[0].date() - timedelta(weeks=weeks - 1)
+
+
+def get_trends(weeks: int = TREND_WEEKS, project: str = None) -> dict:
+    """
+    Son `weeks` haftanın snapshot'larını okur.
+    Dönüş: {'weeks': [WeekStart, ...], 'projects': {proje: {WeekStart: satır}},
+            'users': {proje: {Username: {'name': ..., 'weeks': {WeekStart: satır}}}}}
+    """
+    since = trend_since(weeks)
+    project_filter = 'AND Project = %s' if project else ''
+    params = (since, project) if project else (since,)
+    
+    conn = get_pv_connection()
+    cursor = conn.cursor(as_dict=True)
+    cursor.execute(f'''
+        SELECT Project, WeekStart, TotalPhotos, VerifiedPhotos, Approved, Rejected, Suspicious,
+               DuplicateGroups
+        FROM WeeklyProjectSnapshots
+        WHERE WeekStart >= %s {project_filter}
+        ORDER BY Project, WeekStart
+    ''', params)
+    project_rows = cursor.fetchall()
+    cursor.execute(f'''
+        SELECT Project, WeekStart, Username, DisplayName, Total, Approved, Rejected, Suspicious
+        FROM WeeklyUserSnapshots
+        WHERE WeekStart >= %s {project_filter}
+        ORDER BY Project, Username, WeekStart
+    ''', params)
+    user_rows = cursor.fetchall()
+    conn.close()
+    
+    trends = {'weeks': sorted({row['WeekStart'] for row in project_rows}), 'projects': {}, 'users': {}}
+    for row in project_rows:
+        total = row['TotalPhotos']
+        row['VerifiedPercent'] = round(row['VerifiedPhotos'] / total * 100, 1) if total > 0 else 0
+        trends['projects'].setdefault(row['Project'], {})[row['WeekStart']] = row
+    for row in user_rows:
+        user = trends['users'].setdefault(row['Project'], {}).setdefault(
+            row['Username'], {'name': row['DisplayName'] or row['Username'], 'weeks': {}})
+        user['weeks'][row['WeekStart']] = row
+    return trends
+
+
+def generate_html_report(report, trends=None):
+    """HTML formatında rapor oluşturur (trends verilirse snapshot'lardan trend tablosu eklenir)."""
     html = f"""
     <html>
     <head>
@@ -230,6 +360,41 @@ def generate_html_report(report):
     
     html += """
         </table>
+    """
+    
+    if trends and trends['weeks']:
+        html += f"""
+        <h2>📈 Son {len(trends['weeks'])} Hafta Trend</h2>
+        <table>
+            <tr>
+                <th>Proje</th>
+                {''.join(f"<th>{week.strftime('%d.%m')}</th>" for week in trends['weeks'])}
+                <th>Değişim</th>
+            </tr>
+        """
+        for project_key, weeks in trends['projects'].items():
+            name = report['projects'].get(project_key, {}).get('name', project_key)
+            cells = ''
+            for week in trends['weeks']:
+                row = weeks.get(week)
+                cells += f"<td>{row['VerifiedPhotos']} <small>(%{row['VerifiedPercent']})</small></td>" if row else '<td>-</td>'
+            
+            # Son iki snapshot arasındaki değerlendirilen fotoğraf farkı
+            values = [weeks[week]['VerifiedPhotos'] for week in trends['weeks'] if week in weeks]
+            change = values[-1] - values[-2] if len(values) >= 2 else 0
+            change_class = 'stat-approved' if change > 0 else 'stat-rejected' if change < 0 else ''
+            html += f"""
+            <tr>
+                <td><strong>{name}</strong></td>
+                {cells}
+                <td class="{change_class}">{change:+d}</td>
+            </tr>
+            """
+        html += """
+        </table>
+        """
+    
+    html += """
         
         <h2>📋 Event Log Özeti</h2>
         <table>
@@ -310,9 +475,18 @@ def run_weekly_report():
     print("\n📊 İstatistikler toplanıyor...")
     report = get_weekly_stats()
     
+    # Snapshot yaz, trendleri snapshot'lardan oku
+    print("💾 Snapshot kaydediliyor...")
+    trends = None
+    try:
+        save_snapshots(report)
+        trends = get_trends()
+    except Exception as e:
+        print(f"DEBUG weekly snapshot error: {e}")
+    
     # HTML rapor oluştur
     print("📝 Rapor oluşturuluyor...")
-    html = generate_html_report(report)
+    html = generate_html_report(report, trends)
     
     # E-posta gönder
     print("📧 E-posta gönderiliyor...")